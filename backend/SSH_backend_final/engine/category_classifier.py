@@ -5,13 +5,22 @@ Uses OpenAI's API for zero-shot text classification
 of civic complaints into predefined categories.
 
 Model: gpt-4o-mini
+
+classify_local() is a keyword-based stand-in (taxonomy keywords plus the
+rule-based department router) used when the token budget degrades
+this stage. Its keyword hints come from the active rule pack.
 """
 
 import os
 import json
+import re
 import time
 from dotenv import load_dotenv
-from openai import OpenAI
+from engine.department_router import route_department
+from engine.deadline import call_timeout, can_wait
+from engine.llm_router import chat_completion
+from engine.rule_packs import current_rules
+from engine.token_budget import mark_degraded
 
 load_dotenv()
 
@@ -59,50 +68,16 @@ CATEGORY_TAXONOMY = {
     },
 }
 
-_client = None
-
-
-def _ensure_client():
-    """Initialize the OpenAI client."""
-    global _client
-    if _client is not None:
-        return
-
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-    _client = OpenAI(api_key=api_key)
-    print("[CategoryClassifier] OpenAI client initialized.")
-
-
-def classify(text: str) -> dict:
-    """
-    Classify a complaint into a primary category and subcategory.
-
-    Returns:
-        {
-            "category": "Infrastructure",
-            "subcategory": "Roads",
-            "category_confidence": 0.87
-        }
-    """
-    _ensure_client()
+# The keyword hints above are the built-in ones; the active rule pack
+# (engine.rule_packs) may replace them and holds the compiled patterns
+# the local fallback matches with.
 
-    if not text.strip():
-        return {
-            "category": "Infrastructure",
-            "subcategory": "Roads",
-            "category_confidence": 0.0
-        }
+MODEL = "gpt-4o-mini"
 
-    # Build taxonomy for prompt
-    taxonomy_block = ""
-    for cat, info in CATEGORY_TAXONOMY.items():
-        subs = ", ".join(info["subcategories"])
-        taxonomy_block += f"\n  {cat}:\n    Subcategories: {subs}\n    Keywords: {info['keywords']}\n"
+SYSTEM_PROMPT = "You are a JSON-only API. Output strict JSON."
 
-    prompt = f"""You are a high-precision civic grievance classifier for an Indian municipal complaint system.
+# {taxonomy} and {departments} are filled in from the code tables below
+PROMPT_TEMPLATE = """You are a high-precision civic grievance classifier for an Indian municipal complaint system.
 
 Your task:
 Classify the complaint into EXACTLY ONE primary category and ONE subcategory.
@@ -113,61 +88,9 @@ You must strictly follow the taxonomy and boundary rules below.
 CATEGORY TAXONOMY
 ---------------------------------------------------
 
-Infrastructure
-- Roads (potholes, damaged roads)
-- Bridges
-- Streetlights
-- Public buildings
-
-Electricity
-- Power outage
-- Transformer issue
-- Live wire
-- Voltage fluctuation
-
-Water & Drainage
-- Water shortage
-- Pipeline leakage
-- Sewage overflow
-- Flooding
-
-Sanitation
-- Garbage collection
-- Open dumping
-- Blocked drains
-
-Public Health
-- Contamination
-- Unsafe food
-- Mosquito breeding
-- Hospital complaint
-
-Law & Order
-- Illegal activity
-- Public disturbance
-- Encroachment
-
-Transport
-- Bus delay
-- Broken traffic signal
-- Road accident
-
-Environment
-- Tree fall
-- Air pollution
-- Noise pollution
-
-Animals & Pests
-- Stray animals
-- Animal cruelty
-- Dead animal
-- Pet issue
-- Pest outbreak
-
-Other
-- General inquiry
-- Miscellaneous
-- Not applicable
+Each subcategory has a code (category code + number). Answer with codes only.
+
+{taxonomy}
 
 
 ---------------------------------------------------
@@ -221,7 +144,7 @@ Example:
 CONFIDENCE RULE
 ---------------------------------------------------
 
-category_confidence must be:
+category_confidence (conf) must be:
 - Between 0.75 and 0.98
 - Higher if complaint clearly matches a subcategory
 - Lower if ambiguous
@@ -234,16 +157,8 @@ You must also assign the complaint to one or more government departments with pr
 Most cases should have ONE primary department. 
 However, for complex cases involving overlapping infrastructure, safety, and health (e.g., a major accident causing a gas leak and fire), distribute probabilities across ALL relevant departments to ensure coordination.
 
-Choose ONLY from this exact list:
-- Municipal Corporation - Roads
-- Electricity Board
-- Water Supply Department
-- Municipal Sanitation Department
-- Health Department
-- Police Department
-- Traffic Police Department
-- Environmental Authority
-- Animal Control Department
+Choose ONLY from this list, answering with the code:
+{departments}
 
 ---------------------------------------------------
 COMPLAINT
@@ -256,128 +171,244 @@ OUTPUT FORMAT (STRICT)
 ---------------------------------------------------
 
 Return ONLY valid JSON:
-{{
-  "category": "",
-  "subcategory": "",
-  "category_confidence": 0.0,
-  "department_probabilities": [
-    {{
-      "department": "",
-      "probability": 0.0
-    }}
-  ]
-}}
-
-Do not include explanations.
-Do not include extra text.
-Do not include markdown.
+{{"sub": "<subcategory code>", "conf": 0.0, "depts": [{{"code": "<department code>", "p": 0.0}}]}}
+
+- sub: the subcategory code, e.g. ELE3 for Electricity → Live wire
+- conf: category_confidence
+- depts: department codes with probabilities
+
 Return JSON only."""
 
+# ─── Structured Output Codes ─────────────────────────────
+# The model answers with short codes from a strict JSON schema instead of
+# echoing names, so nothing needs fuzzy repair. PROMPT_TEMPLATE's code
+# lists are built from these tables; subcategory codes are the category code plus the
+# 1-based position in CATEGORY_TAXONOMY (e.g. ELE3 = Electricity → Live wire).
+CATEGORY_CODES = {
+    "Infrastructure": "INF",
+    "Electricity": "ELE",
+    "Water & Drainage": "WAT",
+    "Sanitation": "SAN",
+    "Public Health": "HLT",
+    "Law & Order": "LAW",
+    "Transport": "TRN",
+    "Environment": "ENV",
+    "Animals & Pests": "ANM",
+    "Other": "OTH",
+}
+
+DEPARTMENT_CODES = {
+    "RD": "Municipal Corporation - Roads",
+    "EB": "Electricity Board",
+    "WS": "Water Supply Department",
+    "SN": "Municipal Sanitation Department",
+    "HD": "Health Department",
+    "PD": "Police Department",
+    "TP": "Traffic Police Department",
+    "EA": "Environmental Authority",
+    "AC": "Animal Control Department",
+}
+
+# subcategory code -> (category, subcategory)
+SUBCATEGORY_CODES = {
+    f"{CATEGORY_CODES[cat]}{i}": (cat, sub)
+    for cat, info in CATEGORY_TAXONOMY.items()
+    for i, sub in enumerate(info["subcategories"], 1)
+}
+
+# Shown after the subcategory name in the prompt
+SUBCATEGORY_HINTS = {
+    ("Infrastructure", "Roads"): "potholes, damaged roads",
+}
+
+
+def _taxonomy_prompt() -> str:
+    sections = []
+    for cat, info in CATEGORY_TAXONOMY.items():
+        lines = [f"{CATEGORY_CODES[cat]} {cat}"]
+        for i, sub in enumerate(info["subcategories"], 1):
+            hint = SUBCATEGORY_HINTS.get((cat, sub))
+            lines.append(f"- {CATEGORY_CODES[cat]}{i} {sub}" + (f" ({hint})" if hint else ""))
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def _departments_prompt() -> str:
+    return "\n".join(f"- {code} {name}" for code, name in DEPARTMENT_CODES.items())
+
+
+# The code lists in the prompt come from the same tables as the response
+# schema. Rule packs can't change categories or departments, so this is
+# done once.
+PROMPT_TEMPLATE = (
+    PROMPT_TEMPLATE
+    .replace("{taxonomy}", _taxonomy_prompt())
+    .replace("{departments}", _departments_prompt())
+)
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "complaint_classification",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "sub": {"type": "string", "enum": list(SUBCATEGORY_CODES)},
+                "conf": {"type": "number"},
+                "depts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "code": {"type": "string", "enum": list(DEPARTMENT_CODES)},
+                            "p": {"type": "number"},
+                        },
+                        "required": ["code", "p"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["sub", "conf", "depts"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def classify_local(text: str) -> dict:
+    """
+    Keyword-based classification without an API call.
+
+    The category whose taxonomy keywords match most often wins; the
+    subcategory is the one sharing most words with the text, and
+    departments come from the rule-based router. Confidence stays
+    below the LLM's 0.75 floor.
+    """
+    lowered = text.lower()
+    patterns = current_rules().category_keyword_res
+    hits = {cat: len(pattern.findall(lowered)) for cat, pattern in patterns.items()}
+    category = max(hits, key=hits.get)
+    if not hits[category]:
+        return {
+            "category": "Other",
+            "subcategory": "Miscellaneous",
+            "category_confidence": 0.5,
+            "department_probabilities": [{"department": "Municipal Corporation - Roads", "probability": 1.0}]
+        }
+
+    words = set(re.findall(r"[a-z]+", lowered))
+    subcategories = CATEGORY_TAXONOMY[category]["subcategories"]
+    # max() keeps the first on ties, i.e. the taxonomy's primary subcategory
+    subcategory = max(
+        subcategories,
+        key=lambda sub: len(words & set(re.findall(r"[a-z]+", sub.lower()))),
+    )
+    confidence = round(min(0.74, 0.55 + 0.05 * hits[category]), 4)
+
+    return {
+        "category": category,
+        "subcategory": subcategory,
+        "category_confidence": confidence,
+        "department_probabilities": route_department(category, confidence)
+    }
+
+
+def decode_classification(output: dict) -> dict:
+    """
+    Decode the model's coded answer into the classifier's output.
+
+    Raises:
+        ValueError: for a code outside the schema's enums.
+    """
+    code = output.get("sub")
+    if code not in SUBCATEGORY_CODES:
+        raise ValueError(f"unknown subcategory code {code!r}")
+    category, subcategory = SUBCATEGORY_CODES[code]
+
+    # The schema can't make probabilities sum to 1; merge repeats and normalize
+    probabilities = {}
+    for dept in output.get("depts") or []:
+        name = DEPARTMENT_CODES.get(dept.get("code"))
+        if name is None:
+            raise ValueError(f"unknown department code {dept.get('code')!r}")
+        probabilities[name] = probabilities.get(name, 0.0) + max(0.0, float(dept.get("p", 0.0)))
+
+    confidence = round(max(0.5, min(0.98, float(output.get("conf", 0.8)))), 4)
+    total = sum(probabilities.values())
+    if total > 0:
+        departments = [
+            {"department": name, "probability": round(p / total, 4)}
+            for name, p in probabilities.items()
+        ]
+    else:
+        departments = route_department(category, confidence)[:1]
+        departments[0]["probability"] = 1.0
+
+    return {
+        "category": category,
+        "subcategory": subcategory,
+        "category_confidence": confidence,
+        "department_probabilities": sorted(departments, key=lambda x: x["probability"], reverse=True)
+    }
+
+
+def classify(text: str) -> dict:
+    """
+    Classify a complaint into a primary category and subcategory.
+
+    The model replies in the coded RESPONSE_FORMAT schema; if the call
+    fails, classify_local() answers instead.
+
+    Returns:
+        {
+            "category": "Infrastructure",
+            "subcategory": "Roads",
+            "category_confidence": 0.87,
+            "department_probabilities": [
+                {"department": "Municipal Corporation - Roads", "probability": 1.0}
+            ]
+        }
+    """
+
+    if not text.strip():
+        return {
+            "category": "Infrastructure",
+            "subcategory": "Roads",
+            "category_confidence": 0.0
+        }
+
+    prompt = PROMPT_TEMPLATE.format(text=text)
+
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = _client.chat.completions.create(
-                model="gpt-4o-mini",
-                response_format={ "type": "json_object" },
+            response = chat_completion(
+                "category_analysis",
+                model=MODEL,
+                response_format=RESPONSE_FORMAT,
                 messages=[
-                    {"role": "system", "content": "You are a JSON-only API. Output strict JSON."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.05,
-                max_tokens=200,
-            )
-
-            content = response.choices[0].message.content.strip()
-
-            result = json.loads(content)
-
-            # Validate category
-            valid_categories = list(CATEGORY_TAXONOMY.keys())
-            if result.get("category") not in valid_categories:
-                cat_lower = result.get("category", "").lower()
-                matched = False
-                for vc in valid_categories:
-                    if vc.lower() in cat_lower or cat_lower in vc.lower():
-                        result["category"] = vc
-                        matched = True
-                        break
-                if not matched:
-                    result["category"] = "Other"
-
-            # Validate subcategory
-            valid_subs = CATEGORY_TAXONOMY[result["category"]]["subcategories"]
-            if result.get("subcategory") not in valid_subs:
-                sub_lower = result.get("subcategory", "").lower()
-                matched = False
-                for vs in valid_subs:
-                    if vs.lower() in sub_lower or sub_lower in vs.lower():
-                        result["subcategory"] = vs
-                        matched = True
-                        break
-                if not matched:
-                    result["subcategory"] = valid_subs[0]
-
-            # Validate and fix departments
-            VALID_DEPTS = [
-                "Municipal Corporation - Roads",
-                "Electricity Board",
-                "Water Supply Department",
-                "Municipal Sanitation Department",
-                "Health Department",
-                "Police Department",
-                "Traffic Police Department",
-                "Environmental Authority",
-                "Animal Control Department",
-            ]
-            
-            depts = result.get("department_probabilities", [])
-            fixed_depts = []
-            for d in depts:
-                dept_name = d.get("department", "")
-                if dept_name not in VALID_DEPTS:
-                    # fuzzy match
-                    d_lower = dept_name.lower()
-                    for vd in VALID_DEPTS:
-                        if d_lower in vd.lower() or vd.lower() in d_lower:
-                            dept_name = vd
-                            break
-                    else:
-                        dept_name = "Health Department" if result.get("category") == "Animals & Pests" else "Municipal Corporation - Roads"
-                fixed_depts.append({"department": dept_name, "probability": float(d.get("probability", 1.0))})
-
-            if not fixed_depts:
-                dept_name = "Health Department" if result.get("category") == "Animals & Pests" else "Municipal Corporation - Roads"
-                fixed_depts = [{"department": dept_name, "probability": 1.0}]
-                
-            # Normalize probabilities
-            total = sum(d["probability"] for d in fixed_depts)
-            if total > 0:
-                for d in fixed_depts:
-                    d["probability"] = round(d["probability"] / total, 4)
-            else:
-                dept_name = "Health Department" if result.get("category") == "Animals & Pests" else "Municipal Corporation - Roads"
-                fixed_depts = [{"department": dept_name, "probability": 1.0}]
-            
-            result["department_probabilities"] = sorted(fixed_depts, key=lambda x: x["probability"], reverse=True)
-
-            result["category_confidence"] = round(
-                max(0.5, min(0.98, float(result.get("category_confidence", 0.8)))),
-                4
+                max_tokens=80,
+                timeout=call_timeout(15),
             )
 
-            return result
+            message = response.choices[0].message
+            if getattr(message, "refusal", None):
+                raise ValueError(f"model refused: {message.refusal}")
+            return decode_classification(json.loads(message.content))
 
         except Exception as e:
             error_str = str(e).lower()
-            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1:
+            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1 \
+                    and can_wait(15 * (attempt + 1)):
                 wait_time = 15 * (attempt + 1)
                 print(f"[CategoryClassifier] Rate limited, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})...")
                 time.sleep(wait_time)
             else:
                 print(f"[CategoryClassifier] OpenAI API error: {e}")
-                return {
-                    "category": "Infrastructure",
-                    "subcategory": "Roads",
-                    "category_confidence": 0.5,
-                    "department_probabilities": [{"department": "Municipal Corporation - Roads", "probability": 1.0}]
-                }
\ No newline at end of file
+                mark_degraded("category_analysis")
+                return classify_local(text)
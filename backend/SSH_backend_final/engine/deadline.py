@@ -0,0 +1,88 @@
+"""
+Deadline — End-to-End Time Budget for a Pipeline Run
+======================================================
+analyze_complaint() runs under a deadline (PIPELINE_DEADLINE_SECONDS,
+overridable per request with the X-Request-Deadline-Ms header). It is
+carried in a context variable, which the pipeline and translation thread
+pools copy into their tasks, so every LLM call can size its own timeout
+from what is left:
+
+  timeout=call_timeout(15)   → min(15s, remaining budget - safety margin)
+
+Once too little budget is left for a useful call, call_timeout() raises
+DeadlineExceeded and the stage takes its local fallback, which is then
+listed in the result's degraded_stages. Rate-limit retries only sleep if
+the budget still allows a call afterwards.
+
+Settings:
+  PIPELINE_DEADLINE_SECONDS      default budget per run (default 25; 0 = none)
+  PIPELINE_MAX_DEADLINE_SECONDS  cap on per-request overrides (default 120)
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+DEFAULT_DEADLINE = float(os.getenv("PIPELINE_DEADLINE_SECONDS", 25))
+MAX_DEADLINE = float(os.getenv("PIPELINE_MAX_DEADLINE_SECONDS", 120))
+
+# Kept back from each call's timeout for the work after it (parsing,
+# local stages, serialization)
+SAFETY_MARGIN = 0.25
+# Below this, an LLM call isn't worth starting
+MIN_CALL_SECONDS = 0.5
+
+# Absolute time.monotonic() deadline of the current run, or None
+_deadline = contextvars.ContextVar("pipeline_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting an LLM call the budget can no longer cover."""
+
+
+def resolve_deadline(requested_ms=None) -> float:
+    """Budget in seconds for a run: the per-request override (capped) or the default."""
+    if requested_ms is None:
+        return DEFAULT_DEADLINE
+    return min(max(0.0, requested_ms / 1000), MAX_DEADLINE)
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Run the block under a deadline `seconds` from now (None or 0: no deadline)."""
+    token = _deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current run's budget, or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(default: float) -> float:
+    """
+    Timeout for an LLM call: the stage's default, shortened to fit the budget.
+
+    Raises:
+        DeadlineExceeded: when less than MIN_CALL_SECONDS would be left.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    timeout = min(default, left - SAFETY_MARGIN)
+    if timeout < MIN_CALL_SECONDS:
+        raise DeadlineExceeded(f"{max(0.0, left):.2f}s left in the request deadline")
+    return timeout
+
+
+def can_wait(seconds: float) -> bool:
+    """True if sleeping `seconds` (e.g. a rate-limit backoff) still leaves room for a call."""
+    left = remaining()
+    return left is None or left - seconds - SAFETY_MARGIN >= MIN_CALL_SECONDS
@@ -13,6 +13,7 @@ Department Mappings:
   Law & Order → Police Department
   Transport → Traffic Police Department
   Environment → Environmental Authority
+  Animals & Pests → Animal Control Department
 """
 
 
@@ -26,6 +27,7 @@ DEPARTMENT_MAP = {
     "Law & Order": "Police Department",
     "Transport": "Traffic Police Department",
     "Environment": "Environmental Authority",
+    "Animals & Pests": "Animal Control Department",
 }
 
 # All departments
@@ -38,6 +40,7 @@ ALL_DEPARTMENTS = [
     "Police Department",
     "Traffic Police Department",
     "Environmental Authority",
+    "Animal Control Department",
 ]
 
 # Co-responsibility matrix — secondary departments that may also be involved
@@ -74,6 +77,10 @@ CO_RESPONSIBILITY = {
         ("Health Department", 0.08),
         ("Municipal Corporation - Roads", 0.06),
     ],
+    "Animals & Pests": [
+        ("Health Department", 0.10),
+        ("Municipal Sanitation Department", 0.05),
+    ],
 }
 
 
@@ -0,0 +1,205 @@
+"""
+Document Frequency — Corpus Term Statistics for Keyword Ranking
+=================================================================
+Counts, across every analyzed complaint, how many complaints each word
+appears in, so the keyword extractor can rank a complaint's words by
+TF-IDF: words that show up everywhere ("road", "area", "days") score low,
+words that set a complaint apart score high.
+
+- In memory: term → document count, plus pending increments
+- Persistent SQLite table (WAL, WITHOUT ROWID) shared by all workers on
+  the node. Pending increments are added to it (never overwritten) every
+  KEYWORD_DF_FLUSH_SECONDS by a background thread, then the merged
+  counts of all workers are read back.
+- Compact: terms seen in fewer than MIN_LOADED_DF complaints stay on disk
+  only; unseen and once-seen terms get practically the same IDF anyway.
+- A complaint analyzed twice in a row (preliminary triage, coalesced
+  retries, reanalysis) is counted once.
+
+Paths:
+  KEYWORD_DF_PATH           (default models/keyword_df.db)
+  KEYWORD_DF_FLUSH_SECONDS  (default 30)
+"""
+
+import atexit
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = _BASE_DIR / "models" / "keyword_df.db"
+FLUSH_SECONDS = float(os.getenv("KEYWORD_DF_FLUSH_SECONDS", 30))
+
+# Terms below this document count are left out of the in-memory table
+MIN_LOADED_DF = 2
+# Recently counted complaints (by text digest), to count each one once
+RECENT_DOCUMENTS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS document_frequency (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_frequency_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_ADD_DF = """
+INSERT INTO document_frequency (term, df) VALUES (?, ?)
+ON CONFLICT (term) DO UPDATE SET df = df + excluded.df
+"""
+
+_ADD_DOCUMENTS = """
+INSERT INTO document_frequency_meta (key, value) VALUES ('documents', ?)
+ON CONFLICT (key) DO UPDATE SET value = value + excluded.value
+"""
+
+
+class DocumentFrequencyTable:
+    """Per-node document counts of terms, cached in memory and flushed periodically."""
+
+    def __init__(self, db_path, flush_seconds: float = FLUSH_SECONDS):
+        self.db_path = str(db_path)
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counts = {}       # term -> df as of the last refresh, plus pending
+        self._documents = 0
+        self._pending = {}      # term -> increments not yet in the database
+        self._pending_documents = 0
+        self._recent = OrderedDict()
+        self._flusher = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._refresh()
+
+    def _refresh(self):
+        """Reload the merged counts of every worker (plus our unflushed increments)."""
+        rows = self._conn.execute(
+            "SELECT term, df FROM document_frequency WHERE df >= ?", (MIN_LOADED_DF,)
+        ).fetchall()
+        row = self._conn.execute(
+            "SELECT value FROM document_frequency_meta WHERE key = 'documents'"
+        ).fetchone()
+        counts = dict(rows)
+        with self._lock:
+            for term, pending in self._pending.items():
+                counts[term] = counts.get(term, 0) + pending
+            self._counts = counts
+            self._documents = (row[0] if row else 0) + self._pending_documents
+
+    def add_document(self, text: str, terms) -> bool:
+        """
+        Count one complaint's distinct terms. Returns False if the same
+        text was already counted recently.
+        """
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            if digest in self._recent:
+                self._recent.move_to_end(digest)
+                return False
+            self._recent[digest] = None
+            if len(self._recent) > RECENT_DOCUMENTS:
+                self._recent.popitem(last=False)
+
+            for term in terms:
+                self._counts[term] = self._counts.get(term, 0) + 1
+                self._pending[term] = self._pending.get(term, 0) + 1
+            self._documents += 1
+            self._pending_documents += 1
+        self._ensure_flusher()
+        return True
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency: log((1 + N) / (1 + df)) + 1."""
+        return math.log((1 + self._documents) / (1 + self._counts.get(term, 0))) + 1
+
+    def document_ratio(self, term: str) -> float:
+        """Fraction of counted complaints containing the term."""
+        if not self._documents:
+            return 0.0
+        return self._counts.get(term, 0) / self._documents
+
+    @property
+    def documents(self) -> int:
+        return self._documents
+
+    def flush(self):
+        """Add pending increments to the database and read back everyone's counts."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                pending_documents, self._pending_documents = self._pending_documents, 0
+            if not pending_documents:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(_ADD_DF, pending.items())
+                    self._conn.execute(_ADD_DOCUMENTS, (pending_documents,))
+            except sqlite3.Error as e:
+                print(f"[DocumentFrequency] Flush failed, keeping {pending_documents} documents pending: {e}")
+                with self._lock:
+                    for term, count in pending.items():
+                        self._pending[term] = self._pending.get(term, 0) + count
+                    self._pending_documents += pending_documents
+                return
+            self._refresh()
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._flush_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="keyword-df", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": self._documents,
+                "terms_in_memory": len(self._counts),
+                "pending_documents": self._pending_documents,
+            }
+
+
+_table = None
+_table_checked = False
+_table_lock = threading.Lock()
+
+
+def get_document_frequency():
+    """Open (once per process) the node's document frequency table. None if it can't be opened."""
+    global _table, _table_checked
+    with _table_lock:
+        if _table_checked:
+            return _table
+
+        _table_checked = True
+        db_path = os.getenv("KEYWORD_DF_PATH") or str(DEFAULT_DB_PATH)
+        try:
+            _table = DocumentFrequencyTable(db_path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"[DocumentFrequency] Cannot open {db_path} ({e}); keywords rank by frequency only.")
+            return None
+        stats = _table.stats()
+        print(f"[DocumentFrequency] Loaded {stats['terms_in_memory']} terms over {stats['documents']} complaints.")
+        return _table
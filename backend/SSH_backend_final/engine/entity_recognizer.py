@@ -5,10 +5,23 @@ Uses spaCy's NER pipeline to extract location and landmark entities
 from complaint text.
 
 Model: en_core_web_sm (small English model)
+
+When a compiled gazetteer is available (see engine.gazetteer), known
+localities, wards, cities and landmarks are resolved from it first,
+with normalized names and coordinates. spaCy and the regex phases still
+run for the street-level detail the gazetteer doesn't hold ("MG Road",
+"... Nagar"), skipping what it already resolved.
+
+LANDMARK_KEYWORDS is the built-in list; the active rule pack
+(engine.rule_packs) may replace it and holds the compiled patterns.
 """
 
 import re
-import spacy
+
+from engine.gazetteer import get_gazetteer, normalize_name
+from engine.rule_packs import current_rules
+
+SPACY_MODEL = "en_core_web_sm"
 
 _nlp = None
 
@@ -19,14 +32,16 @@ def _ensure_model():
     if _nlp is not None:
         return
 
+    # Imported here: the rule packs import this module for LANDMARK_KEYWORDS
+    import spacy
     try:
-        _nlp = spacy.load("en_core_web_sm")
-        print("[EntityRecognizer] spaCy en_core_web_sm loaded successfully.")
+        _nlp = spacy.load(SPACY_MODEL)
+        print(f"[EntityRecognizer] spaCy {SPACY_MODEL} loaded successfully.")
     except OSError:
-        print("[EntityRecognizer] Downloading spaCy en_core_web_sm model...")
+        print(f"[EntityRecognizer] Downloading spaCy {SPACY_MODEL} model...")
         from spacy.cli import download
-        download("en_core_web_sm")
-        _nlp = spacy.load("en_core_web_sm")
+        download(SPACY_MODEL)
+        _nlp = spacy.load(SPACY_MODEL)
         print("[EntityRecognizer] Model loaded successfully.")
 
 
@@ -54,28 +69,61 @@ LOCATION_INDICATORS = [
 ]
 
 
+_KIND_RANK = {"city": 0, "locality": 1, "ward": 2, "landmark": 3}
+
+
 def recognize_entities(text: str) -> dict:
     """
     Extract location and landmark entities from complaint text.
 
-    Uses spaCy NER for GPE (geopolitical entity) and LOC (location),
-    supplemented with pattern matching for Indian location names.
+    Uses the gazetteer for known places, then spaCy NER for GPE
+    (geopolitical entity) and LOC (location), supplemented with pattern
+    matching for Indian location names.
 
     Returns:
         {
             "location": "MG Road, Bangalore",
-            "landmark": "near City Hospital"
+            "landmark": "near City Hospital",
+            "coordinates": {"lat": 12.9716, "lng": 77.5946}  # or None
         }
     """
-    _ensure_model()
-
-    doc = _nlp(text)
-
     locations = []
     landmarks = []
-
-    # Phase 1: spaCy NER extraction
+    cities = []
+    coordinates = None
+
+    # Phase 0: Gazetteer resolution (normalized names + coordinates)
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        for match in gazetteer.resolve(text):
+            if match["kind"] == "landmark":
+                landmarks.append(match["name"])
+            elif match["kind"] == "city":
+                cities.append(match["name"])
+            else:
+                locations.append(match["name"])
+            # Coordinates of the most specific place: landmark > ward > locality > city
+            if coordinates is None or _KIND_RANK[match["kind"]] > coordinates[0]:
+                coordinates = (_KIND_RANK[match["kind"]], {"lat": match["lat"], "lng": match["lng"]})
+
+    resolved = [f" {normalize_name(name)} " for name in locations + cities + landmarks]
+
+    def _already_resolved(candidate: str) -> bool:
+        """True if the gazetteer already resolved this place (same name, alias, or part of one)."""
+        if not resolved:
+            return False
+        key = f" {normalize_name(candidate)} "
+        if any(key in name for name in resolved):
+            return True
+        entry = gazetteer.lookup(candidate)
+        return entry is not None and f" {normalize_name(entry['name'])} " in resolved
+
+    # Phase 1: spaCy NER extraction (entities the gazetteer didn't resolve)
+    _ensure_model()
+    doc = _nlp(text)
     for ent in doc.ents:
+        if _already_resolved(ent.text):
+            continue
         if ent.label_ in ("GPE", "LOC"):
             locations.append(ent.text)
         elif ent.label_ in ("FAC", "ORG"):
@@ -83,30 +131,30 @@ def recognize_entities(text: str) -> dict:
             landmarks.append(ent.text)
 
     # Phase 2: Pattern matching for landmarks
-    text_lower = text.lower()
     for pattern in LANDMARK_PATTERNS:
         matches = re.findall(pattern, text, re.IGNORECASE)
         for match in matches:
             match = match.strip()
-            if match and len(match) > 2:
+            if match and len(match) > 2 and not _already_resolved(match):
                 landmarks.append(match)
 
     # Phase 3: Keyword matching for landmark types
-    for keyword in LANDMARK_KEYWORDS:
-        pattern = r'\b\w+\s+' + re.escape(keyword) + r'\b'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if match.strip() not in landmarks:
+    for pattern in current_rules().landmark_patterns:
+        for match in pattern.findall(text):
+            if match.strip() not in landmarks and not _already_resolved(match):
                 landmarks.append(match.strip())
 
-    # Phase 4: Location indicator matching
+    # Phase 4: Location indicator matching (streets, nagars, sectors, ...)
     for indicator in LOCATION_INDICATORS:
         pattern = r'\b\w+[\s-]+' + re.escape(indicator) + r'\b'
         matches = re.findall(pattern, text, re.IGNORECASE)
         for match in matches:
-            if match.strip() not in locations:
+            if match.strip() not in locations and not _already_resolved(match):
                 locations.append(match.strip())
 
+    # Most specific first: localities/wards and street-level matches, then cities
+    locations += cities
+
     # Deduplicate and pick best match
     location = ", ".join(dict.fromkeys(locations)) if locations else ""
     landmark = landmarks[0] if landmarks else ""
@@ -117,5 +165,6 @@ def recognize_entities(text: str) -> dict:
 
     return {
         "location": location,
-        "landmark": landmark
+        "landmark": landmark,
+        "coordinates": coordinates[1] if coordinates else None
     }
@@ -0,0 +1,242 @@
+"""
+Gazetteer — Memory-Mapped Indian Location Index
+=================================================
+Resolves localities, wards, cities and landmarks mentioned in complaint
+text to normalized names and coordinates.
+
+The gazetteer is compiled from a TSV source into a sorted string table
+(SSTable) that is opened with mmap: loading only maps the file, lookups
+binary-search it in place, and every worker process shares the same
+pages through the OS page cache.
+
+File layout (little-endian):
+  header   magic "GZT1" | u16 version | 2 pad | u32 count | u32 max_words
+  offsets  count × u32 absolute record offsets, in key order
+  records  u16 key_len | key (utf-8) | u8 kind | f32 lat | f32 lon
+           | u16 name_len | name (utf-8)
+
+Source TSV columns: name, kind, lat, lon[, aliases separated by "|"]
+
+Build with:
+  python -m engine.gazetteer build data/gazetteer_seed.tsv models/gazetteer.sst
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from pathlib import Path
+
+MAGIC = b"GZT1"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHxxII")
+_OFFSET = struct.Struct("<I")
+_KEY_LEN = struct.Struct("<H")
+_PAYLOAD = struct.Struct("<BffH")
+
+KINDS = ("city", "locality", "ward", "landmark")
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "models" / "gazetteer.sst"
+
+# Latin word characters plus the Indic script blocks (Devanagari … Sinhala),
+# whose vowel signs are not matched by \w on their own
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0DFF]+")
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, NFKC-normalize and collapse a name to space-separated tokens."""
+    return " ".join(_TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower()))
+
+
+class Gazetteer:
+    """Read-only view over a compiled gazetteer file."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count, self.max_words = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a v{VERSION} gazetteer file")
+
+        # Identifies the file's contents (used in stage version fingerprints),
+        # the same for identical builds on every replica
+        self.fingerprint = f"{self.count}:{hashlib.blake2b(self._mm, digest_size=8).hexdigest()}"
+
+    def close(self):
+        self._mm.close()
+
+    def _record_offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._mm, _HEADER.size + _OFFSET.size * i)[0]
+
+    def _key_at(self, i: int) -> bytes:
+        off = self._record_offset(i)
+        (key_len,) = _KEY_LEN.unpack_from(self._mm, off)
+        start = off + _KEY_LEN.size
+        return self._mm[start:start + key_len]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _record(self, i: int) -> dict:
+        off = self._record_offset(i)
+        (key_len,) = _KEY_LEN.unpack_from(self._mm, off)
+        off += _KEY_LEN.size + key_len
+        kind, lat, lon, name_len = _PAYLOAD.unpack_from(self._mm, off)
+        off += _PAYLOAD.size
+        return {
+            "name": self._mm[off:off + name_len].decode("utf-8"),
+            "kind": KINDS[kind],
+            "lat": round(lat, 5),
+            "lng": round(lon, 5),
+        }
+
+    def lookup(self, name: str):
+        """Exact lookup of a (normalized or raw) name. Returns a record dict or None."""
+        key = normalize_name(name).encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self.count and self._key_at(i) == key:
+            return self._record(i)
+        return None
+
+    def resolve(self, text: str) -> list:
+        """
+        Find gazetteer entries mentioned in free text.
+
+        Scans tokens left to right and keeps the longest match at each
+        position; matches never overlap. Extension of a candidate stops as
+        soon as no key starts with it, so most tokens cost one binary search.
+
+        Returns:
+            [{"name": "MG Road", "kind": "locality", "lat": 12.9756, "lng": 77.6066}, ...]
+        """
+        tokens = _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower())
+        matches = []
+        i = 0
+        while i < len(tokens):
+            best = None
+            candidate = b""
+            for j in range(i, min(len(tokens), i + self.max_words)):
+                candidate = (candidate + b" " if candidate else b"") + tokens[j].encode("utf-8")
+                pos = self._lower_bound(candidate)
+                if pos >= self.count:
+                    break
+                key = self._key_at(pos)
+                if key == candidate:
+                    best = (j, pos)
+                elif not key.startswith(candidate):
+                    break
+            if best is None:
+                i += 1
+            else:
+                matches.append(self._record(best[1]))
+                i = best[0] + 1
+        return matches
+
+
+def build_gazetteer(source_path, output_path) -> int:
+    """Compile a TSV source into a gazetteer file. Returns the number of keys written."""
+    entries = {}
+    with open(source_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.split("\t")
+            if len(cols) < 4:
+                raise ValueError(f"{source_path}:{line_no}: expected name, kind, lat, lon")
+            name, kind, lat, lon = cols[0].strip(), cols[1].strip(), float(cols[2]), float(cols[3])
+            if kind not in _KIND_CODES:
+                raise ValueError(f"{source_path}:{line_no}: unknown kind {kind!r}")
+            aliases = cols[4].split("|") if len(cols) > 4 and cols[4].strip() else []
+
+            for alias in [name] + aliases:
+                key = normalize_name(alias).encode("utf-8")
+                if not key:
+                    continue
+                if key in entries:
+                    print(f"[Gazetteer] Duplicate key {key.decode()!r} at line {line_no}, keeping first.")
+                    continue
+                entries[key] = (_KIND_CODES[kind], lat, lon, name.encode("utf-8"))
+
+    keys = sorted(entries)
+    max_words = max((key.count(b" ") + 1 for key in keys), default=1)
+
+    records = bytearray()
+    offsets = []
+    base = _HEADER.size + _OFFSET.size * len(keys)
+    for key in keys:
+        kind, lat, lon, name = entries[key]
+        offsets.append(base + len(records))
+        records += _KEY_LEN.pack(len(key)) + key
+        records += _PAYLOAD.pack(kind, lat, lon, len(name)) + name
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(keys), max_words))
+        for off in offsets:
+            f.write(_OFFSET.pack(off))
+        f.write(records)
+    # Atomic swap, so running workers keep their mapping of the old file
+    os.replace(tmp_path, output_path)
+    return len(keys)
+
+
+_gazetteer = None
+_gazetteer_checked = False
+
+
+def get_gazetteer():
+    """Open the shared gazetteer (GAZETTEER_PATH or models/gazetteer.sst). None if absent."""
+    global _gazetteer, _gazetteer_checked
+    if _gazetteer_checked:
+        return _gazetteer
+
+    _gazetteer_checked = True
+    path = os.getenv("GAZETTEER_PATH") or str(DEFAULT_PATH)
+    if not os.path.exists(path):
+        print(f"[Gazetteer] {path} not found; location resolution falls back to NER/patterns.")
+        return None
+
+    _gazetteer = Gazetteer(path)
+    print(f"[Gazetteer] Mapped {_gazetteer.count} entries from {path}.")
+    return _gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gazetteer tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Compile a TSV source into a gazetteer file")
+    build.add_argument("source")
+    build.add_argument("output", nargs="?", default=str(DEFAULT_PATH))
+
+    query = sub.add_parser("resolve", help="Resolve the locations mentioned in a text")
+    query.add_argument("text")
+    query.add_argument("--path", default=str(DEFAULT_PATH))
+
+    args = parser.parse_args()
+    if args.command == "build":
+        count = build_gazetteer(args.source, args.output)
+        print(f"[Gazetteer] Wrote {count} keys to {args.output}.")
+    else:
+        for match in Gazetteer(args.path).resolve(args.text):
+            print(match)
+
+
+if __name__ == "__main__":
+    main()
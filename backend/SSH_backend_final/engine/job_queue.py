@@ -0,0 +1,313 @@
+"""
+Job Queue — Severity-Aware Asynchronous Analysis
+==================================================
+Backs POST /analyze/async. A submitted complaint gets a job ID straight
+away plus a preliminary priority computed from the local, rule-based
+stages only (severity, keywords, entities → priority score, no LLM call).
+Worker threads then run the full pipeline, taking the most urgent job
+first, so a "live wire hanging near school" complaint does not wait for
+LLM capacity behind hundreds of garbage-collection complaints.
+
+Jobs live in the node's SQLite job store (engine.job_store), so they
+survive restarts and are shared by every worker process; this module
+decides the order and runs them. A finished job's optional webhook is
+POSTed its result, retried with exponential backoff; webhook URLs must
+pass engine.webhook_guard, at submission and again before each delivery.
+
+Ordering (anti-starvation aging):
+  Each job is ordered by its submit time minus a head start that grows
+  with its preliminary severity level and priority score. A Critical job
+  therefore overtakes everything submitted up to JOB_QUEUE_AGING_SECONDS
+  before it, while an old Low job still outranks any job submitted more
+  than that long after it — nothing waits forever.
+
+Settings:
+  JOB_QUEUE_WORKERS        pipeline runs in parallel (default 4)
+  JOB_QUEUE_AGING_SECONDS  head start of a Critical job (default 300)
+  JOB_QUEUE_MAX_PENDING    queued jobs before submissions are refused (default 10000)
+  JOB_QUEUE_POLL_SECONDS   idle workers' poll for other processes' jobs (default 0.5)
+  WEBHOOK_MAX_ATTEMPTS     deliveries tried before giving up (default 6)
+  WEBHOOK_TIMEOUT_SECONDS  per delivery (default 10)
+  WEBHOOK_ALLOWED_HOSTS    webhook host allowlist (see engine.webhook_guard)
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import httpx
+
+from engine.job_store import MAX_ATTEMPTS, STATUS_QUEUED, get_job_store
+from engine.pipeline import analyze_complaint
+from engine.priority_scorer import score_priority
+from engine.webhook_guard import WebhookRejected, check_webhook_url
+
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", 4))
+AGING_SECONDS = float(os.getenv("JOB_QUEUE_AGING_SECONDS", 300))
+MAX_PENDING = int(os.getenv("JOB_QUEUE_MAX_PENDING", 10000))
+POLL_SECONDS = float(os.getenv("JOB_QUEUE_POLL_SECONDS", 0.5))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", 6))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", 10))
+# Backoff between deliveries: 5s, 10s, 20s, ... capped at 10 minutes
+WEBHOOK_BACKOFF_BASE = 5
+WEBHOOK_BACKOFF_MAX = 600
+
+# Head start per preliminary severity level, as a fraction of AGING_SECONDS
+SEVERITY_HEADSTART = {
+    "Critical": 1.0,
+    "High": 0.5,
+    "Medium": 0.15,
+    "Low": 0.0,
+    "Minimal": 0.0,
+}
+# Extra head start for the preliminary priority score (0..1), so that
+# within a level the riskier location / keywords go first
+PRIORITY_HEADSTART = 0.1
+
+# Rule-based stages run at submit time
+PRELIMINARY_FIELDS = ["severity_analysis", "extracted_keywords", "entities"]
+
+# How long the MAX_PENDING check may reuse the last queued-jobs count
+_PENDING_COUNT_TTL = 1.0
+
+
+class QueueFull(Exception):
+    """Raised when MAX_PENDING jobs are already waiting."""
+
+
+def preliminary_priority(text: str) -> dict:
+    """
+    Local-only triage of a complaint: severity and a priority score
+    without the LLM stages (sentiment and category confidence count as 0).
+
+    Returns:
+        {
+            "severity_level": "Critical",
+            "severity_score": 5,
+            "priority_score": 0.71,
+            "risk_tier": "High"
+        }
+    """
+    local = analyze_complaint(text, PRELIMINARY_FIELDS)
+    severity = local["severity_analysis"]
+    entities = local["entities"]
+    priority = score_priority(
+        severity_score=severity.get("severity_score", 0),
+        sentiment_score=0.0,
+        category_confidence=0.0,
+        location=entities.get("location", ""),
+        landmark=entities.get("landmark", ""),
+        extracted_keywords=local["extracted_keywords"],
+    )
+    return {
+        "severity_level": severity.get("severity_level", "Minimal"),
+        "severity_score": severity.get("severity_score", 0),
+        "priority_score": priority.priority_score,
+        "risk_tier": priority.risk_tier,
+    }
+
+
+def schedule_key(submitted_at: float, preliminary: dict) -> float:
+    """Queue position: submit time minus the job's head start (lower runs first)."""
+    headstart = SEVERITY_HEADSTART.get(preliminary["severity_level"], 0.0)
+    headstart += PRIORITY_HEADSTART * preliminary["priority_score"]
+    return submitted_at - headstart * AGING_SECONDS
+
+
+class JobQueue:
+    """Runs stored analysis jobs, most urgent first, on a pool of worker threads."""
+
+    def __init__(self, workers: int = JOB_QUEUE_WORKERS, store=None):
+        self.workers = workers
+        self.store = store or get_job_store()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._pending = (0, 0.0)  # (queued-jobs count, when it was read)
+
+        # Updated by every worker thread; guarded by _lock
+        self._lock = threading.Lock()
+        self.running = 0
+        self._wait_stats = {}  # severity level -> [jobs started, total wait, max wait]
+
+    def start(self):
+        """Start the analysis workers and the webhook sender (idempotent)."""
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                self._spawn(self._work, f"analysis-job-{i}")
+            self._spawn(self._deliver_webhooks, "analysis-webhooks")
+        print(f"[JobQueue] Started {self.workers} analysis workers.")
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, text: str, preliminary: dict, webhook_url: str = None) -> dict:
+        """
+        Persist a complaint for full analysis; returns once the job is durable.
+
+        Raises:
+            QueueFull: when MAX_PENDING jobs are already queued.
+            WebhookRejected: when webhook_url is not an allowed target.
+        """
+        if webhook_url:
+            check_webhook_url(webhook_url)
+        queued, read_at = self._pending
+        if time.time() - read_at > _PENDING_COUNT_TTL:
+            queued = self.store.count_queued()
+            self._pending = (queued, time.time())
+        if queued >= MAX_PENDING:
+            raise QueueFull(f"{queued} jobs already queued")
+
+        self.start()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self.store.enqueue(
+            job_id, text, preliminary, schedule_key(now, preliminary), now, webhook_url
+        )
+        with self._wakeup:
+            self._wakeup.notify()
+        return {"job_id": job_id, "status": STATUS_QUEUED, "preliminary": preliminary}
+
+    def get(self, job_id: str):
+        """A job's status and result, or None if unknown or expired."""
+        return self.store.get(job_id)
+
+    def _work(self):
+        while True:
+            try:
+                job = self.store.claim()
+            except Exception as e:
+                print(f"[JobQueue] Claim failed: {e}")
+                job = None
+            if job is None:
+                # Local submissions wake us at once; other processes' are polled
+                with self._wakeup:
+                    self._wakeup.wait(POLL_SECONDS)
+                continue
+            self._run(job)
+
+    def _run(self, job: dict):
+        job_id = job["job_id"]
+        if job["attempts"] > MAX_ATTEMPTS:
+            # Its earlier runs never finished (worker crash or restart)
+            self.store.finish(job_id, error=f"Abandoned after {MAX_ATTEMPTS} attempts")
+            return
+
+        with self._lock:
+            self._record_wait(job)
+            self.running += 1
+        try:
+            result = analyze_complaint(job["text"])
+            result["processing_time_ms"] = round((time.time() - job["started_at"]) * 1000, 2)
+            result.setdefault("recomputed_stages", [])
+            error = None
+        except Exception as e:
+            print(f"[JobQueue] Job {job_id} failed: {e}")
+            result, error = None, f"Pipeline error: {str(e)}"
+        finally:
+            with self._lock:
+                self.running -= 1
+
+        try:
+            self.store.finish(job_id, result=result, error=error)
+        except Exception as e:
+            # The lease expires and another worker re-runs the job
+            print(f"[JobQueue] Could not store result of job {job_id}: {e}")
+
+    def _deliver_webhooks(self):
+        client = httpx.Client(timeout=WEBHOOK_TIMEOUT, follow_redirects=False)
+        while True:
+            try:
+                # A retry slot is reserved before sending, so a crash mid-delivery retries
+                delivery = self.store.claim_webhook(retry_in=WEBHOOK_BACKOFF_BASE)
+            except Exception as e:
+                print(f"[JobQueue] Webhook claim failed: {e}")
+                delivery = None
+            if delivery is None:
+                time.sleep(POLL_SECONDS)
+                continue
+            self._send_webhook(client, delivery)
+
+    def _send_webhook(self, client: httpx.Client, delivery: dict):
+        payload = {
+            "job_id": delivery["job_id"],
+            "status": delivery["status"],
+            "preliminary": delivery["preliminary"],
+            "result": delivery["result"],
+            "error": delivery["error"],
+        }
+        attempt = delivery["webhook_attempts"]
+        try:
+            check_webhook_url(delivery["webhook_url"])
+        except WebhookRejected as e:
+            print(f"[JobQueue] Webhook for job {delivery['job_id']} not sent: {e}")
+            self.store.webhook_finished(delivery["job_id"], delivered=False)
+            return
+        try:
+            response = client.post(delivery["webhook_url"], json=payload)
+            response.raise_for_status()
+            self.store.webhook_finished(delivery["job_id"], delivered=True)
+            return
+        except Exception as e:
+            print(f"[JobQueue] Webhook for job {delivery['job_id']} failed (attempt {attempt}): {str(e).splitlines()[0]}")
+
+        if attempt >= WEBHOOK_MAX_ATTEMPTS:
+            self.store.webhook_finished(delivery["job_id"], delivered=False)
+        else:
+            delay = min(WEBHOOK_BACKOFF_MAX, WEBHOOK_BACKOFF_BASE * 2 ** attempt)
+            self.store.retry_webhook(delivery["job_id"], delay)
+
+    def _record_wait(self, job: dict):
+        """Add a started job's wait to the stats (caller holds _lock)."""
+        waited = job["started_at"] - job["submitted_at"]
+        stats = self._wait_stats.setdefault(job["preliminary"]["severity_level"], [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+
+    def stats(self) -> dict:
+        """
+        Job counts are node-wide (from the store); running and wait times
+        are for this worker process.
+
+        Returns:
+            {
+                "jobs": {"queued": 240, "running": 8, "done": 1830, "failed": 2},
+                "running_here": 4,
+                "wait_ms": {
+                    "Critical": {"jobs": 12, "avg": 850.0, "max": 2100.0},
+                    "Low": {"jobs": 900, "avg": 61000.0, "max": 240000.0}
+                }
+            }
+        """
+        with self._lock:
+            running = self.running
+            wait_stats = {level: tuple(stats) for level, stats in self._wait_stats.items()}
+        return {
+            "jobs": self.store.counts(),
+            "running_here": running,
+            "wait_ms": {
+                level: {
+                    "jobs": jobs,
+                    "avg": round(total / jobs * 1000, 2),
+                    "max": round(peak * 1000, 2),
+                }
+                for level, (jobs, total, peak) in wait_stats.items()
+            },
+        }
+
+
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """The process-wide job queue, over the node's shared job store."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
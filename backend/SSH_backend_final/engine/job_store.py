@@ -0,0 +1,341 @@
+"""
+Job Store — Durable Async Analysis Jobs
+=========================================
+SQLite (WAL mode) store behind the async analysis queue, so queued jobs,
+results and pending webhook callbacks survive a worker restart. Every
+worker process on the node opens the same database file; no external
+broker is needed.
+
+- Enqueues and completions go through one writer thread per process
+  that commits them in batches (group commit): a burst of submissions
+  shares a single fsync, and each caller returns once its job is durable
+- Workers claim jobs with a single atomic UPDATE ... RETURNING, lowest
+  schedule_key first, so two processes never run the same job
+- A claimed job holds a lease; if its process dies the lease expires
+  and another worker picks the job up again (up to JOB_MAX_ATTEMPTS)
+- Webhook callbacks are stored with the job and delivered with
+  exponential backoff, also surviving restarts
+
+States: queued → running → done | failed
+
+Paths:
+  JOB_STORE_PATH           (default models/jobs.db)
+  JOB_STORE_BATCH_MS       max wait before a batch is committed (default 5)
+  JOB_LEASE_SECONDS        run time before a job is presumed lost (default 300)
+  JOB_MAX_ATTEMPTS         runs before a lost job is marked failed (default 3)
+  JOB_STORE_RETENTION_HOURS  finished jobs kept for lookup (default 72)
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import orjson
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = _BASE_DIR / "models" / "jobs.db"
+
+BATCH_SECONDS = float(os.getenv("JOB_STORE_BATCH_MS", 5)) / 1000
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 300))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+RETENTION_SECONDS = float(os.getenv("JOB_STORE_RETENTION_HOURS", 72)) * 3600
+
+# Largest number of writes committed in one transaction
+_MAX_BATCH = 1000
+# How often the writer thread purges expired jobs
+_PURGE_INTERVAL = 600
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+WEBHOOK_PENDING = "pending"
+WEBHOOK_DELIVERED = "delivered"
+WEBHOOK_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    schedule_key REAL NOT NULL,
+    text TEXT,
+    preliminary BLOB NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    error TEXT,
+    webhook_url TEXT,
+    webhook_status TEXT,
+    webhook_attempts INTEGER NOT NULL DEFAULT 0,
+    webhook_next_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_schedule ON jobs (status, schedule_key);
+CREATE INDEX IF NOT EXISTS jobs_by_webhook ON jobs (webhook_status, webhook_next_at);
+CREATE INDEX IF NOT EXISTS jobs_by_finished ON jobs (finished_at);
+"""
+
+_INSERT = """
+INSERT INTO jobs (job_id, status, schedule_key, text, preliminary, submitted_at,
+                  webhook_url, webhook_status)
+VALUES (?, 'queued', ?, ?, ?, ?, ?, NULL)
+"""
+
+# The subquery and the update run under one write lock, so a job is
+# handed to exactly one worker across all processes. The two branches
+# each walk the (status, schedule_key) index; a single OR would scan.
+_CLAIM = """
+UPDATE jobs SET status = 'running', started_at = ?, lease_until = ?, attempts = attempts + 1
+WHERE job_id = (
+    SELECT job_id FROM (
+        SELECT * FROM (
+            SELECT job_id, schedule_key FROM jobs
+            WHERE status = 'queued' ORDER BY schedule_key LIMIT 1
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT job_id, schedule_key FROM jobs
+            WHERE status = 'running' AND lease_until < ? ORDER BY schedule_key LIMIT 1
+        )
+    )
+    ORDER BY schedule_key LIMIT 1
+)
+RETURNING job_id, text, preliminary, submitted_at, attempts
+"""
+
+# Guarded by status so a job whose lease expired and was re-claimed
+# elsewhere is only finished once
+_FINISH = """
+UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, text = NULL,
+                lease_until = NULL,
+                webhook_status = CASE WHEN webhook_url IS NULL THEN NULL ELSE 'pending' END,
+                webhook_next_at = ?
+WHERE job_id = ? AND status = 'running'
+"""
+
+_CLAIM_WEBHOOK = """
+UPDATE jobs SET webhook_next_at = ?, webhook_attempts = webhook_attempts + 1
+WHERE job_id = (
+    SELECT job_id FROM jobs
+    WHERE webhook_status = 'pending' AND webhook_next_at <= ?
+    ORDER BY webhook_next_at LIMIT 1
+)
+RETURNING job_id, status, preliminary, result, error, webhook_url, webhook_attempts
+"""
+
+_PURGE = "DELETE FROM jobs WHERE finished_at < ? AND (webhook_status IS NULL OR webhook_status != 'pending')"
+
+
+class JobStore:
+    """SQLite-backed async job table shared by every worker process on the node."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._writes = queue.Queue()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="job-store-writer", daemon=True)
+        self._writer.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not shared."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ─── Batched Writes ───────────────────────────────────
+
+    def _write(self, sql: str, params: tuple):
+        """Queue a write for the next batch and block until it is committed."""
+        done = threading.Event()
+        op = [sql, params, done, None]
+        self._writes.put(op)
+        done.wait()
+        if op[3] is not None:
+            raise op[3]
+
+    def _write_loop(self):
+        conn = self._conn()
+        next_purge = time.time() + _PURGE_INTERVAL
+        while True:
+            try:
+                batch = [self._writes.get(timeout=_PURGE_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            # Let concurrent writers join the batch for a few ms
+            deadline = time.monotonic() + BATCH_SECONDS
+            while batch and len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._writes.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit_batch(conn, batch)
+            if time.time() >= next_purge:
+                next_purge = time.time() + _PURGE_INTERVAL
+                try:
+                    conn.execute(_PURGE, (time.time() - RETENTION_SECONDS,))
+                except sqlite3.Error as e:
+                    print(f"[JobStore] Purge failed: {e}")
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: list):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op in batch:
+                try:
+                    conn.execute(op[0], op[1])
+                except sqlite3.IntegrityError as e:
+                    # Only this write fails; the rest of the batch still commits
+                    op[3] = e
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"[JobStore] Batch of {len(batch)} writes failed: {e}")
+            for op in batch:
+                op[3] = op[3] or e
+        for op in batch:
+            op[2].set()
+
+    # ─── Jobs ─────────────────────────────────────────────
+
+    def enqueue(self, job_id: str, text: str, preliminary: dict, schedule_key: float,
+                submitted_at: float, webhook_url: str = None):
+        """Persist a queued job; returns once it is committed."""
+        self._write(_INSERT, (
+            job_id, schedule_key, text, orjson.dumps(preliminary), submitted_at, webhook_url,
+        ))
+
+    def claim(self):
+        """
+        Atomically take the most urgent queued (or abandoned) job.
+
+        Returns:
+            {"job_id", "text", "preliminary", "submitted_at", "started_at", "attempts"},
+            or None when nothing is waiting.
+        """
+        now = time.time()
+        # fetchall(): the write lock is held until the statement is fully stepped
+        rows = self._conn().execute(_CLAIM, (now, now + LEASE_SECONDS, now)).fetchall()
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "job_id": row[0],
+            "text": row[1],
+            "preliminary": orjson.loads(row[2]),
+            "submitted_at": row[3],
+            "started_at": now,
+            "attempts": row[4],
+        }
+
+    def finish(self, job_id: str, result: dict = None, error: str = None):
+        """Record a job's result (done) or error (failed) and schedule its webhook."""
+        now = time.time()
+        self._write(_FINISH, (
+            STATUS_FAILED if error is not None else STATUS_DONE,
+            now,
+            orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY) if result is not None else None,
+            error,
+            now,
+            job_id,
+        ))
+
+    def get(self, job_id: str):
+        """Public view of a job, or None if unknown or purged."""
+        row = self._conn().execute(
+            "SELECT job_id, status, preliminary, submitted_at, started_at, finished_at, "
+            "attempts, result, error, webhook_status FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "preliminary": orjson.loads(row[2]),
+            "submitted_at": row[3],
+            "started_at": row[4],
+            "finished_at": row[5],
+            "attempts": row[6],
+            "result": orjson.loads(row[7]) if row[7] is not None else None,
+            "error": row[8],
+            "webhook_status": row[9],
+        }
+
+    def counts(self) -> dict:
+        """Number of jobs per state, e.g. {"queued": 12, "running": 4, "done": 900, "failed": 1}."""
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys((STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def count_queued(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+
+    # ─── Webhooks ─────────────────────────────────────────
+
+    def claim_webhook(self, retry_in: float):
+        """
+        Take the next due webhook delivery. Its next attempt is pushed
+        retry_in seconds out up front, so a crash mid-delivery retries later.
+        """
+        now = time.time()
+        rows = self._conn().execute(_CLAIM_WEBHOOK, (now + retry_in, now)).fetchall()
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "preliminary": orjson.loads(row[2]),
+            "result": orjson.loads(row[3]) if row[3] is not None else None,
+            "error": row[4],
+            "webhook_url": row[5],
+            "webhook_attempts": row[6],
+        }
+
+    def retry_webhook(self, job_id: str, delay: float):
+        """Schedule the next delivery attempt delay seconds from now."""
+        self._write(
+            "UPDATE jobs SET webhook_next_at = ? WHERE job_id = ?", (time.time() + delay, job_id)
+        )
+
+    def webhook_finished(self, job_id: str, delivered: bool):
+        """Stop retrying a webhook: delivered, or out of attempts."""
+        self._write(
+            "UPDATE jobs SET webhook_status = ? WHERE job_id = ?",
+            (WEBHOOK_DELIVERED if delivered else WEBHOOK_FAILED, job_id),
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Open (once per process) the node's shared job store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore(os.getenv("JOB_STORE_PATH") or str(DEFAULT_DB_PATH))
+            print(f"[JobStore] Opened {_store.db_path}")
+        return _store
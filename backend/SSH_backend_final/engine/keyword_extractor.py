@@ -2,11 +2,19 @@
 Keyword Extractor
 ==================
 Extracts important risk-related keywords from the complaint text.
-Uses a curated risk/civic keyword list combined with basic frequency analysis.
+Uses a curated risk/civic keyword list combined with TF-IDF ranking of
+the remaining words against every complaint analyzed on the node
+(engine.document_frequency), so words common to all complaints
+("road", "area", "days") give way to the ones that set this one apart.
+
+RISK_KEYWORDS is the built-in list; the active rule pack
+(engine.rule_packs) may replace it and holds the compiled patterns.
 """
 
 import re
-from collections import Counter
+
+from engine.document_frequency import get_document_frequency
+from engine.rule_packs import current_rules
 
 # Risk-related keywords to look for
 RISK_KEYWORDS = {
@@ -64,6 +72,15 @@ STOP_WORDS = {
     "who", "whom", "please", "also", "about", "up",
 }
 
+# Phase 2 (TF-IDF) settings
+TFIDF_KEYWORDS = 10
+# Words in more than this fraction of complaints are never keywords...
+MAX_DOCUMENT_RATIO = 0.5
+# ...once the corpus has this many complaints to judge by
+MIN_DOCUMENTS = 50
+
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
 
 def extract_keywords(text: str) -> list:
     """
@@ -71,7 +88,9 @@ def extract_keywords(text: str) -> list:
 
     Strategy:
     1. Match against known risk keyword list
-    2. Extract remaining high-frequency meaningful words
+    2. Add the remaining words with the highest TF-IDF against the
+       corpus of analyzed complaints (plain frequency until it builds up),
+       and count this complaint into the corpus
 
     Returns:
         ["pothole", "accident", "injured", "MG Road"]
@@ -80,27 +99,42 @@ def extract_keywords(text: str) -> list:
     extracted = []
 
     # Phase 1: Match known risk keywords (longest first)
-    sorted_keywords = sorted(RISK_KEYWORDS, key=len, reverse=True)
-    for keyword in sorted_keywords:
+    for keyword, pattern in current_rules().risk_patterns:
         if keyword in text_lower:
-            escaped_kw = r'\s+'.join(re.escape(w) for w in keyword.split())
-            pattern = r'\b' + escaped_kw + r'\b'
-            if re.search(pattern, text_lower):
+            if pattern.search(text_lower):
                 extracted.append(keyword)
 
-    # Phase 2: Extract additional meaningful words via frequency
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text)
-    word_freq = Counter(w.lower() for w in words if w.lower() not in STOP_WORDS)
+    # Phase 2: One pass over the words for term frequencies and each
+    # term's first spelling (original case), in order of appearance
+    term_freq = {}
+    first_form = {}
+    for word in _WORD_RE.findall(text):
+        term = word.lower()
+        if term in STOP_WORDS:
+            continue
+        if term in term_freq:
+            term_freq[term] += 1
+        else:
+            term_freq[term] = 1
+            first_form[term] = word
+
+    # Rank by TF-IDF; ties keep the order of appearance
+    corpus = get_document_frequency()
+    if corpus is not None:
+        filter_common = corpus.documents >= MIN_DOCUMENTS
+        scored = [
+            (tf * corpus.idf(term), term) for term, tf in term_freq.items()
+            if not (filter_common and corpus.document_ratio(term) > MAX_DOCUMENT_RATIO)
+        ]
+        corpus.add_document(text_lower, term_freq.keys())
+    else:
+        scored = [(tf, term) for term, tf in term_freq.items()]
+    scored.sort(key=lambda item: -item[0])
 
-    # Add frequent words not already captured
     existing = set(kw.lower() for kw in extracted)
-    for word, freq in word_freq.most_common(10):
-        if word not in existing and word not in STOP_WORDS:
-            # Keep original case from text
-            for w in words:
-                if w.lower() == word:
-                    extracted.append(w)
-                    break
+    for _score, term in scored[:TFIDF_KEYWORDS]:
+        if term not in existing:
+            extracted.append(first_form[term])
 
     # Deduplicate while preserving order
     seen = set()
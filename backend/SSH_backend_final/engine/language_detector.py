@@ -9,20 +9,72 @@ import os
 import json
 import time
 from dotenv import load_dotenv
-from openai import OpenAI
-from engine.config import OPENAI_API_KEY
+from engine.deadline import call_timeout, can_wait
+from engine.llm_router import chat_completion
+from engine.token_budget import mark_degraded
 
-_client = None
+MODEL = "gpt-4o-mini"
 
+SYSTEM_PROMPT = "You are a JSON-only API. Output strict JSON."
 
-def _ensure_client():
-    """Initialize the OpenAI client."""
-    global _client
-    if _client is not None:
-        return
+PROMPT_TEMPLATE = """You are a language detection engine.
 
-    _client = OpenAI(api_key=OPENAI_API_KEY)
-    print("[LanguageDetector] OpenAI client initialized.")
+Detect the language of the following text:
+\"{text}\"
+
+Return ONLY a strict JSON object with:
+- "detected_language": The ISO 639-1 two-letter code for the detected language (e.g., "en", "hi", "te", "mr", "ta").
+- "confidence": A float between 0.0 and 1.0 indicating your confidence in the detection.
+
+Example:
+{{"detected_language": "en", "confidence": 0.99}}"""
+
+
+# Unicode blocks of the scripts complaints arrive in → ISO 639-1 code.
+# Devanagari is shared by Hindi and Marathi; it reads as Hindi here.
+_SCRIPT_RANGES = [
+    (0x0900, 0x097F, "hi"),  # Devanagari
+    (0x0980, 0x09FF, "bn"),  # Bengali
+    (0x0A00, 0x0A7F, "pa"),  # Gurmukhi
+    (0x0A80, 0x0AFF, "gu"),  # Gujarati
+    (0x0B00, 0x0B7F, "or"),  # Oriya
+    (0x0B80, 0x0BFF, "ta"),  # Tamil
+    (0x0C00, 0x0C7F, "te"),  # Telugu
+    (0x0C80, 0x0CFF, "kn"),  # Kannada
+    (0x0D00, 0x0D7F, "ml"),  # Malayalam
+    (0x0600, 0x06FF, "ur"),  # Arabic script
+]
+
+
+def detect_language_local(text: str) -> dict:
+    """
+    Script-based language guess, used when the API call fails or the
+    request deadline leaves no time for it. Romanized text reads as "en".
+
+    Returns:
+        {
+            "detected_language": "hi",
+            "confidence": 0.6
+        }
+    """
+    counts = {}
+    letters = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        code = ord(char)
+        for start, end, language in _SCRIPT_RANGES:
+            if start <= code <= end:
+                counts[language] = counts.get(language, 0) + 1
+                break
+
+    if not counts:
+        return {"detected_language": "en", "confidence": 0.5}
+    language, hits = max(counts.items(), key=lambda item: item[1])
+    if hits * 2 < letters:
+        return {"detected_language": "en", "confidence": 0.5}
+    return {"detected_language": language, "confidence": 0.6}
 
 
 def detect_language(text: str) -> dict:
@@ -35,7 +87,6 @@ def detect_language(text: str) -> dict:
             "confidence": 0.95
         }
     """
-    _ensure_client()
 
     if not text.strip():
         return {
@@ -43,31 +94,23 @@ def detect_language(text: str) -> dict:
             "confidence": 0.0
         }
 
-    prompt = f"""You are a language detection engine.
-
-Detect the language of the following text:
-\"{text}\"
-
-Return ONLY a strict JSON object with:
-- "detected_language": The ISO 639-1 two-letter code for the detected language (e.g., "en", "hi", "te", "mr", "ta").
-- "confidence": A float between 0.0 and 1.0 indicating your confidence in the detection.
-
-Example:
-{{"detected_language": "en", "confidence": 0.99}}"""
+    prompt = PROMPT_TEMPLATE.format(text=text)
 
     max_retries = 3
     for attempt in range(max_retries):
         try:
             print(f"[LanguageDetector] Sending request attempt {attempt+1}...")
-            response = _client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = chat_completion(
+                "language_detection",
+                model=MODEL,
                 response_format={ "type": "json_object" },
                 messages=[
-                    {"role": "system", "content": "You are a JSON-only API. Output strict JSON."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.0,
                 max_tokens=50,
+                timeout=call_timeout(10),
             )
             print(f"[LanguageDetector] Response received!")
 
@@ -85,13 +128,12 @@ Example:
 
         except Exception as e:
             error_str = str(e).lower()
-            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1:
+            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1 \
+                    and can_wait(5 * (attempt + 1)):
                 wait_time = 5 * (attempt + 1)
                 print(f"[LanguageDetector] Rate limited, waiting {wait_time}s...")
                 time.sleep(wait_time)
             else:
                 print(f"[LanguageDetector] OpenAI API error: {e}")
-                return {
-                    "detected_language": "en",
-                    "confidence": 0.5
-                }
+                mark_degraded("language_detection")
+                return detect_language_local(text)
@@ -0,0 +1,241 @@
+"""
+LLM Hedging — Per-Stage Latency Tracking and Hedged Requests
+==============================================================
+The LLM router (engine.llm_router) sends every stage's chat completions
+through LLMHedger.chat_completion(). It records each call's latency per stage, and for the stages that opt
+in it hedges: when a call has not returned within the stage's recent
+latency percentile, an identical request is sent, the first response
+wins and the other one is cancelled (its HTTP request is aborted).
+
+Hedges are capped by a token bucket per stage: every call earns
+LLM_HEDGE_MAX_RATIO of a hedge, so extra load stays below that
+fraction of calls even when a provider slows down across the board.
+
+Settings:
+  LLM_HEDGE_STAGES       comma-separated stages to hedge, or "all" (default none)
+  LLM_HEDGE_PERCENTILE   latency percentile that triggers a hedge (default 95)
+  LLM_HEDGE_MAX_RATIO    max hedges per call (default 0.05)
+  LLM_HEDGE_MIN_DELAY_MS never hedge sooner than this (default 100)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from openai import AsyncOpenAI
+
+HEDGE_STAGES = {
+    s.strip() for s in os.getenv("LLM_HEDGE_STAGES", "").split(",") if s.strip()
+}
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", 0.05))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", 100)) / 1000
+
+# Latencies kept per stage, and how many are needed before hedging
+LATENCY_WINDOW = 500
+MIN_SAMPLES = 30
+# Most hedges a stage can save up while calls are fast
+HEDGE_BURST = 5.0
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class StageLatency:
+    """
+    Recent latencies, hedge allowance and hedge counters of one stage.
+    Cancelled losers are not recorded, so percentiles are of completed calls.
+    """
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_capped = 0
+        self._allowance = HEDGE_BURST
+        self._threshold = None  # cached hedge delay, refreshed every few samples
+
+    def record(self, seconds: float):
+        self.latencies.append(seconds)
+        if len(self.latencies) % 10 == 0:
+            self._threshold = None
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None while there is too little data."""
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        if self._threshold is None:
+            self._threshold = max(
+                HEDGE_MIN_DELAY, _percentile(sorted(self.latencies), HEDGE_PERCENTILE)
+            )
+        return self._threshold
+
+    def earn(self):
+        self.calls += 1
+        self._allowance = min(HEDGE_BURST, self._allowance + HEDGE_MAX_RATIO)
+
+    def take_hedge(self) -> bool:
+        if self._allowance < 1.0:
+            self.hedges_capped += 1
+            return False
+        self._allowance -= 1.0
+        self.hedges_fired += 1
+        return True
+
+    def stats(self) -> dict:
+        ordered = sorted(self.latencies)
+        percentiles = {
+            f"p{p}_ms": round(_percentile(ordered, p) * 1000, 1) if ordered else None
+            for p in (50, 95, 99)
+        }
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            **percentiles,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_capped": self.hedges_capped,
+        }
+
+
+class LLMHedger:
+    """Routes chat completions, timing them and hedging the opted-in stages."""
+
+    def __init__(self, hedge_stages=HEDGE_STAGES):
+        self.hedge_stages = set(hedge_stages)
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._async_client = None  # for callers that don't bring their own
+
+    def _stage(self, stage: str) -> StageLatency:
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = StageLatency()
+            return self._stages[stage]
+
+    def hedges(self, stage: str) -> bool:
+        return "all" in self.hedge_stages or stage in self.hedge_stages
+
+    def _ensure_loop(self):
+        """Event loop thread for hedged calls (aborting a sync call isn't possible)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-hedging", daemon=True).start()
+            self._loop = loop
+            print("[LLMHedging] Event loop started for hedged stages.")
+
+    def _default_async_client(self):
+        with self._lock:
+            if self._async_client is None:
+                from engine.config import OPENAI_API_KEY
+                self._async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+            return self._async_client
+
+    def chat_completion(self, stage: str, client, async_client_factory=None, **kwargs):
+        """
+        Equivalent of client.chat.completions.create(**kwargs), timed per stage.
+
+        For hedged stages the call goes through the async client returned by
+        async_client_factory() (default: a shared OpenAI one) and is
+        duplicated if it runs past the stage's latency percentile.
+        """
+        stats = self._stage(stage)
+        with self._lock:
+            stats.earn()
+            delay = stats.hedge_delay() if self.hedges(stage) else None
+
+        if delay is None:
+            started = time.perf_counter()
+            try:
+                response = client.chat.completions.create(**kwargs)
+            except Exception:
+                with self._lock:
+                    stats.errors += 1
+                raise
+            with self._lock:
+                stats.record(time.perf_counter() - started)
+            return response
+
+        self._ensure_loop()
+        async_client = async_client_factory() if async_client_factory else self._default_async_client()
+        future = asyncio.run_coroutine_threadsafe(
+            self._hedged(async_client, stats, delay, kwargs), self._loop
+        )
+        return future.result()
+
+    async def _timed_call(self, async_client, stats: StageLatency, kwargs: dict):
+        started = time.perf_counter()
+        try:
+            response = await async_client.chat.completions.create(**kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        with self._lock:
+            stats.record(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, async_client, stats: StageLatency, delay: float, kwargs: dict):
+        primary = asyncio.ensure_future(self._timed_call(async_client, stats, kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            allowed = stats.take_hedge()
+        if not allowed:
+            return await primary
+
+        hedge = asyncio.ensure_future(self._timed_call(async_client, stats, kwargs))
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    # One failed attempt doesn't fail the call while the other runs
+                    error = error or task.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if task is hedge:
+                    with self._lock:
+                        stats.hedges_won += 1
+                return task.result()
+        raise error
+
+    def stats(self) -> dict:
+        """
+        Returns, per stage:
+            {
+                "translation": {
+                    "calls": 812, "errors": 1,
+                    "p50_ms": 640.2, "p95_ms": 1710.5, "p99_ms": 4210.0,
+                    "hedge_delay_ms": 1710.5,
+                    "hedges_fired": 31, "hedges_won": 22, "hedges_capped": 4
+                },
+                ...
+            }
+        """
+        with self._lock:
+            return {
+                stage: dict(stats.stats(), hedged=self.hedges(stage))
+                for stage, stats in self._stages.items()
+            }
+
+
+# Shared by every LLM stage in the process
+llm_hedger = LLMHedger()
@@ -0,0 +1,345 @@
+"""
+LLM Router — Per-Stage Routing over OpenAI-Compatible Endpoints
+=================================================================
+Every LLM stage sends its chat completions through chat_completion(),
+which picks an endpoint for the stage from a route table, e.g.:
+
+  {
+    "endpoints": {
+      "openai": {},
+      "local": {"base_url": "http://localhost:8080/v1", "api_key": "none",
+                "metered": false}
+    },
+    "stages": {
+      "language_detection": [
+        {"endpoint": "local", "model": "qwen2.5-7b-instruct", "weight": 3},
+        {"endpoint": "openai"}
+      ],
+      "sentiment_analysis": [{"endpoint": "local", "model": "qwen2.5-7b-instruct"}]
+    }
+  }
+
+Stages without an entry use the "default" entry if there is one, else the
+"openai" endpoint; a route's model defaults to the stage module's MODEL.
+Without a route table everything goes to OpenAI as before.
+
+Endpoint fields:
+  base_url     OpenAI-compatible API root (default: OpenAI)
+  api_key      key, or api_key_env naming the variable holding it
+               (default OPENAI_API_KEY)
+  metered      count the endpoint's tokens against the token budget
+               (default true; set false for self-hosted servers)
+
+Balancing: a call goes to the healthy route with the fewest outstanding
+requests per unit of weight, so an endpoint that slows down, and whose
+requests pile up, gets less traffic. A call failing with a timeout,
+connection error, 429 or 5xx is retried on the next route while the
+request deadline allows. LLM_ENDPOINT_FAILURES consecutive failures take
+an endpoint out of rotation (it is then only tried after the healthy
+ones) until its health probe (GET {base_url}/models) or a call succeeds.
+
+Settings:
+  LLM_ROUTES_PATH              route table JSON (default models/llm_routes.json)
+  LLM_ROUTES                   route table as inline JSON (overrides the file)
+  LLM_ENDPOINT_FAILURES        consecutive failures before ejecting (default 3)
+  LLM_HEALTH_INTERVAL_SECONDS  health probe interval (default 10)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+from openai import APIConnectionError, AsyncOpenAI, OpenAI
+
+from engine.deadline import call_timeout
+from engine.llm_hedging import llm_hedger
+from engine.token_budget import token_budget
+
+DEFAULT_ROUTES_PATH = Path(__file__).resolve().parent.parent / "models" / "llm_routes.json"
+DEFAULT_ENDPOINT = "openai"
+
+FAILURES_TO_EJECT = int(os.getenv("LLM_ENDPOINT_FAILURES", 3))
+HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL_SECONDS", 10))
+HEALTH_TIMEOUT = 5.0
+# Weight of the newest call in an endpoint's average latency
+LATENCY_EWMA_ALPHA = 0.2
+
+
+def _is_endpoint_failure(error: Exception) -> bool:
+    """Errors another endpoint might not have; anything else is the request's fault."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (APIConnectionError, TimeoutError, ConnectionError))
+
+
+class Endpoint:
+    """One OpenAI-compatible API: its clients, load and health."""
+
+    def __init__(self, name: str, base_url: str = None, api_key: str = None,
+                 api_key_env: str = "OPENAI_API_KEY", metered: bool = True):
+        self.name = name
+        self.base_url = base_url
+        self.metered = metered
+        self._api_key = api_key
+        self._api_key_env = api_key_env
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+
+        self.outstanding = 0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.latency_ewma = None
+
+    def api_key(self) -> str:
+        if self._api_key is not None:
+            return self._api_key
+        if self._api_key_env == "OPENAI_API_KEY":
+            from engine.config import OPENAI_API_KEY
+            return OPENAI_API_KEY
+        key = os.getenv(self._api_key_env)
+        if not key:
+            raise ValueError(f"{self._api_key_env} not found for LLM endpoint '{self.name}'")
+        return key
+
+    def client(self) -> OpenAI:
+        with self._lock:
+            if self._client is None:
+                self._client = OpenAI(api_key=self.api_key(), base_url=self.base_url)
+                print(f"[LLMRouter] Client initialized for endpoint '{self.name}'.")
+            return self._client
+
+    def async_client(self) -> AsyncOpenAI:
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = AsyncOpenAI(api_key=self.api_key(), base_url=self.base_url)
+            return self._async_client
+
+    def begin(self):
+        with self._lock:
+            self.outstanding += 1
+            self.calls += 1
+
+    def end(self, seconds: float = None, failed: bool = False):
+        with self._lock:
+            self.outstanding -= 1
+            if failed:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.healthy and self.consecutive_failures >= FAILURES_TO_EJECT:
+                    self.healthy = False
+                    print(f"[LLMRouter] Endpoint '{self.name}' ejected after {self.consecutive_failures} failures.")
+                return
+            self.consecutive_failures = 0
+            if not self.healthy:
+                self.healthy = True
+                print(f"[LLMRouter] Endpoint '{self.name}' answered again; back in rotation.")
+            if seconds is not None:
+                if self.latency_ewma is None:
+                    self.latency_ewma = seconds
+                else:
+                    self.latency_ewma += LATENCY_EWMA_ALPHA * (seconds - self.latency_ewma)
+
+    def probe(self, http: httpx.Client):
+        """GET {base_url}/models; ejects or restores the endpoint."""
+        base_url = self.base_url or "https://api.openai.com/v1"
+        try:
+            response = http.get(
+                base_url.rstrip("/") + "/models",
+                headers={"Authorization": f"Bearer {self.api_key()}"},
+            )
+            ok = response.status_code < 500
+        except Exception:
+            ok = False
+
+        with self._lock:
+            if ok and not self.healthy:
+                print(f"[LLMRouter] Endpoint '{self.name}' healthy again.")
+            elif not ok and self.healthy:
+                print(f"[LLMRouter] Endpoint '{self.name}' failed its health probe.")
+            self.healthy = ok
+            if ok:
+                self.consecutive_failures = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "base_url": self.base_url or "https://api.openai.com/v1",
+                "healthy": self.healthy,
+                "outstanding": self.outstanding,
+                "calls": self.calls,
+                "failures": self.failures,
+                "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            }
+
+
+class Route(NamedTuple):
+    endpoint: Endpoint
+    model: str = None  # None: the stage module's MODEL
+    weight: float = 1.0
+
+
+class LLMRouter:
+    """Chooses an endpoint per call and fails over between a stage's routes."""
+
+    def __init__(self, table: dict = None):
+        table = table or {}
+        self.endpoints = {
+            name: Endpoint(name, **spec) for name, spec in table.get("endpoints", {}).items()
+        }
+        self.endpoints.setdefault(DEFAULT_ENDPOINT, Endpoint(DEFAULT_ENDPOINT))
+
+        self.routes = {}
+        for stage, routes in table.get("stages", {}).items():
+            self.routes[stage] = []
+            for route in routes:
+                if route["endpoint"] not in self.endpoints:
+                    raise ValueError(f"Stage '{stage}' routes to unknown LLM endpoint '{route['endpoint']}'")
+                weight = float(route.get("weight", 1.0))
+                if weight <= 0:
+                    raise ValueError(f"Stage '{stage}' has a non-positive weight for '{route['endpoint']}'")
+                self.routes[stage].append(
+                    Route(self.endpoints[route["endpoint"]], route.get("model"), weight)
+                )
+        self._default_routes = self.routes.get("default") or [Route(self.endpoints[DEFAULT_ENDPOINT])]
+
+        self._health_lock = threading.Lock()
+        self._health_thread = None
+
+    def _candidates(self, stage: str) -> list:
+        """The stage's routes in the order to try them: healthy first, least loaded first."""
+        routes = self.routes.get(stage) or self._default_routes
+        healthy = [r for r in routes if r.endpoint.healthy]
+        ejected = [r for r in routes if not r.endpoint.healthy]
+        load = lambda r: ((r.endpoint.outstanding + 1) / r.weight, random.random())
+        # With every endpoint ejected, keep trying rather than failing outright
+        return sorted(healthy, key=load) + sorted(ejected, key=load)
+
+    def _ensure_health_checks(self):
+        if len(self.endpoints) < 2 or HEALTH_INTERVAL <= 0:
+            return
+        with self._health_lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(
+                target=self._check_health, name="llm-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _check_health(self):
+        http = httpx.Client(timeout=HEALTH_TIMEOUT)
+        while True:
+            for endpoint in list(self.endpoints.values()):
+                endpoint.probe(http)
+            time.sleep(HEALTH_INTERVAL)
+
+    def chat_completion(self, stage: str, **kwargs):
+        """
+        client.chat.completions.create(**kwargs) on the stage's best endpoint,
+        with kwargs["model"] replaced by the route's model if it names one.
+        Token usage is recorded against the budget for metered endpoints.
+        """
+        self._ensure_health_checks()
+        default_model = kwargs.pop("model")
+        error = None
+
+        for attempt, route in enumerate(self._candidates(stage)):
+            if attempt:
+                if kwargs.get("timeout") is not None:
+                    # Raises DeadlineExceeded once the budget can't cover another try
+                    kwargs["timeout"] = call_timeout(kwargs["timeout"])
+                print(f"[LLMRouter] {stage}: failing over to '{route.endpoint.name}' after: {error}")
+
+            endpoint = route.endpoint
+            model = route.model or default_model
+            endpoint.begin()
+            started = time.perf_counter()
+            try:
+                response = llm_hedger.chat_completion(
+                    stage, endpoint.client(), endpoint.async_client, model=model, **kwargs
+                )
+            except Exception as e:
+                failed = _is_endpoint_failure(e)
+                endpoint.end(failed=failed)
+                if not failed:
+                    raise
+                error = e
+                continue
+
+            endpoint.end(seconds=time.perf_counter() - started)
+            if endpoint.metered:
+                token_budget.record(stage, model, response.usage)
+            return response
+
+        raise error
+
+    def route_versions(self, stage: str, default_model: str) -> list:
+        """
+        What the stage's routes would change about its output: endpoint,
+        API root, model and weight of each (not their health or load).
+        """
+        routes = self.routes.get(stage) or self._default_routes
+        return sorted(
+            [r.endpoint.name, r.endpoint.base_url or "", r.model or default_model, r.weight]
+            for r in routes
+        )
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            {
+                "endpoints": {
+                    "local": {"base_url": "http://localhost:8080/v1", "healthy": true,
+                              "outstanding": 2, "calls": 5120, "failures": 3,
+                              "latency_ewma_ms": 210.4},
+                    ...
+                },
+                "routes": {"language_detection": ["local", "openai"], ...}
+            }
+        """
+        return {
+            "endpoints": {name: e.stats() for name, e in self.endpoints.items()},
+            "routes": {
+                stage: [r.endpoint.name for r in routes] for stage, routes in self.routes.items()
+            },
+        }
+
+
+def load_route_table() -> dict:
+    """The route table from LLM_ROUTES or LLM_ROUTES_PATH; empty if neither is set up."""
+    inline = os.getenv("LLM_ROUTES")
+    if inline:
+        return json.loads(inline)
+    path = os.getenv("LLM_ROUTES_PATH") or str(DEFAULT_ROUTES_PATH)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    print(f"[LLMRouter] Loaded routes for {len(table.get('stages', {}))} stage(s) from {path}.")
+    return table
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> LLMRouter:
+    """The process-wide router, built from the configured route table."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter(load_route_table())
+        return _router
+
+
+def chat_completion(stage: str, **kwargs):
+    """Route one chat completion of a stage (see LLMRouter.chat_completion)."""
+    return get_llm_router().chat_completion(stage, **kwargs)
@@ -0,0 +1,632 @@
+"""
+Load Test — HTTP Load Generator with Saturation Curves
+========================================================
+Drives a running server step by step at increasing load and reports,
+per step, throughput, error rate and the latency distribution, then the
+saturation point: the highest load the server kept up with. Run it
+against a server backed by the mock LLM (engine.mock_llm) to measure the
+server itself rather than OpenAI.
+
+Workload models:
+- open:   requests arrive as a Poisson process at a fixed rate per step
+          (--rates 2,4,8 or --ramp 2:32:2 for start:stop:step req/s).
+          Latency includes queueing, as real traffic sees it; past
+          saturation, throughput flattens below the offered rate.
+- closed: a fixed number of virtual users per step (--users 1,2,4,8),
+          each sending its next request when the last one finished
+          (plus an exponential --think-ms). Past saturation, more users
+          add latency but no throughput.
+
+Targets, mixed by weight with --mix (default analyze=1):
+  analyze   POST /analyze
+  fields    POST /analyze?fields=severity_analysis,extracted_keywords,entities
+            (rule-based stages only, no LLM call)
+  report    POST /analyze/report, the PDF read to the end
+  async     POST /analyze/async, then GET the job until it is done (a job
+            not done within --step-seconds counts as an error)
+  export    POST /reports/export of --export-size analyses, the ZIP read to
+            the end
+Latency is to the last byte; for streamed targets the time to first byte
+is reported as well.
+
+Complaints: --complaints FILE, one per line or JSON lines with
+"complaint" and an optional "weight"; by default a built-in mix of short,
+long, English and Hindi complaints. Each request gets a unique reference
+appended (--no-unique to send them verbatim), so coalescing and exact
+caches don't serve the whole test from a handful of texts.
+
+Throughput counts a step's successful responses over the step plus the
+time the server needed, beyond a p90 request, to clear what was still
+outstanding when the step ended. The offered load is the actual arrival
+rate (open) or the number of users (closed).
+
+Saturation: a step is sustained when its error rate is at most
+--max-error-rate, its p99 is within --slo-ms (if given) and, in the open
+model, its throughput is at least --min-throughput-ratio of the offered
+rate; in the closed model, when adding users still raised throughput by
+at least --min-gain of the proportional gain. The saturation point is the
+last sustained step before the first one that is not. Steps should last
+well beyond the p99 latency (default 30s).
+
+Run with (spawning the mock LLM and a 4-worker server):
+  python -m engine.load_test --spawn --workers 4 --model open --ramp 2:40:2
+
+or against a server already running:
+  python -m engine.load_test --url http://localhost:8000 --model closed --users 1,2,4,8,16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import httpx
+
+from engine.job_store import STATUS_DONE, STATUS_FAILED
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+FIELDS_TARGET = "severity_analysis,extracted_keywords,entities"
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+SAMPLE_COMPLAINTS = [
+    ("There is a massive pothole on MG Road near City Hospital causing accidents daily.", 4),
+    ("Garbage has not been collected in Ward 12 for ten days and the stench is unbearable.", 3),
+    ("Live wire hanging from the electric pole outside Government School, children at risk "
+     "of electrocution.", 2),
+    ("Streetlight not working on 5th Cross, Indiranagar since last week.", 3),
+    ("Sewage overflow and contaminated water in our colony near the primary health centre. "
+     "Many residents have fallen sick with diarrhoea and fever over the past week. We have "
+     "complained to the ward office twice but nobody has come to inspect the pipeline. The "
+     "drain outside the school is also blocked and mosquitoes are breeding everywhere.", 1),
+    ("सड़क पर बड़ा गड्ढा है और रोज़ दुर्घटनाएं हो रही हैं, कृपया जल्दी ठीक करें।", 2),
+    ("Stray dogs near the bus stand bit two people this morning.", 1),
+]
+
+
+class Sample(NamedTuple):
+    target: str
+    started: float         # loop time the request was sent
+    latency: float         # seconds to the last byte
+    ttfb: float            # seconds to the first body byte (streamed targets), else None
+    status: int            # HTTP status, 0 for a client-side error or timeout
+    ok: bool
+    error: str = None
+
+
+def _weighted(spec: str) -> list:
+    """"analyze=8,report=1" → [("analyze", 8.0), ("report", 1.0)]."""
+    pairs = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        pairs.append((name, float(weight or 1)))
+    return pairs
+
+
+def load_complaints(path: str) -> list:
+    """[(complaint, weight), ...] from a text or JSON lines file."""
+    complaints = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                row = json.loads(line)
+                complaints.append((row["complaint"], float(row.get("weight", 1))))
+            else:
+                complaints.append((line, 1.0))
+    return complaints
+
+
+class Workload:
+    """What one request looks like: a target and complaint drawn from the mixes."""
+
+    def __init__(self, base_url: str, mix: list, complaints: list, export_size: int = 20,
+                 unique: bool = True, poll_seconds: float = 0.25, async_timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.unique = unique
+        self._sequence = 0
+        self.targets, self.target_weights = zip(*mix)
+        self.complaints, self.complaint_weights = zip(*complaints)
+        self.export_size = export_size
+        self.poll_seconds = poll_seconds
+        self.async_timeout = async_timeout  # seconds an async job may take
+        self.stored_analysis = None  # for export payloads, fetched by prepare()
+
+        unknown = set(self.targets) - set(self._senders())
+        if unknown:
+            raise ValueError(f"Unknown targets: {', '.join(sorted(unknown))}")
+
+    def _senders(self) -> dict:
+        return {
+            "analyze": self._analyze,
+            "fields": self._fields,
+            "report": self._report,
+            "async": self._async,
+            "export": self._export,
+        }
+
+    async def prepare(self, client: httpx.AsyncClient):
+        """Warm the server up and keep one analysis around for export payloads."""
+        for complaint in self.complaints:
+            response = await client.post(self.base_url + "/analyze", json={"complaint": complaint})
+            response.raise_for_status()
+            self.stored_analysis = response.json()
+
+    async def send(self, client: httpx.AsyncClient) -> Sample:
+        target = random.choices(self.targets, self.target_weights)[0]
+        complaint = random.choices(self.complaints, self.complaint_weights)[0]
+        if self.unique:
+            self._sequence += 1
+            complaint = f"{complaint} (Ref LT-{random.getrandbits(32):08x}-{self._sequence})"
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            status, ttfb = await self._senders()[target](client, complaint, started)
+        except (httpx.HTTPError, OSError, ValueError) as e:
+            return Sample(target, started, loop.time() - started, None, 0, False,
+                          f"{type(e).__name__}: {e}")
+        return Sample(target, started, loop.time() - started, ttfb, status, 200 <= status < 300)
+
+    async def _analyze(self, client, complaint, started):
+        response = await client.post(self.base_url + "/analyze", json={"complaint": complaint})
+        return response.status_code, None
+
+    async def _fields(self, client, complaint, started):
+        response = await client.post(
+            self.base_url + "/analyze", params={"fields": FIELDS_TARGET}, json={"complaint": complaint}
+        )
+        return response.status_code, None
+
+    async def _stream(self, client, started, path, payload):
+        loop = asyncio.get_running_loop()
+        ttfb = None
+        async with client.stream("POST", self.base_url + path, json=payload) as response:
+            async for _ in response.aiter_bytes():
+                if ttfb is None:
+                    ttfb = loop.time() - started
+            return response.status_code, ttfb
+
+    async def _report(self, client, complaint, started):
+        return await self._stream(client, started, "/analyze/report", {"complaint": complaint})
+
+    async def _export(self, client, complaint, started):
+        reports = [{"id": f"LOAD-{i}", "analysis": self.stored_analysis} for i in range(self.export_size)]
+        return await self._stream(client, started, "/reports/export", {"reports": reports, "format": "zip"})
+
+    async def _async(self, client, complaint, started):
+        response = await client.post(self.base_url + "/analyze/async", json={"complaint": complaint})
+        if response.status_code != 202:
+            return response.status_code, None
+        job_url = f"{self.base_url}/analyze/async/{response.json()['job_id']}"
+        loop = asyncio.get_running_loop()
+        while loop.time() - started < self.async_timeout:
+            await asyncio.sleep(self.poll_seconds)
+            job = await client.get(job_url)
+            if job.status_code != 200:
+                return job.status_code, None
+            status = job.json()["status"]
+            if status == STATUS_DONE:
+                return 200, None
+            if status == STATUS_FAILED:
+                return 500, None
+        raise TimeoutError(f"job not done after {self.async_timeout:g}s")
+
+
+# ─── Workload Models ──────────────────────────────────────
+
+async def run_open_step(client, workload: Workload, rate: float, seconds: float,
+                        max_in_flight: int) -> tuple:
+    """
+    Poisson arrivals at `rate` req/s for `seconds`. Requests that would
+    exceed max_in_flight are not sent and counted as dropped.
+    Returns (samples, dropped).
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    next_at = start
+    in_flight = set()
+    samples = []
+    dropped = 0
+
+    def finished(task):
+        in_flight.discard(task)
+        samples.append(task.result())
+
+    while True:
+        next_at += random.expovariate(rate)
+        if next_at - start >= seconds:
+            break
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+            continue
+        task = asyncio.create_task(workload.send(client))
+        in_flight.add(task)
+        task.add_done_callback(finished)
+
+    if in_flight:
+        await asyncio.wait(set(in_flight))
+    return samples, dropped
+
+
+async def run_closed_step(client, workload: Workload, users: int, seconds: float,
+                          think_seconds: float) -> tuple:
+    """`users` virtual users looping for `seconds`. Returns (samples, 0)."""
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + seconds
+    samples = []
+
+    async def user():
+        # Stagger the first requests over one think time
+        if think_seconds:
+            await asyncio.sleep(random.uniform(0, think_seconds))
+        while loop.time() < stop_at:
+            samples.append(await workload.send(client))
+            if think_seconds:
+                await asyncio.sleep(random.expovariate(1 / think_seconds))
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return samples, 0
+
+
+# ─── Step Statistics ──────────────────────────────────────
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def histogram(latencies_ms: list) -> dict:
+    """Counts per latency bucket, keyed by upper bound ("≤100ms", ..., ">30000ms")."""
+    counts = dict.fromkeys([f"≤{b}ms" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"], 0)
+    keys = list(counts)
+    for value in latencies_ms:
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                counts[keys[i]] += 1
+                break
+        else:
+            counts[keys[-1]] += 1
+    return counts
+
+
+def step_stats(load: float, samples: list, dropped: int, seconds: float, start: float,
+               model: str = "open") -> dict:
+    """
+    Returns:
+        {
+            "load": 8,
+            "offered": 8.05,
+            "sent": 161, "completed": 158, "errors": 2, "dropped": 0,
+            "error_rate": 0.0124,
+            "throughput_rps": 7.9,
+            "backlog_seconds": 0.0,
+            "latency_ms": {"p50": 812.4, "p90": 1203.0, "p95": 1380.2, "p99": 2210.7, "max": 2391.0},
+            "ttfb_ms": {"p50": 790.1, "p99": 2150.3},
+            "histogram": {"≤10ms": 0, ..., "≤1000ms": 120, ...},
+            "by_target": {"analyze": {"sent": 150, "errors": 2, "p50_ms": 801.2, "p99_ms": 2190.4}},
+            "error_samples": ["ReadTimeout: ..."]
+        }
+    """
+    ok = [s for s in samples if s.ok]
+    failed = [s for s in samples if not s.ok]
+    latencies = sorted(s.latency for s in ok)
+    # Time spent past the step clearing a backlog, beyond a normal (p90) request
+    overrun = max((s.started + s.latency for s in samples), default=start + seconds) - (start + seconds)
+    backlog = max(0.0, overrun - (_percentile(latencies, 90) or 0.0))
+    ttfbs = sorted(s.ttfb for s in ok if s.ttfb is not None)
+    attempts = len(samples) + dropped
+
+    by_target = {}
+    for target in sorted({s.target for s in samples}):
+        mine = [s for s in samples if s.target == target]
+        mine_ok = sorted(s.latency for s in mine if s.ok)
+        by_target[target] = {
+            "sent": len(mine),
+            "errors": sum(1 for s in mine if not s.ok),
+            "p50_ms": _ms(_percentile(mine_ok, 50)),
+            "p99_ms": _ms(_percentile(mine_ok, 99)),
+        }
+
+    return {
+        "load": load,
+        "offered": round(attempts / seconds, 2) if model == "open" else load,
+        "sent": len(samples),
+        "completed": len(ok),
+        "errors": len(failed),
+        "dropped": dropped,
+        "error_rate": round((len(failed) + dropped) / attempts, 4) if attempts else 0.0,
+        "throughput_rps": round(len(ok) / (seconds + backlog), 2),
+        "backlog_seconds": round(backlog, 2),
+        "latency_ms": {
+            f"p{q}": _ms(_percentile(latencies, q)) for q in (50, 90, 95, 99)
+        } | {"max": _ms(latencies[-1] if latencies else None)},
+        "ttfb_ms": {"p50": _ms(_percentile(ttfbs, 50)), "p99": _ms(_percentile(ttfbs, 99))} if ttfbs else None,
+        "histogram": histogram([s.latency * 1000 for s in ok]),
+        "by_target": by_target,
+        "error_samples": sorted({s.error or f"HTTP {s.status}" for s in failed})[:5],
+    }
+
+
+def find_saturation(steps: list, model: str, max_error_rate: float, slo_ms: float = None,
+                    min_throughput_ratio: float = 0.95, min_gain: float = 0.25) -> dict:
+    """
+    The last sustained step before the first one that is not (see the
+    module docstring), and why that one failed.
+
+    Returns:
+        {"saturated": true, "sustained_load": 12, "max_throughput_rps": 11.8,
+         "limit_load": 14, "reason": "throughput 12.1 rps < 95% of offered 14"}
+    """
+    previous = None
+    for step in steps:
+        reasons = []
+        if step["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {step['error_rate']:.1%} > {max_error_rate:.1%}")
+        p99 = step["latency_ms"]["p99"]
+        if slo_ms is not None and (p99 is None or p99 > slo_ms):
+            reasons.append(f"p99 {p99} ms > SLO {slo_ms:g} ms")
+        if model == "open" and step["throughput_rps"] < min_throughput_ratio * step["offered"]:
+            reasons.append(
+                f"throughput {step['throughput_rps']} rps < {min_throughput_ratio:.0%} of offered "
+                f"{step['offered']:g} req/s ({step['backlog_seconds']}s backlog)"
+            )
+        if model == "closed" and previous is not None and previous["throughput_rps"] > 0:
+            expected = previous["throughput_rps"] * (step["load"] / previous["load"] - 1)
+            gained = step["throughput_rps"] - previous["throughput_rps"]
+            if gained < min_gain * expected:
+                reasons.append(
+                    f"{step['load']:g} users added {gained:.2f} rps, under {min_gain:.0%} "
+                    f"of the {expected:.2f} rps proportional gain"
+                )
+        if reasons:
+            return {
+                "saturated": True,
+                "sustained_load": previous["load"] if previous else None,
+                "max_throughput_rps": previous["throughput_rps"] if previous else None,
+                "limit_load": step["load"],
+                "reason": "; ".join(reasons),
+            }
+        previous = step
+
+    return {
+        "saturated": False,
+        "sustained_load": previous["load"] if previous else None,
+        "max_throughput_rps": previous["throughput_rps"] if previous else None,
+        "limit_load": None,
+        "reason": "every step was sustained; raise the load to find the limit",
+    }
+
+
+# ─── Spawned Test Server ──────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} during startup")
+        try:
+            if httpx.get(url, timeout=2.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def spawn_stack(workers: int, latency_ms: float, jitter: float, error_rate: float) -> tuple:
+    """
+    Start the mock LLM and `uvicorn main:app --workers N` routed to it, on
+    free ports, with job and cache state in a scratch directory.
+    Returns (server base URL, [processes]).
+    """
+    from engine.mock_llm import route_table
+
+    mock_port, server_port = _free_port(), _free_port()
+    scratch = _BASE_DIR / "models" / "load_test"
+    scratch.mkdir(parents=True, exist_ok=True)
+    processes = []
+
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "engine.mock_llm", "--port", str(mock_port),
+         "--latency-ms", str(latency_ms), "--jitter", str(jitter), "--error-rate", str(error_rate)],
+        cwd=_BASE_DIR,
+    )
+    processes.append(mock)
+    _wait_until_up(f"http://127.0.0.1:{mock_port}/v1/models", mock)
+
+    env = dict(
+        os.environ,
+        LLM_ROUTES=json.dumps(route_table(mock_port)),
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "mock"),
+        JOB_STORE_PATH=str(scratch / "jobs.db"),
+        KEYWORD_DF_PATH=str(scratch / "keyword_df.db"),
+        TRANSLATION_MEMORY_PATH=str(scratch / "translation_memory.db"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(server_port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=_BASE_DIR, env=env,
+    )
+    processes.append(server)
+    base_url = f"http://127.0.0.1:{server_port}"
+    _wait_until_up(base_url + "/health", server)
+    return base_url, processes
+
+
+def stop_stack(processes: list):
+    for process in reversed(processes):
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ─── Runner ───────────────────────────────────────────────
+
+def _steps(args) -> list:
+    if args.model == "closed":
+        return [int(u) for u in args.users.split(",")]
+    if args.ramp:
+        start, stop, step = (float(v) for v in args.ramp.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 6) for i in range(count)]
+    return [float(r) for r in args.rates.split(",")]
+
+
+def print_step(step: dict, model: str):
+    unit = "users" if model == "closed" else "req/s"
+    lat = step["latency_ms"]
+    print(
+        f"[LoadTest] {step['load']:>7g} {unit}: {step['throughput_rps']:>7.2f} rps"
+        + (f" of {step['offered']:g}" if model == "open" else "") + "  "
+        f"err {step['error_rate']:>6.1%}  p50 {lat['p50']} ms  p95 {lat['p95']} ms  "
+        f"p99 {lat['p99']} ms  max {lat['max']} ms"
+        + (f"  (dropped {step['dropped']})" if step["dropped"] else "")
+    )
+    if step["ttfb_ms"]:
+        print(f"[LoadTest]          first byte p50 {step['ttfb_ms']['p50']} ms  p99 {step['ttfb_ms']['p99']} ms")
+    filled = {k: v for k, v in step["histogram"].items() if v}
+    if filled:
+        print("[LoadTest]          " + "  ".join(f"{k}:{v}" for k, v in filled.items()))
+    for error in step["error_samples"]:
+        print(f"[LoadTest]          error: {error}")
+
+
+async def run(args, base_url: str) -> dict:
+    complaints = load_complaints(args.complaints) if args.complaints else SAMPLE_COMPLAINTS
+    workload = Workload(base_url, _weighted(args.mix), complaints, args.export_size, args.unique,
+                        async_timeout=args.step_seconds)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        await workload.prepare(client)
+        steps = []
+        for load in _steps(args):
+            start = asyncio.get_running_loop().time()
+            if args.model == "open":
+                samples, dropped = await run_open_step(client, workload, load, args.step_seconds, args.max_in_flight)
+            else:
+                samples, dropped = await run_closed_step(
+                    client, workload, int(load), args.step_seconds, args.think_ms / 1000
+                )
+            step = step_stats(load, samples, dropped, args.step_seconds, start, args.model)
+            steps.append(step)
+            print_step(step, args.model)
+            if args.stop_on_saturation and find_saturation(
+                steps, args.model, args.max_error_rate, args.slo_ms,
+                args.min_throughput_ratio, args.min_gain,
+            )["saturated"]:
+                break
+            if args.cooldown_seconds:
+                await asyncio.sleep(args.cooldown_seconds)
+
+    return {
+        "url": base_url,
+        "model": args.model,
+        "workers": args.workers,
+        "mix": dict(_weighted(args.mix)),
+        "step_seconds": args.step_seconds,
+        "steps": steps,
+        "saturation": find_saturation(
+            steps, args.model, args.max_error_rate, args.slo_ms, args.min_throughput_ratio, args.min_gain
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step load test with saturation detection.")
+    target = parser.add_argument_group("server")
+    target.add_argument("--url", default="http://localhost:8000", help="Server under test")
+    target.add_argument("--spawn", action="store_true",
+                        help="Start the mock LLM and a server routed to it, then stop them afterwards")
+    target.add_argument("--workers", type=int, default=1,
+                        help="Server worker processes (used with --spawn; recorded in the report)")
+    target.add_argument("--mock-latency-ms", type=float, default=400.0)
+    target.add_argument("--mock-jitter", type=float, default=0.3)
+    target.add_argument("--mock-error-rate", type=float, default=0.0)
+
+    load = parser.add_argument_group("workload")
+    load.add_argument("--model", choices=("open", "closed"), default="open")
+    load.add_argument("--rates", default="1,2,4,8", help="Open model: req/s per step")
+    load.add_argument("--ramp", help="Open model: start:stop:step req/s (overrides --rates)")
+    load.add_argument("--users", default="1,2,4,8,16", help="Closed model: users per step")
+    load.add_argument("--think-ms", type=float, default=0.0, help="Closed model: mean think time")
+    load.add_argument("--step-seconds", type=float, default=30.0)
+    load.add_argument("--cooldown-seconds", type=float, default=2.0)
+    load.add_argument("--mix", default="analyze=1", help="Targets by weight, e.g. analyze=8,fields=1,report=1")
+    load.add_argument("--complaints", help="Complaint file (text lines, or JSON lines with complaint/weight)")
+    load.add_argument("--unique", action=argparse.BooleanOptionalAction, default=True,
+                      help="Append a unique reference to every complaint")
+    load.add_argument("--export-size", type=int, default=20, help="Analyses per /reports/export request")
+    load.add_argument("--timeout", type=float, default=60.0, help="Per-request client timeout (s)")
+    load.add_argument("--max-in-flight", type=int, default=1000,
+                      help="Open model: requests beyond this many outstanding are dropped")
+
+    saturation = parser.add_argument_group("saturation")
+    saturation.add_argument("--max-error-rate", type=float, default=0.01)
+    saturation.add_argument("--slo-ms", type=float, help="p99 latency objective")
+    saturation.add_argument("--min-throughput-ratio", type=float, default=0.95)
+    saturation.add_argument("--min-gain", type=float, default=0.25)
+    saturation.add_argument("--stop-on-saturation", action="store_true")
+
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.url
+    try:
+        if args.spawn:
+            base_url, processes = spawn_stack(
+                args.workers, args.mock_latency_ms, args.mock_jitter, args.mock_error_rate
+            )
+            print(f"[LoadTest] Server with {args.workers} worker(s) at {base_url}, LLM mocked "
+                  f"(median {args.mock_latency_ms:.0f} ms).")
+        report = asyncio.run(run(args, base_url))
+    finally:
+        stop_stack(processes)
+
+    result = report["saturation"]
+    unit = "users" if args.model == "closed" else "req/s"
+    if result["saturated"]:
+        print(f"[LoadTest] Saturation with {args.workers} worker(s): sustained "
+              f"{result['sustained_load']} {unit} ({result['max_throughput_rps']} rps); "
+              f"at {result['limit_load']:g} {unit}: {result['reason']}")
+    else:
+        print(f"[LoadTest] Not saturated up to {result['sustained_load']} {unit} "
+              f"({result['max_throughput_rps']} rps): {result['reason']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[LoadTest] Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Mock LLM — OpenAI-Compatible Stand-In for Load Tests
+======================================================
+A small chat-completions server that answers every pipeline stage's
+prompt with a well-formed reply after a configurable delay, so load
+tests exercise the real server (routing, deadlines, hedging, caches,
+rule-based stages) without OpenAI cost or rate limits.
+
+Replies come from the stages' own local fallbacks (script-based language
+guess, keyword classifier, sentiment lexicon, template summary);
+translation echoes its input. Latency is log-normally distributed around
+--latency-ms, and --error-rate of the calls fail with a 500 or 429.
+
+Point the server at it through the LLM router's route table:
+
+  LLM_ROUTES='{"endpoints": {"openai": {"base_url": "http://127.0.0.1:9100/v1",
+                                        "api_key": "mock", "metered": false}}}'
+
+Run with:
+  python -m engine.mock_llm --port 9100 --latency-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from engine.category_classifier import (
+    CATEGORY_CODES,
+    DEPARTMENT_CODES,
+    SUBCATEGORY_CODES,
+    classify_local,
+)
+from engine.language_detector import detect_language_local
+from engine.sentiment_analyzer import analyze_sentiment_local
+
+DEFAULT_PORT = 9100
+
+# The complaint is quoted on a line of its own, followed by a blank line
+_QUOTED_TEXT_RE = re.compile(r'\n"(.*?)"\n\n', re.DOTALL)
+# The classifier prompt quotes examples before its COMPLAINT section
+_COMPLAINT_SECTION_RE = re.compile(r"\nCOMPLAINT\n-+\n")
+_SEGMENTS_RE = re.compile(r"Sentences \(JSON array\):\n(.*?)\n\nReturn", re.DOTALL)
+_ANALYSIS_RE = re.compile(r"Analysis Data:\n(.*?)\n\nReturn", re.DOTALL)
+
+_SUBCATEGORY_CODE = {names: code for code, names in SUBCATEGORY_CODES.items()}
+_DEPARTMENT_CODE = {name: code for code, name in DEPARTMENT_CODES.items()}
+
+
+def _quoted_text(prompt: str) -> str:
+    section = _COMPLAINT_SECTION_RE.search(prompt)
+    match = _QUOTED_TEXT_RE.search(prompt, section.end() - 1 if section else 0)
+    return match.group(1) if match else prompt
+
+
+def _classification(prompt: str) -> dict:
+    local = classify_local(_quoted_text(prompt))
+    code = _SUBCATEGORY_CODE.get(
+        (local["category"], local["subcategory"]), CATEGORY_CODES["Other"] + "2"
+    )
+    depts = [
+        {"code": _DEPARTMENT_CODE[d["department"]], "p": d["probability"]}
+        for d in local["department_probabilities"] if d["department"] in _DEPARTMENT_CODE
+    ]
+    return {"sub": code, "conf": 0.9, "depts": depts or [{"code": "RD", "p": 1.0}]}
+
+
+def _translation(prompt: str) -> dict:
+    segments = _SEGMENTS_RE.search(prompt)
+    if segments:
+        return {"translations": json.loads(segments.group(1)), "translation_confidence": 0.95}
+    return {"translated_text": _quoted_text(prompt), "translation_confidence": 0.95}
+
+
+def _summary(prompt: str) -> str:
+    match = _ANALYSIS_RE.search(prompt)
+    data = json.loads(match.group(1)) if match else {}
+    return (
+        f"Complaint regarding {data.get('category', 'a civic issue')} "
+        f"({data.get('subcategory', 'general')}) with {data.get('severity_level', 'unknown')} "
+        f"severity and {data.get('risk_tier', 'unknown')} risk. "
+        f"Recommended routing: {', '.join(data.get('departments') or ['Unassigned'])}."
+    )
+
+
+def reply_for(body: dict) -> str:
+    """The message content a stage expects for this chat completion request."""
+    messages = body.get("messages") or []
+    system = messages[0]["content"] if messages else ""
+    prompt = messages[-1]["content"] if messages else ""
+    response_format = body.get("response_format") or {}
+
+    if response_format.get("type") == "json_schema":
+        return json.dumps(_classification(prompt))
+    if "Output plain text" in system:
+        return _summary(prompt)
+    if "language detection engine" in prompt:
+        return json.dumps(detect_language_local(_quoted_text(prompt)))
+    if "professional translator" in prompt:
+        return json.dumps(_translation(prompt))
+    if "sentiment analyzer" in prompt:
+        return json.dumps(analyze_sentiment_local(_quoted_text(prompt)))
+    return "{}"
+
+
+def create_app(latency_ms: float = 400.0, jitter: float = 0.3, error_rate: float = 0.0) -> FastAPI:
+    """
+    Args:
+        latency_ms: median reply delay
+        jitter: sigma of the log-normal delay (0 = constant)
+        error_rate: fraction of calls answered with a 500 or 429
+    """
+    app = FastAPI(title="Mock LLM")
+    calls = {"completions": 0, "errors": 0}
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return calls
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        calls["completions"] += 1
+        delay = latency_ms / 1000 * math.exp(random.gauss(0, jitter)) if jitter else latency_ms / 1000
+        await asyncio.sleep(delay)
+
+        if error_rate and random.random() < error_rate:
+            calls["errors"] += 1
+            status = random.choice((500, 429))
+            return JSONResponse(
+                {"error": {"message": "mock failure", "type": "server_error", "code": status}},
+                status_code=status,
+            )
+
+        content = reply_for(body)
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages") or []) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-mock-{calls['completions']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+def route_table(port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> dict:
+    """An LLM_ROUTES table sending every stage to the mock."""
+    return {
+        "endpoints": {
+            "openai": {"base_url": f"http://{host}:{port}/v1", "api_key": "mock", "metered": False}
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Median reply delay")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Log-normal sigma of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    args = parser.parse_args()
+
+    import uvicorn
+    print(f"[MockLLM] Serving on http://{args.host}:{args.port}/v1 "
+          f"(median {args.latency_ms:.0f} ms, jitter {args.jitter}, errors {args.error_rate:.1%})")
+    uvicorn.run(
+        create_app(args.latency_ms, args.jitter, args.error_rate),
+        host=args.host, port=args.port, log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
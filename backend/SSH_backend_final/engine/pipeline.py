@@ -88,7 +88,7 @@
 """
 Pipeline Orchestrator
 ======================
-Orchestrates all 8 NLP pipeline stages in sequence:
+Orchestrates the NLP pipeline stages:
 
 1. Language Detection (fastText)
 2. Translation (IndicTrans2 / dictionary fallback)
@@ -100,78 +100,406 @@ Orchestrates all 8 NLP pipeline stages in sequence:
 8. Department Routing (Rule + probability)
 
 Returns the strict JSON output defined by the system spec.
+
+Every result carries the version fingerprint of each stage
+(see engine.stage_versions), so reanalyze_complaint() can later
+re-run only the stages whose rules, prompts or models changed.
+
+Stages are declared in PIPELINE_STAGES with their inputs, outputs and
+cost class. analyze_complaint() runs only the stages the requested
+output fields need, in parallel wherever their inputs allow.
+
+Stage threads come from one pool shared by every run in the process
+(/analyze, the job queue, /reanalyze). Each run keeps at most
+PIPELINE_MAX_PARALLEL stages in flight, and the pool has room for
+PIPELINE_CONCURRENT_RUNS runs at that width, so a stage doesn't sit in
+the pool's queue behind other runs' stages, using up its deadline.
+
+LLM token spend is accounted by engine.token_budget. As the budget runs
+out, summary, sentiment and classification fall back to local
+implementations; results report their token usage and cost in
+"llm_usage" and any fallback stages in "degraded_stages".
+
+Category and sentiment results are reused for paraphrases of recently
+analyzed complaints (engine.semantic_cache).
+
+Each run has a deadline (engine.deadline); LLM calls size their timeouts
+from what is left of it, and a stage that runs out of time falls back
+locally and is listed in "degraded_stages" as well.
+
+The rule-based stages read their tables from the active rule pack
+(engine.rule_packs). A run is pinned to the pack active when it started,
+whose version is reported in "rule_pack_version".
+
+Settings:
+  PIPELINE_MAX_PARALLEL     stages one run executes at once (default 5,
+                            the widest level of PIPELINE_STAGES)
+  PIPELINE_CONCURRENT_RUNS  runs the stage pool is sized for (default:
+                            asyncio's default thread pool, which serves
+                            /analyze, plus JOB_QUEUE_WORKERS)
 """
 
+import contextvars
+import copy
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
 from engine.language_detector import detect_language
 from engine.translator import translate
-from engine.category_classifier import classify
-from engine.sentiment_analyzer import analyze_sentiment
+from engine.category_classifier import classify, classify_local
+from engine.sentiment_analyzer import analyze_sentiment, analyze_sentiment_local
 from engine.severity_detector import detect_severity
 from engine.keyword_extractor import extract_keywords
 from engine.entity_recognizer import recognize_entities
-from engine.summary_generator import generate_summary
-import time
+from engine.priority_scorer import compute_priority_score
+from engine.summary_generator import generate_summary, template_summary
+from engine.stage_versions import current_stage_versions, stage_fingerprint
+from engine.deadline import deadline_scope, resolve_deadline
+from engine.rule_packs import pinned_rules
+from engine.semantic_cache import semantic_cache
+from engine.token_budget import is_degraded, token_budget, track_request
 
+# stage_versions entry of a stage served by its local fallback, so that
+# /reanalyze re-runs it once the budget allows
+DEGRADED_VERSION = "degraded"
 
-def analyze_complaint(text: str) -> dict:
-    """
-    Run the full NLP pipeline on a citizen complaint.
 
-    Args:
-        text: Raw complaint text (any language)
+class NotReanalyzable(ValueError):
+    """Raised for a stored analysis without the original text to re-run stages on."""
 
-    Returns:
-        Strict JSON output with all analysis stages.
-    """
-    # ─── Stage 1: Language Detection ──────────────────────────
-    language_result = detect_language(text)
 
-    # ─── Stage 2: Translation ─────────────────────────────────
-    translation_result = translate(text, language_result["detected_language"])
+# ─── Stage Runners ────────────────────────────────────────
+# Each runner receives the raw complaint text and the result assembled
+# so far, and returns the output key(s) it produces.
+
+def _analysis_text(text: str, result: dict) -> str:
+    # Use translated text for all downstream analysis. Rule-based stages
+    # fall back to the original text when translation isn't part of the run.
+    if "translation" in result:
+        return result["translation"]["translated_text"]
+    return text.strip()
+
+
+def _run_language_detection(text: str, result: dict) -> dict:
+    return {"language_detection": detect_language(text)}
+
 
-    # Use translated text for all downstream analysis
-    analysis_text = translation_result["translated_text"]
+def _run_translation(text: str, result: dict) -> dict:
+    return {"translation": translate(text, result["language_detection"]["detected_language"])}
 
-    # ─── Stage 3: Category Classification ─────────────────────
-    category_result = classify(analysis_text)
 
-    # ─── Stage 4: Sentiment Analysis ──────────────────────────
-    sentiment_result = analyze_sentiment(analysis_text)
+def _cached_outputs(stage: str, analysis_text: str):
+    """A paraphrase's outputs of an LLM stage from the semantic cache, or None."""
+    cached = semantic_cache.lookup(analysis_text, stage)
+    if cached is None:
+        return None
+    outputs, _similarity = cached
+    return copy.deepcopy(outputs)
 
-    # ─── Stage 5: Severity Detection ──────────────────────────
-    severity_result = detect_severity(analysis_text)
 
-    # ─── Stage 6: Keyword Extraction ──────────────────────────
-    keywords = extract_keywords(analysis_text)
+def _remember_outputs(stage: str, analysis_text: str, outputs: dict) -> dict:
+    # Only LLM answers are worth reusing, not local fallbacks
+    if not is_degraded(stage):
+        semantic_cache.store(analysis_text, stage, copy.deepcopy(outputs))
+    return outputs
 
-    # ─── Stage 7: Named Entity Recognition ────────────────────
-    entities = recognize_entities(analysis_text)
 
-    # ─── Stage 8: Department Routing (Now directly from AI) ───
+def _run_category(text: str, result: dict) -> dict:
+    analysis_text = _analysis_text(text, result)
+    cached = _cached_outputs("category_analysis", analysis_text)
+    if cached is not None:
+        return cached
+    if token_budget.should_degrade("category_analysis"):
+        category_result = classify_local(analysis_text)
+    else:
+        category_result = classify(analysis_text)
+    # Department Routing (Now directly from AI)
     departments = category_result.pop("department_probabilities", [])
+    # classify() passes the model's JSON through; keep only the schema
+    # fields so results can be serialized without re-validation
+    return _remember_outputs("category_analysis", analysis_text, {
+        "category_analysis": {
+            "category": str(category_result.get("category", "")),
+            "subcategory": str(category_result.get("subcategory", "")),
+            "category_confidence": float(category_result.get("category_confidence", 0.0)),
+        },
+        "department_probabilities": departments,
+    })
+
+
+def _run_sentiment(text: str, result: dict) -> dict:
+    analysis_text = _analysis_text(text, result)
+    cached = _cached_outputs("sentiment_analysis", analysis_text)
+    if cached is not None:
+        return cached
+    if token_budget.should_degrade("sentiment_analysis"):
+        return {"sentiment_analysis": analyze_sentiment_local(analysis_text)}
+    return _remember_outputs("sentiment_analysis", analysis_text, {
+        "sentiment_analysis": analyze_sentiment(analysis_text),
+    })
+
+
+def _run_severity(text: str, result: dict) -> dict:
+    return {"severity_analysis": detect_severity(_analysis_text(text, result))}
+
 
-    # ─── Stage 9: Priority Scoring (Phase 2 Integration) ──────
-    from engine.priority_scorer import compute_priority_score
-    priority_scoring = compute_priority_score(
+def _run_keywords(text: str, result: dict) -> dict:
+    return {"extracted_keywords": extract_keywords(_analysis_text(text, result))}
+
+
+def _run_entities(text: str, result: dict) -> dict:
+    return {"entities": recognize_entities(_analysis_text(text, result))}
+
+
+def _run_priority(text: str, result: dict) -> dict:
+    # Priority Scoring (Phase 2 Integration)
+    severity_result = result["severity_analysis"]
+    sentiment_result = result["sentiment_analysis"]
+    category_result = result["category_analysis"]
+    entities = result["entities"]
+    return {"priority_scoring": compute_priority_score(
         severity_score=severity_result.get("severity_score", 0),
         sentiment_score=sentiment_result.get("sentiment_score", 0.0),
         category_confidence=category_result.get("category_confidence", 0.0),
         location=entities.get("location", ""),
         landmark=entities.get("landmark", ""),
-        extracted_keywords=keywords
-    )
+        extracted_keywords=result["extracted_keywords"]
+    )}
+
+
+def _run_summary(text: str, result: dict) -> dict:
+    if token_budget.should_degrade("summary"):
+        return {"summary": template_summary(result)}
+    return {"summary": generate_summary(result)}
+
+
+# Cost classes: "llm" stages call the OpenAI API, "local" stages run in-process
+COST_LLM = "llm"
+COST_LOCAL = "local"
+
+
+class Stage(NamedTuple):
+    runner: Callable
+    inputs: tuple                # stages whose outputs the runner reads
+    outputs: tuple               # result keys the runner produces
+    cost: str
+    optional_inputs: tuple = ()  # inputs only waited for when already in the run
+
+
+# Stage name → Stage. Insertion order is the sequential order and the key
+# order of results. A stage's name is also the key of its primary output.
+PIPELINE_STAGES = {
+    "language_detection": Stage(
+        _run_language_detection, (), ("language_detection",), COST_LLM),
+    "translation": Stage(
+        _run_translation, ("language_detection",), ("translation",), COST_LLM),
+    "category_analysis": Stage(
+        _run_category, ("translation",), ("category_analysis", "department_probabilities"), COST_LLM),
+    "sentiment_analysis": Stage(
+        _run_sentiment, ("translation",), ("sentiment_analysis",), COST_LLM),
+    "severity_analysis": Stage(
+        _run_severity, ("translation",), ("severity_analysis",), COST_LOCAL,
+        optional_inputs=("translation",)),
+    "extracted_keywords": Stage(
+        _run_keywords, ("translation",), ("extracted_keywords",), COST_LOCAL,
+        optional_inputs=("translation",)),
+    "entities": Stage(
+        _run_entities, ("translation",), ("entities",), COST_LOCAL,
+        optional_inputs=("translation",)),
+    "priority_scoring": Stage(_run_priority, (
+        "category_analysis", "sentiment_analysis", "severity_analysis",
+        "extracted_keywords", "entities",
+    ), ("priority_scoring",), COST_LOCAL),
+    "summary": Stage(_run_summary, (
+        "translation", "category_analysis", "sentiment_analysis", "severity_analysis",
+        "extracted_keywords", "entities", "priority_scoring",
+    ), ("summary",), COST_LLM),
+}
+
+# Output field → the stage that produces it
+OUTPUT_FIELDS = {
+    field: name for name, stage in PIPELINE_STAGES.items() for field in stage.outputs
+}
+
+# Per run, not per process (see module docstring)
+MAX_PARALLEL_STAGES = max(1, int(os.getenv("PIPELINE_MAX_PARALLEL", 5)))
+CONCURRENT_RUNS = int(os.getenv(
+    "PIPELINE_CONCURRENT_RUNS",
+    min(32, (os.cpu_count() or 1) + 4) + int(os.getenv("JOB_QUEUE_WORKERS", 4)),
+))
+
+_stage_pool = None
+
+
+def plan_stages(fields=None) -> list:
+    """
+    Stages needed to produce the given output fields (all stages if None),
+    in PIPELINE_STAGES order.
+
+    Raises:
+        ValueError: for a field no stage produces.
+    """
+    if fields is None:
+        return list(PIPELINE_STAGES)
+
+    unknown = [f for f in fields if f not in OUTPUT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    needed = set()
+    pending = [OUTPUT_FIELDS[f] for f in fields]
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        stage = PIPELINE_STAGES[name]
+        pending.extend(i for i in stage.inputs if i not in stage.optional_inputs)
+    return [name for name in PIPELINE_STAGES if name in needed]
+
+
+def _run_stages(text: str, stages: list) -> dict:
+    """Run the planned stages, each as soon as its inputs in the plan are done."""
+    global _stage_pool
+    if _stage_pool is None:
+        # Threads are started on demand, so the pool only grows under load
+        _stage_pool = ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_STAGES * CONCURRENT_RUNS, thread_name_prefix="pipeline-stage"
+        )
+
+    planned = set(stages)
+    waiting_on = {
+        name: {i for i in PIPELINE_STAGES[name].inputs if i in planned} for name in stages
+    }
+    result = {}
+    done = set()
+    running = {}  # future -> stage name
+
+    while len(done) < len(stages):
+        started = set(running.values())
+        ready = [
+            name for name in stages
+            if name not in done and name not in started and waiting_on[name] <= done
+        ]
+        # Start the slow LLM calls first; local stages fill in around them
+        ready.sort(key=lambda name: PIPELINE_STAGES[name].cost != COST_LLM)
+        for name in ready[:max(MAX_PARALLEL_STAGES - len(running), 0)]:
+            # Each runner gets a snapshot holding everything finished so far,
+            # in a copy of the caller's context (per-request token accounting)
+            future = _stage_pool.submit(
+                contextvars.copy_context().run, PIPELINE_STAGES[name].runner, text, dict(result)
+            )
+            running[future] = name
+
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            name = running.pop(future)
+            result.update(future.result())
+            done.add(name)
+
+    # Same key order as a sequential run, whatever the completion order
+    return {
+        field: result[field]
+        for name in stages for field in PIPELINE_STAGES[name].outputs
+    }
+
+
+def analyze_complaint(text: str, fields=None, deadline_ms=None) -> dict:
+    """
+    Run the NLP pipeline on a citizen complaint.
+
+    Args:
+        text: Raw complaint text (any language)
+        fields: Output fields to produce (keys of OUTPUT_FIELDS), or None
+                for the full analysis. Only the stages those fields need are
+                run, e.g. ["entities", "severity_analysis"] makes no LLM call.
+        deadline_ms: Time budget of the run in milliseconds, or None for
+                     PIPELINE_DEADLINE_SECONDS
+
+    Returns:
+        Strict JSON output with all analysis stages, or only the requested
+        fields (plus stage_versions of the stages that produced them),
+        with the run's llm_usage, degraded_stages and rule_pack_version.
+    """
+    stages = plan_stages(fields)
+    with pinned_rules() as rules:
+        with deadline_scope(resolve_deadline(deadline_ms)), track_request() as usage:
+            result = _run_stages(text, stages)
+
+        if fields is None:
+            result["stage_versions"] = current_stage_versions()
+        else:
+            result = {field: result[field] for field in OUTPUT_FIELDS if field in fields}
+            result["stage_versions"] = {
+                OUTPUT_FIELDS[field]: stage_fingerprint(OUTPUT_FIELDS[field]) for field in result
+            }
+    result["rule_pack_version"] = rules.version
+    return _with_usage(result, usage)
+
+
+def _with_usage(result: dict, usage) -> dict:
+    for stage in usage.degraded_stages:
+        if stage in result["stage_versions"]:
+            result["stage_versions"][stage] = DEGRADED_VERSION
+    result["llm_usage"] = usage.report()
+    result["degraded_stages"] = list(usage.degraded_stages)
+    return result
+
+
+def reanalyze_complaint(previous: dict) -> dict:
+    """
+    Bring a stored analysis up to date with the current rules.
+
+    A stage is re-run when its version fingerprint differs from the one
+    stored in previous["stage_versions"], when its output is missing, or
+    when an upstream stage's output actually changed. Everything else is
+    reused, so e.g. a severity keyword tweak re-runs severity and priority
+    (and the summary only if those values moved) without any other LLM call.
+
+    Args:
+        previous: A result previously returned by analyze_complaint()
+
+    Returns:
+        The refreshed result, with "recomputed_stages" listing what was re-run.
+
+    Raises:
+        NotReanalyzable: `previous` has no translation.original_text (e.g. a
+            field-restricted result).
+    """
+    text = ((previous.get("translation") or {}).get("original_text") or "").strip()
+    if not text:
+        raise NotReanalyzable("the stored analysis has no translation.original_text")
+    stored_versions = previous.get("stage_versions") or {}
 
-    # ─── Assemble Final Output ────────────────────────────────
     result = {
-        "language_detection": language_result,
-        "translation": translation_result,
-        "category_analysis": category_result,
-        "sentiment_analysis": sentiment_result,
-        "severity_analysis": severity_result,
-        "extracted_keywords": keywords,
-        "entities": entities,
-        "department_probabilities": departments,
-        "priority_scoring": priority_scoring,
+        key: value for key, value in previous.items()
+        if key not in (
+            "stage_versions", "recomputed_stages", "processing_time_ms",
+            "llm_usage", "degraded_stages", "rule_pack_version",
+        )
     }
-    result["summary"] = generate_summary(result)
-    return result
\ No newline at end of file
+    changed = set()
+    recomputed = []
+
+    with pinned_rules() as rules, deadline_scope(resolve_deadline()), track_request() as usage:
+        versions = current_stage_versions()
+        for stage, spec in PIPELINE_STAGES.items():
+            is_stale = (
+                stored_versions.get(stage) != versions[stage]
+                or stage not in result
+                or not changed.isdisjoint(spec.inputs)
+            )
+            if not is_stale:
+                continue
+
+            outputs = spec.runner(text, result)
+            recomputed.append(stage)
+            if any(result.get(key) != value for key, value in outputs.items()):
+                changed.add(stage)
+            result.update(outputs)
+
+    result["stage_versions"] = versions
+    result["recomputed_stages"] = recomputed
+    result["rule_pack_version"] = rules.version
+    return _with_usage(result, usage)
@@ -201,7 +201,13 @@ Priority Scorer — Phase 2 Risk Scoring
 Weighted, explainable, rule-based priority computation.
 """
 
-from typing import Dict, Any, List
+import sys
+from typing import Dict, Any, List, Iterator, Sequence
+
+import numpy as np
+
+from engine.results import COMPONENT_NAMES, PriorityScoring
+from engine.rule_packs import current_rules, reload_rules
 
 # ── Configuration Weights & Tiers ──
 WEIGHTS = {
@@ -246,6 +252,18 @@ HIGH_RISK_KEYWORDS = {
     "child": 0.5, "infant": 0.6, "baby": 0.6,
 }
 
+# ── Precompiled Risk Indexes ──
+# The tables above are the built-in rule pack; the active pack (see
+# engine.rule_packs) holds the tables in use and their compiled indexes.
+# Call rebuild_risk_indexes() after changing the tables in place.
+
+def rebuild_risk_indexes():
+    """
+    Recompile the active rule pack from the tables above. A rule pack file
+    (RULE_PACK_PATH) still overrides the tables it contains.
+    """
+    reload_rules()
+
 def _normalize_string(s: str) -> str:
     return str(s).lower().strip() if s else ""
 
@@ -260,7 +278,12 @@ def sentiment_to_urgency(score: float) -> float:
     """Convert sentiment (-1 to 1) to urgency (0 to 1). Negative is high urgency."""
     return min(1.0, max(0.0, -score))
 
-def compute_location_risk(location: str, landmark: str) -> Dict[str, Any]:
+def compute_location_risk(location: str, landmark: str, explain: bool = True) -> Dict[str, Any]:
+    """
+    Risk of a location/landmark pair. explain=False skips building the
+    "details" text (batch re-scoring only needs the risk).
+    """
+    rules = current_rules()
     loc = _normalize_string(location)
     lm = _normalize_string(landmark)
     
@@ -268,56 +291,77 @@ def compute_location_risk(location: str, landmark: str) -> Dict[str, Any]:
     lm_risk = 0.0
     parts = []
     
-    if loc in SENSITIVE_LOCATIONS:
-        loc_risk = SENSITIVE_LOCATIONS[loc]
-        parts.append(f'location "{loc}" risk={loc_risk}')
+    if loc in rules.sensitive_locations:
+        loc_risk = rules.sensitive_locations[loc]
+        if explain:
+            parts.append(f'location "{loc}" risk={loc_risk}')
     elif loc:
-        for key, val in SENSITIVE_LOCATIONS.items():
-            if key in loc or loc in key:
-                loc_risk = max(loc_risk, val)
+        for key, val in rules.location_index.partial_matches(loc):
+            loc_risk = max(loc_risk, val)
+            if explain:
                 parts.append(f'location partial-match "{key}" risk={val}')
 
-    if lm in SENSITIVE_LANDMARKS:
-        lm_risk = SENSITIVE_LANDMARKS[lm]
-        parts.append(f'landmark "{lm}" risk={lm_risk}')
+    if lm in rules.sensitive_landmarks:
+        lm_risk = rules.sensitive_landmarks[lm]
+        if explain:
+            parts.append(f'landmark "{lm}" risk={lm_risk}')
     elif lm:
-        for key, val in SENSITIVE_LANDMARKS.items():
-            if key in lm or lm in key:
-                lm_risk = max(lm_risk, val)
+        for key, val in rules.landmark_index.partial_matches(lm):
+            lm_risk = max(lm_risk, val)
+            if explain:
                 parts.append(f'landmark partial-match "{key}" risk={val}')
                 
     combined = max(loc_risk, lm_risk)
     if loc_risk > 0 and lm_risk > 0:
         combined = min(1.0, combined + 0.1)
-        parts.append("both-present bonus +0.1")
+        if explain:
+            parts.append("both-present bonus +0.1")
         
     return {
         "risk": _round(combined),
         "details": "; ".join(parts) if parts else "no sensitive location/landmark match"
     }
 
-def compute_keyword_risk(keywords: List[str]) -> Dict[str, Any]:
+def compute_keyword_risk(keywords: List[str], explain: bool = True) -> Dict[str, Any]:
+    """Highest risk among the keywords; explain=False leaves "matched" empty."""
     if not keywords:
         return {"risk": 0.0, "matched": []}
         
+    rules = current_rules()
     matched = []
     max_risk = 0.0
     
     for kw in keywords:
         normalized = _normalize_string(kw)
-        if normalized in HIGH_RISK_KEYWORDS:
-            val = HIGH_RISK_KEYWORDS[normalized]
+        if normalized in rules.high_risk_keywords:
+            val = rules.high_risk_keywords[normalized]
             max_risk = max(max_risk, val)
-            matched.append(f"{normalized}({val})")
+            if explain:
+                matched.append(f"{normalized}({val})")
         else:
-            for key, val in HIGH_RISK_KEYWORDS.items():
-                if key in normalized or normalized in key:
-                    max_risk = max(max_risk, val)
+            # First related key in table order, as the original scan did
+            index = rules.keyword_index
+            related = index.related(normalized)
+            if related:
+                key, val = index.keys[related[0]], index.values[related[0]]
+                max_risk = max(max_risk, val)
+                if explain:
                     matched.append(f"{normalized}~{key}({val})")
-                    break
                     
     return {"risk": _round(max_risk), "matched": matched}
 
+# WEIGHTS keys in COMPONENT_NAMES order
+_COMPONENT_WEIGHT_KEYS = ("severity", "sentiment", "location_risk", "confidence", "keyword_risk")
+_shared_weights = None
+
+def _component_weights() -> tuple:
+    """The component weights, as one tuple shared by every result until WEIGHTS changes."""
+    global _shared_weights
+    weights = tuple(WEIGHTS[k] for k in _COMPONENT_WEIGHT_KEYS)
+    if weights != _shared_weights:
+        _shared_weights = weights
+    return _shared_weights
+
 def classify_risk_tier(score: float) -> str:
     if score <= RISK_TIERS["low_max"]:
         return "Low"
@@ -327,67 +371,169 @@ def classify_risk_tier(score: float) -> str:
         return "High"
     return "Critical"
 
-def compute_priority_score(
+def score_priority(
     severity_score: int,
     sentiment_score: float,
     category_confidence: float,
     location: str,
     landmark: str,
     extracted_keywords: List[str]
-) -> Dict[str, Any]:
+) -> PriorityScoring:
     """
-    Computes Phase 2 Priority Score.
+    Computes Phase 2 Priority Score as a compact PriorityScoring
+    (see compute_priority_score() for the dict form).
     """
     severity = normalize_severity(severity_score)
     sentiment_urgency = sentiment_to_urgency(sentiment_score)
     confidence = float(category_confidence)
-    
-    location_result = compute_location_risk(location, landmark)
-    keyword_result = compute_keyword_risk(extracted_keywords)
-    
-    components = [
-        {
-            "name": "severity",
-            "raw_value": _round(severity),
-            "weight": WEIGHTS["severity"],
-            "weighted_value": _round(WEIGHTS["severity"] * severity)
-        },
-        {
-            "name": "sentiment_urgency",
-            "raw_value": _round(sentiment_urgency),
-            "weight": WEIGHTS["sentiment"],
-            "weighted_value": _round(WEIGHTS["sentiment"] * sentiment_urgency)
-        },
-        {
-            "name": "location_risk",
-            "raw_value": location_result["risk"],
-            "weight": WEIGHTS["location_risk"],
-            "weighted_value": _round(WEIGHTS["location_risk"] * location_result["risk"])
-        },
-        {
-            "name": "category_confidence",
-            "raw_value": _round(confidence),
-            "weight": WEIGHTS["confidence"],
-            "weighted_value": _round(WEIGHTS["confidence"] * confidence)
-        },
+    location_risk = compute_location_risk(location, landmark, explain=False)["risk"]
+    keyword_risk = compute_keyword_risk(extracted_keywords, explain=False)["risk"]
+
+    weights = _component_weights()
+    unrounded = (severity, sentiment_urgency, location_risk, confidence, keyword_risk)
+    raw_values = (
+        _round(severity),
+        _round(sentiment_urgency),
+        location_risk,
+        _round(confidence),
+        keyword_risk,
+    )
+    weighted_values = tuple(_round(w * v) for w, v in zip(weights, unrounded))
+
+    total_before_clamp = sum(weighted_values)
+    priority_score = _round(min(1.0, max(0.0, total_before_clamp)))
+
+    return PriorityScoring(
+        priority_score,
+        classify_risk_tier(priority_score),
+        raw_values,
+        weights,
+        weighted_values,
+        _round(total_before_clamp),
+    )
+
+def compute_priority_score(
+    severity_score: int,
+    sentiment_score: float,
+    category_confidence: float,
+    location: str,
+    landmark: str,
+    extracted_keywords: List[str]
+) -> Dict[str, Any]:
+    """
+    Computes Phase 2 Priority Score.
+    """
+    return score_priority(
+        severity_score, sentiment_score, category_confidence,
+        location, landmark, extracted_keywords,
+    ).to_dict()
+
+
+# ─── Batch (Vectorized) Scoring ──────────────────────────
+# The explainability matrices returned by the batch API have one column
+# per COMPONENT_NAMES entry, the component order of compute_priority_score().
+_RISK_TIER_LABELS = np.array(["Low", "Medium", "High", "Critical"])
+
+
+def _round_array(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of _round() (Python round(val, 4)).
+
+    np.round scales by 10^4 before rounding, which can pick a different
+    neighbour than Python's correctly-rounded round() when the scaled value
+    sits on a .5 boundary. Those rare elements are re-rounded in Python so
+    the batch path stays bit-identical to the scalar path.
+    """
+    scaled = values * 1e4
+    rounded = np.rint(scaled) / 1e4
+    frac = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(frac < 1e-6)
+    if ambiguous.size:
+        rounded.flat[ambiguous] = [_round(v) for v in values.flat[ambiguous].tolist()]
+    return rounded
+
+
+def compute_priority_scores_batch(
+    severity_scores: Sequence[int],
+    sentiment_scores: Sequence[float],
+    category_confidences: Sequence[float],
+    location_risks: Sequence[float],
+    keyword_risks: Sequence[float],
+) -> Dict[str, Any]:
+    """
+    Vectorized Phase 2 Priority Score over columnar inputs.
+
+    location_risks / keyword_risks are the precomputed "risk" values from
+    compute_location_risk() / compute_keyword_risk(). Every output matches
+    compute_priority_score() element for element.
+
+    Returns:
         {
-            "name": "keyword_risk",
-            "raw_value": keyword_result["risk"],
-            "weight": WEIGHTS["keyword_risk"],
-            "weighted_value": _round(WEIGHTS["keyword_risk"] * keyword_result["risk"])
+            "priority_score": float64[n],
+            "risk_tier": str[n],
+            "total_before_clamp": float64[n],
+            "component_names": COMPONENT_NAMES,
+            "weights": float64[5],
+            "raw_values": float64[n, 5],
+            "weighted_values": float64[n, 5]
         }
-    ]
-    
-    total_before_clamp = sum(c["weighted_value"] for c in components)
-    priority_score = _round(min(1.0, max(0.0, total_before_clamp)))
-    
-    risk_tier = classify_risk_tier(priority_score)
-    
+    """
+    severity = np.clip(np.asarray(severity_scores, dtype=np.float64) / 5.0, 0.0, 1.0)
+    sentiment_urgency = np.clip(-np.asarray(sentiment_scores, dtype=np.float64), 0.0, 1.0)
+    confidence = np.asarray(category_confidences, dtype=np.float64)
+    location_risk = np.asarray(location_risks, dtype=np.float64)
+    keyword_risk = np.asarray(keyword_risks, dtype=np.float64)
+
+    unrounded = np.stack([severity, sentiment_urgency, location_risk, confidence, keyword_risk], axis=1)
+    weights = np.array([WEIGHTS[k] for k in _COMPONENT_WEIGHT_KEYS], dtype=np.float64)
+
+    raw_values = np.stack([
+        _round_array(severity),
+        _round_array(sentiment_urgency),
+        location_risk,
+        _round_array(confidence),
+        keyword_risk,
+    ], axis=1)
+    weighted_values = _round_array(unrounded * weights)
+
+    # Left-to-right accumulation, same order as the scalar sum()
+    total_before_clamp = np.zeros(len(weighted_values), dtype=np.float64)
+    for col in range(len(COMPONENT_NAMES)):
+        total_before_clamp += weighted_values[:, col]
+
+    priority_score = _round_array(np.clip(total_before_clamp, 0.0, 1.0))
+
+    tier_index = (
+        (priority_score > RISK_TIERS["low_max"]).astype(np.int8)
+        + (priority_score > RISK_TIERS["medium_max"])
+        + (priority_score > RISK_TIERS["high_max"])
+    )
+
     return {
         "priority_score": priority_score,
-        "risk_tier": risk_tier,
-        "explainability": {
-            "components": components,
-            "total_before_clamp": _round(total_before_clamp)
-        }
-    }
\ No newline at end of file
+        "risk_tier": _RISK_TIER_LABELS[tier_index],
+        "total_before_clamp": _round_array(total_before_clamp),
+        "component_names": COMPONENT_NAMES,
+        "weights": weights,
+        "raw_values": raw_values,
+        "weighted_values": weighted_values,
+    }
+
+
+def iter_priority_batch(batch: Dict[str, Any]) -> Iterator[PriorityScoring]:
+    """
+    Expand a compute_priority_scores_batch() result into per-complaint
+    PriorityScoring objects; .to_dict() gives compute_priority_score()'s shape.
+    """
+    weights = tuple(batch["weights"].tolist())
+    raw_rows = batch["raw_values"].tolist()
+    weighted_rows = batch["weighted_values"].tolist()
+    scores = batch["priority_score"].tolist()
+    # One str object per tier label rather than one per complaint
+    tiers = [sys.intern(tier) for tier in batch["risk_tier"].tolist()]
+    totals = batch["total_before_clamp"].tolist()
+
+    for i in range(len(scores)):
+        yield PriorityScoring(
+            scores[i], tiers[i], tuple(raw_rows[i]), weights, tuple(weighted_rows[i]), totals[i]
+        )
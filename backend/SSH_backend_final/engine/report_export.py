@@ -0,0 +1,157 @@
+"""
+Report Export — Bulk PDF Report Packs
+=======================================
+Renders many analyses in one request for department report packs,
+either as a ZIP with one PDF per complaint or as a single multi-page
+digest PDF.
+
+- Reports are rendered in a process pool (REPORT_EXPORT_WORKERS,
+  default CPU count; 0 or 1 renders in-process)
+- Only a small window of reports is in flight at once and output is
+  yielded as soon as each report is done, in request order, so memory
+  stays flat whatever the batch size
+- The batch is held as compact AnalysisResult objects (engine.results),
+  which also pickle smaller for the workers; each is expanded back to
+  the dict shape only when its report is rendered
+"""
+
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.report_generator import (
+    PdfWriter,
+    generate_pdf_report,
+    layout_pdf_report,
+    load_report_fonts,
+)
+from engine.results import AnalysisResult
+
+EXPORT_WORKERS = int(os.getenv("REPORT_EXPORT_WORKERS", os.cpu_count() or 1))
+
+# A report renders in a few ms, so tasks carry several to amortize IPC
+_BATCH_SIZE = 8
+# Tasks in flight per worker; bounds memory, keeps every worker busy
+_WINDOW_PER_WORKER = 2
+
+_SAFE_NAME_RE = re.compile(r"[^\w.-]+")
+
+_pool = None
+
+
+def _get_pool():
+    """Start the render pool once per server process."""
+    global _pool
+    if _pool is None:
+        # spawn: forking a server process that already runs threads is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=EXPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=load_report_fonts,
+        )
+        print(f"[ReportExport] Render pool started with {EXPORT_WORKERS} workers.")
+    return _pool
+
+
+def _run_batch(fn, batch: list) -> list:
+    return [fn(item) for item in batch]
+
+
+def _ordered_map(fn, items: list):
+    """Like map(), but across the pool with a bounded number of tasks in flight."""
+    if EXPORT_WORKERS <= 1:
+        yield from map(fn, items)
+        return
+
+    pool = _get_pool()
+    window = EXPORT_WORKERS * _WINDOW_PER_WORKER
+    pending = deque()
+    for start in range(0, len(items), _BATCH_SIZE):
+        pending.append(pool.submit(_run_batch, fn, items[start:start + _BATCH_SIZE]))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def _render_pdf(analysis: AnalysisResult) -> bytes:
+    """Worker task for ZIPs: one report's PDF."""
+    return generate_pdf_report(analysis.to_dict())
+
+
+def _layout_pages(analysis: AnalysisResult) -> tuple:
+    """Worker task for digests: laid-out pages, their glyphs and the footer."""
+    doc = layout_pdf_report(analysis.to_dict())
+    return doc.pages, doc.used_fonts, doc.footer
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def report_filename(index: int, report_id: str = "") -> str:
+    """ZIP entry name for the index-th report, e.g. "0003_CMP-1042.pdf"."""
+    name = _SAFE_NAME_RE.sub("_", report_id).strip("._")[:80]
+    return f"{index:04d}_{name or 'report'}.pdf"
+
+
+def iter_report_zip(reports: list):
+    """
+    Stream a ZIP of PDF reports.
+
+    Args:
+        reports: [(report_id, AnalysisResult), ...]
+
+    Yields the archive in chunks, roughly one per report.
+    """
+    sink = _ChunkSink()
+    timestamp = time.localtime()[:6]
+    # PDFs are already compressed; storing them avoids a second pass
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        pdfs = _ordered_map(_render_pdf, [analysis for _, analysis in reports])
+        for index, ((report_id, _), pdf_bytes) in enumerate(zip(reports, pdfs), 1):
+            info = zipfile.ZipInfo(report_filename(index, report_id), date_time=timestamp)
+            archive.writestr(info, pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_report_digest(reports: list):
+    """
+    Stream one PDF holding every report, each starting on a new page.
+
+    Args:
+        reports: [(report_id, AnalysisResult), ...]
+    """
+    writer = PdfWriter()
+    yield writer.begin()
+
+    total = len(reports)
+    layouts = _ordered_map(_layout_pages, [analysis for _, analysis in reports])
+    for index, ((report_id, _), (pages, used_fonts, footer)) in enumerate(zip(reports, layouts), 1):
+        label = f"Report {index} of {total}" + (f" ({report_id})" if report_id else "")
+        for number, ops in enumerate(pages, 1):
+            yield writer.page(
+                ops, used_fonts, f"{footer}  |  {label}, page {number} of {len(pages)}"
+            )
+
+    yield writer.finish()
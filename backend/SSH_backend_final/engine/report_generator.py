@@ -1,13 +1,670 @@
+"""
+Report Generator — In-Memory PDF Reports
+==========================================
+Renders an analysis result into an A4 PDF entirely in memory; nothing
+is written to disk and the bytes go straight into the response body.
+
+- Latin text uses the PDF base-14 Helvetica fonts: nothing to embed,
+  widths come from the tables below.
+- Original complaints in Indic scripts or Urdu are shaped with HarfBuzz
+  (conjuncts, matras, RTL) and drawn with the Noto font for their
+  script, embedded as a CID font.
+
+All per-font work (reading, compressing, HarfBuzz setup) happens once in
+load_report_fonts(), called at server startup, so a report only costs
+layout plus byte concatenation.
+
+Fonts:
+  REPORT_FONT_DIR  directory holding the Noto TTFs
+                   (default /usr/share/fonts/truetype/noto, Debian fonts-noto-core)
+"""
+
 import os
-import tempfile
+import time
+import zlib
+
+# Standard Adobe metrics for cp1252 codes 32..255, in 1/1000 em
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 350,
+    556, 350, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584, 350,
+    556, 350, 278, 556, 500, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 278, 278, 500, 500, 350, 556, 1000, 333, 1000, 556, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 280, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 611, 556, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 556, 556, 556, 556, 556, 278, 278, 278, 278,
+    611, 611, 611, 611, 611, 611, 611, 584, 611, 611, 611, 611, 611, 556, 611, 556,
+)
+
+# Indexed directly by cp1252 byte
+_LATIN_WIDTHS = {
+    False: (0,) * 32 + _HELVETICA_WIDTHS,
+    True: (0,) * 32 + _HELVETICA_BOLD_WIDTHS,
+}
+
+# (script, code point ranges, font file, right-to-left)
+SCRIPT_FONTS = (
+    ("devanagari", ((0x0900, 0x097F), (0xA8E0, 0xA8FF)), "NotoSansDevanagari-Regular.ttf", False),
+    ("bengali", ((0x0980, 0x09FF),), "NotoSansBengali-Regular.ttf", False),
+    ("gurmukhi", ((0x0A00, 0x0A7F),), "NotoSansGurmukhi-Regular.ttf", False),
+    ("gujarati", ((0x0A80, 0x0AFF),), "NotoSansGujarati-Regular.ttf", False),
+    ("oriya", ((0x0B00, 0x0B7F),), "NotoSansOriya-Regular.ttf", False),
+    ("tamil", ((0x0B80, 0x0BFF),), "NotoSansTamil-Regular.ttf", False),
+    ("telugu", ((0x0C00, 0x0C7F),), "NotoSansTelugu-Regular.ttf", False),
+    ("kannada", ((0x0C80, 0x0CFF),), "NotoSansKannada-Regular.ttf", False),
+    ("malayalam", ((0x0D00, 0x0D7F),), "NotoSansMalayalam-Regular.ttf", False),
+    ("arabic", ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)),
+     "NotoNaskhArabic-Regular.ttf", True),
+)
+
+DEFAULT_FONT_DIR = "/usr/share/fonts/truetype/noto"
+
+# Danda, double danda, ZWNJ and ZWJ belong to whichever script surrounds them
+_SCRIPT_NEUTRAL = {0x0964, 0x0965, 0x200C, 0x200D}
+
+# ─── Page Geometry (points) ──────────────────────────────
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 50
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+FOOTER_Y = 30
+
+# Keyed by priority_scorer.classify_risk_tier() labels
+TIER_COLORS = {
+    "Critical": (0.78, 0.16, 0.16),
+    "High": (0.90, 0.45, 0.10),
+    "Medium": (0.85, 0.68, 0.10),
+    "Low": (0.22, 0.56, 0.24),
+}
+
+_script_fonts = {}
+_char_script = {}
+_fonts_loaded = False
+
+
+class _ScriptFont:
+    """A TrueType font prepared for embedding and shaping."""
+
+    def __init__(self, script: str, path: str, rtl: bool, hb):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        self.script = script
+        self.rtl = rtl
+        self.base_name = os.path.splitext(os.path.basename(path))[0]
+        self._hb = hb
+        self.hb_font = hb.Font(hb.Face(hb.Blob(data)))
+        self.scale = 1000.0 / self.hb_font.face.upem
+
+        extents = self.hb_font.get_font_extents("ltr")
+        self.ascent = round(extents.ascender * self.scale)
+        self.descent = round(extents.descender * self.scale)
+
+        # The embedded font program is identical in every report, so
+        # compress it once and reuse the finished stream body
+        compressed = zlib.compress(data, 6)
+        self.font_file = (
+            b"<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n"
+            % (len(compressed), len(data))
+            + compressed
+            + b"\nendstream"
+        )
+        self.descriptor_template = (
+            "<< /Type /FontDescriptor /FontName /%s /Flags 4 "
+            "/FontBBox [-1000 %d 2500 %d] /ItalicAngle 0 /Ascent %d /Descent %d "
+            "/CapHeight %d /StemV 80 /FontFile2 %%d 0 R >>"
+            % (self.base_name, self.descent, self.ascent, self.ascent, self.descent, self.ascent)
+        )
+
+    def has_glyph(self, ch: str) -> bool:
+        return self.hb_font.get_nominal_glyph(ord(ch)) is not None
+
+    def shape(self, text: str) -> tuple:
+        """
+        Shape a run of text.
+
+        Returns (glyphs, width) where glyphs is a list of
+        (glyph_id, x_advance, x_offset, y_offset, source_text) in visual
+        order, all lengths in 1/1000 em.
+        """
+        buf = self._hb.Buffer()
+        buf.add_str(text)
+        buf.guess_segment_properties()
+        self._hb.shape(self.hb_font, buf, {})
+
+        infos = buf.glyph_infos
+        positions = buf.glyph_positions
+        # Text belonging to each cluster, for the ToUnicode map
+        starts = sorted({info.cluster for info in infos})
+        cluster_text = {
+            start: text[start:end]
+            for start, end in zip(starts, starts[1:] + [len(text)])
+        }
+
+        scale = self.scale
+        glyphs = []
+        width = 0.0
+        seen = set()
+        for info, pos in zip(infos, positions):
+            source = "" if info.cluster in seen else cluster_text[info.cluster]
+            seen.add(info.cluster)
+            glyphs.append((
+                info.codepoint,
+                pos.x_advance * scale,
+                pos.x_offset * scale,
+                pos.y_offset * scale,
+                source,
+            ))
+            width += pos.x_advance * scale
+        return glyphs, width
+
+    def advance(self, glyph_id: int) -> int:
+        return round(self.hb_font.get_glyph_h_advance(glyph_id) * self.scale)
+
+
+def load_report_fonts():
+    """Load and index the script fonts once per process. Missing fonts are skipped."""
+    global _fonts_loaded
+    if _fonts_loaded:
+        return
+    _fonts_loaded = True
+
+    try:
+        import uharfbuzz as hb
+    except ImportError:
+        print("[ReportGenerator] uharfbuzz not installed; non-Latin text will be omitted.")
+        return
+
+    font_dir = os.getenv("REPORT_FONT_DIR") or DEFAULT_FONT_DIR
+    for script, ranges, filename, rtl in SCRIPT_FONTS:
+        path = os.path.join(font_dir, filename)
+        if not os.path.exists(path):
+            continue
+        _script_fonts[script] = _ScriptFont(script, path, rtl, hb)
+        for lo, hi in ranges:
+            for cp in range(lo, hi + 1):
+                _char_script[cp] = script
+
+    loaded = ", ".join(_script_fonts) or "none"
+    print(f"[ReportGenerator] Script fonts loaded: {loaded}.")
+
+
+# ─── Text Measurement ────────────────────────────────────
+
+def _latin_bytes(text: str) -> bytes:
+    return text.encode("cp1252", errors="replace")
+
+
+def _latin_width(data: bytes, bold: bool) -> float:
+    return float(sum(map(_LATIN_WIDTHS[bold].__getitem__, data)))
+
+
+def _split_runs(word: str) -> list:
+    """Split a word into (script or None, text) runs; None means Helvetica."""
+    if word.isascii() or not _char_script:
+        return [(None, word)]
+    runs = []
+    current = None
+    start = 0
+    for i, ch in enumerate(word):
+        cp = ord(ch)
+        if cp in _SCRIPT_NEUTRAL and current is not None:
+            continue
+        script = _char_script.get(cp)
+        if cp < 0x80 and current is not None and _script_fonts[current].has_glyph(ch):
+            # Digits and punctuation inside a script run stay with its font
+            script = current
+        if i and script != current:
+            runs.append((current, word[start:i]))
+            start = i
+        current = script
+    if word:
+        runs.append((current, word[start:]))
+    return runs
+
+
+class _Word:
+    __slots__ = ("runs", "width", "rtl", "latin")
+
+    def __init__(self, text: str, bold: bool):
+        self.runs = []
+        self.width = 0.0
+        self.rtl = False
+        self.latin = None
+        runs = _split_runs(text)
+        if len(runs) == 1 and runs[0][0] is None:
+            # Helvetica-only words are merged with their neighbours when drawn
+            self.latin = _latin_bytes(text)
+            self.width = _latin_width(self.latin, bold)
+            self.runs.append((None, self.latin, self.width))
+            return
+        for script, run_text in runs:
+            if script is None:
+                data = _latin_bytes(run_text)
+                width = _latin_width(data, bold)
+                self.runs.append((None, data, width))
+            else:
+                font = _script_fonts[script]
+                glyphs, width = font.shape(run_text)
+                self.runs.append((font, glyphs, width))
+                self.rtl = self.rtl or font.rtl
+            self.width += width
+
+
+# ─── Document Builder ────────────────────────────────────
+
+def _escape(data: bytes) -> bytes:
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _num(value: float) -> bytes:
+    return (b"%.2f" % value).rstrip(b"0").rstrip(b".") or b"0"
+
+
+class _Document:
+    """Lays out text top-down across pages and serializes the PDF."""
+
+    def __init__(self):
+        self.pages = []
+        self.used_fonts = {}  # script -> {glyph_id: source text}
+        self.footer = ""
+        self._new_page()
+
+    def _new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _ensure_space(self, height: float):
+        if self.y - height < MARGIN + 10:
+            self._new_page()
+
+    # ── drawing primitives ──
 
-def generate_pdf_report(analysis_data: dict) -> str:
+    def _latin_text(self, data: bytes, x: float, y: float, size: float, bold: bool):
+        self.ops.append(
+            b"BT /%s %s Tf %s %s Td (%s) Tj ET"
+            % (b"F2" if bold else b"F1", _num(size), _num(x), _num(y), _escape(data))
+        )
+
+    def _draw_word(self, word: _Word, x: float, y: float, size: float, bold: bool):
+        for font, payload, width in word.runs:
+            if font is None:
+                self._latin_text(payload, x, y, size, bold)
+            else:
+                self.ops.append(self._glyph_run(font, payload, x, y, size))
+            x += width * size / 1000
+
+    def _draw_line(self, words: list, x: float, y: float, size: float, bold: bool, space: float):
+        pending = []  # consecutive Helvetica-only words, drawn as one string
+        start = x
+        for word in words:
+            if word.latin is not None:
+                if not pending:
+                    start = x
+                pending.append(word.latin)
+            else:
+                if pending:
+                    self._latin_text(b" ".join(pending), start, y, size, bold)
+                    pending = []
+                self._draw_word(word, x, y, size, bold)
+            x += word.width * size / 1000 + space
+        if pending:
+            self._latin_text(b" ".join(pending), start, y, size, bold)
+
+    def _glyph_run(self, font: _ScriptFont, glyphs: list, x: float, y: float, size: float) -> bytes:
+        used = self.used_fonts.setdefault(font.script, {})
+        parts = [b"BT /S%s %s Tf %s %s Td" % (font.script.encode(), _num(size), _num(x), _num(y))]
+        array = []
+        pen = 0.0     # where HarfBuzz wants the next glyph origin
+        cursor = 0.0  # where the PDF text cursor actually is
+        rise = 0.0
+        for glyph_id, x_advance, x_offset, y_offset, source in glyphs:
+            # Keep the first non-empty source text seen for each glyph
+            if not used.get(glyph_id):
+                used[glyph_id] = source
+            if y_offset != rise:
+                if array:
+                    parts.append(b"[" + b" ".join(array) + b"] TJ")
+                    array = []
+                rise = y_offset
+                parts.append(b"%s Ts" % _num(rise * size / 1000))
+            target = pen + x_offset
+            if abs(cursor - target) > 0.01:
+                array.append(_num(cursor - target))
+            array.append(b"<%04X>" % glyph_id)
+            cursor = target + font.advance(glyph_id)
+            pen += x_advance
+        if array:
+            parts.append(b"[" + b" ".join(array) + b"] TJ")
+        if rise:
+            parts.append(b"0 Ts")
+        parts.append(b"ET")
+        return b" ".join(parts)
+
+    def set_color(self, rgb: tuple):
+        self.ops.append(b"%s %s %s rg" % tuple(_num(c) for c in rgb))
+
+    # ── layout ──
+
+    def paragraph(self, text: str, size: float = 10, bold: bool = False,
+                  indent: float = 0, width: float = None, gap: float = 4):
+        """Wrap text to the content width (or `width`), breaking between words."""
+        line_height = size * 1.45
+        space = (_HELVETICA_BOLD_WIDTHS if bold else _HELVETICA_WIDTHS)[0] * size / 1000
+        max_width = width or CONTENT_WIDTH - indent
+
+        for raw_line in (text or "").splitlines() or [""]:
+            words = [_Word(w, bold) for w in raw_line.split()]
+            rtl = sum(w.rtl for w in words) * 2 > len(words)
+            line = []
+            line_width = 0.0
+            for word in words + [None]:
+                word_width = word.width * size / 1000 if word is not None else 0
+                if word is None or (line and line_width + space + word_width > max_width):
+                    self._ensure_space(line_height)
+                    self.y -= line_height
+                    if rtl:
+                        # Right-aligned, words ordered right to left
+                        x = MARGIN + indent + max_width
+                        for w in line:
+                            x -= w.width * size / 1000
+                            self._draw_word(w, x, self.y, size, bold)
+                            x -= space
+                    else:
+                        self._draw_line(line, MARGIN + indent, self.y, size, bold, space)
+                    line, line_width = [], 0.0
+                    if word is None:
+                        break
+                line_width += (space if line else 0) + word_width
+                line.append(word)
+        self.y -= gap
+
+    def heading(self, text: str):
+        self._ensure_space(40)
+        self.y -= 8
+        self.set_color((0.12, 0.23, 0.40))
+        self.paragraph(text, size=13, bold=True, gap=2)
+        self.ops.append(b"0.75 0.80 0.88 RG 0.8 w %s %s m %s %s l S" % (
+            _num(MARGIN), _num(self.y + 2), _num(PAGE_WIDTH - MARGIN), _num(self.y + 2)))
+        self.set_color((0, 0, 0))
+        self.y -= 6
+
+    def field(self, label: str, value: str):
+        """A label: value row; the value wraps under itself."""
+        label_width = 130
+        self._ensure_space(15)
+        top = self.y
+        self.paragraph(label, size=10, bold=True, width=label_width - 8, gap=0)
+        label_bottom = self.y
+        self.y = top
+        self.paragraph(value if value else "-", size=10, indent=label_width, gap=0)
+        self.y = min(self.y, label_bottom) - 3
+
+    def banner(self, text: str, rgb: tuple):
+        self._ensure_space(34)
+        self.y -= 30
+        self.set_color(rgb)
+        self.ops.append(b"%s %s %s 26 re f" % (_num(MARGIN), _num(self.y), _num(CONTENT_WIDTH)))
+        self.set_color((1, 1, 1))
+        self.ops.append(b"BT /F2 13 Tf %s %s Td (%s) Tj ET" % (
+            _num(MARGIN + 10), _num(self.y + 8), _escape(_latin_bytes(text))))
+        self.set_color((0, 0, 0))
+        self.y -= 8
+
+    # ── serialization ──
+
+    def render(self, footer: str) -> bytes:
+        writer = PdfWriter()
+        chunks = [writer.begin()]
+        total = len(self.pages)
+        for number, ops in enumerate(self.pages, 1):
+            chunks.append(writer.page(ops, self.used_fonts, f"{footer}  |  Page {number} of {total}"))
+        chunks.append(writer.finish())
+        return b"".join(chunks)
+
+
+class PdfWriter:
+    """
+    Serializes laid-out pages into a PDF incrementally.
+
+    begin(), page() and finish() each return the next bytes of the file,
+    so callers can stream a document of any length; only object offsets
+    and the glyphs used so far are kept in memory. Fonts are written at
+    the end, once every page has contributed its glyphs.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+        self.next_id = 5  # 1 catalog, 2 pages, 3-4 Helvetica
+        self.page_ids = []
+        self.font_ids = {}    # script -> Type0 font object number
+        self.used_fonts = {}  # script -> {glyph_id: source text}
+
+    def _object(self, obj_id: int, body: bytes) -> bytes:
+        chunk = b"%d 0 obj\n%s\nendobj\n" % (obj_id, body)
+        self.offsets[obj_id] = self.offset
+        self.offset += len(chunk)
+        return chunk
+
+    def _allocate(self, count: int) -> int:
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def begin(self) -> bytes:
+        header = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+        self.offset = len(header)
+        return header + self._object(3, _HELVETICA_DICT) + self._object(4, _HELVETICA_BOLD_DICT)
+
+    def page(self, ops: list, used_fonts: dict, footer: str) -> bytes:
+        """Write one page; used_fonts are the glyphs its script runs reference."""
+        font_refs = [b"/F1 3 0 R /F2 4 0 R"]
+        for script, used in used_fonts.items():
+            if script not in self.font_ids:
+                # Type0, CIDFont, descriptor, font file and ToUnicode are
+                # numbered consecutively and written by finish()
+                self.font_ids[script] = self._allocate(5)
+            merged = self.used_fonts.setdefault(script, {})
+            for glyph_id, source in used.items():
+                if not merged.get(glyph_id):
+                    merged[glyph_id] = source
+            font_refs.append(b"/S%s %d 0 R" % (script.encode(), self.font_ids[script]))
+
+        content = b"\n".join(ops) + (
+            b"\n0.45 0.45 0.45 rg BT /F1 8 Tf %s %s Td (%s) Tj ET"
+            % (_num(MARGIN), _num(FOOTER_Y), _escape(_latin_bytes(footer)))
+        )
+        content_id = self._allocate(1)
+        page_id = self._allocate(1)
+        self.page_ids.append(page_id)
+        return self._object(content_id, _stream(content, compress=True)) + self._object(page_id, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] "
+            b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+            % (_num(PAGE_WIDTH), _num(PAGE_HEIGHT), b" ".join(font_refs), content_id)
+        ))
+
+    def finish(self) -> bytes:
+        chunks = []
+        for script, type0 in self.font_ids.items():
+            font = _script_fonts[script]
+            used = self.used_fonts[script]
+            cid, descriptor, file_id, cmap = type0 + 1, type0 + 2, type0 + 3, type0 + 4
+            widths = b" ".join(b"%d [%d]" % (g, font.advance(g)) for g in sorted(used))
+            chunks.append(self._object(type0, (
+                b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+                b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>"
+                % (font.base_name.encode(), cid, cmap)
+            )))
+            chunks.append(self._object(cid, (
+                b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s "
+                b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                b"/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>"
+                % (font.base_name.encode(), descriptor, widths)
+            )))
+            chunks.append(self._object(descriptor, (font.descriptor_template % file_id).encode()))
+            chunks.append(self._object(file_id, font.font_file))
+            chunks.append(self._object(cmap, _stream(_to_unicode_cmap(used))))
+
+        chunks.append(self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % p for p in self.page_ids), len(self.page_ids))))
+        chunks.append(self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>"))
+
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id]
+        xref.extend(b"%010d 00000 n \n" % self.offsets[obj_id] for obj_id in range(1, self.next_id))
+        chunks.append(b"".join(xref))
+        chunks.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                      % (self.next_id, self.offset))
+        return b"".join(chunks)
+
+
+_HELVETICA_DICT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+_HELVETICA_BOLD_DICT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+
+
+def _stream(data: bytes, compress: bool = False) -> bytes:
+    if compress:
+        data = zlib.compress(data, 6)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data)
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+def _to_unicode_cmap(used: dict) -> bytes:
+    """ToUnicode CMap so text in the embedded fonts can be searched and copied."""
+    entries = [
+        b"<%04X> <%s>" % (glyph_id, source.encode("utf-16-be").hex().upper().encode())
+        for glyph_id, source in sorted(used.items())
+        if source
+    ]
+    body = []
+    for i in range(0, len(entries), 100):
+        block = entries[i:i + 100]
+        body.append(b"%d beginbfchar\n%s\nendbfchar" % (len(block), b"\n".join(block)))
+    return (
+        b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+        b"1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+        + b"\n".join(body)
+        + b"\nendcmap CMapName currentdict /CMap defineresource pop end end"
+    )
+
+
+# ─── Report Template ─────────────────────────────────────
+
+def _pct(value) -> str:
+    return f"{float(value) * 100:.0f}%"
+
+
+def layout_pdf_report(analysis_data: dict) -> _Document:
+    """Lay out an /analyze result into pages (not yet serialized)."""
+    load_report_fonts()
+
+    language = analysis_data.get("language_detection", {})
+    translation = analysis_data.get("translation", {})
+    category = analysis_data.get("category_analysis", {})
+    sentiment = analysis_data.get("sentiment_analysis", {})
+    severity = analysis_data.get("severity_analysis", {})
+    entities = analysis_data.get("entities", {})
+    priority = analysis_data.get("priority_scoring", {})
+
+    doc = _Document()
+    doc.paragraph("Civic Intelligence Report", size=20, bold=True, gap=0)
+    doc.set_color((0.4, 0.4, 0.4))
+    doc.paragraph(time.strftime("Generated %d %b %Y, %H:%M"), size=9, gap=2)
+    doc.set_color((0, 0, 0))
+
+    tier = priority.get("risk_tier") or "Low"
+    doc.banner(
+        f"{tier.upper()} PRIORITY  \u2014  score {float(priority.get('priority_score', 0)):.2f}",
+        TIER_COLORS.get(tier.capitalize(), TIER_COLORS["Low"]),
+    )
+
+    doc.heading("Complaint")
+    if translation.get("was_translated"):
+        doc.paragraph(
+            f"Original ({language.get('detected_language', '?')})", size=9, bold=True, gap=0
+        )
+        doc.paragraph(translation.get("original_text", ""), size=11, gap=6)
+        doc.paragraph(
+            f"English translation (confidence {_pct(translation.get('translation_confidence', 0))})",
+            size=9, bold=True, gap=0,
+        )
+    doc.paragraph(translation.get("translated_text", ""), size=10, gap=2)
+
+    doc.heading("Classification")
+    doc.field("Category", category.get("category", ""))
+    doc.field("Subcategory", category.get("subcategory", ""))
+    doc.field("Confidence", _pct(category.get("category_confidence", 0)))
+    doc.field("Sentiment", f"{sentiment.get('sentiment_label', '')} "
+                           f"({float(sentiment.get('sentiment_score', 0)):.2f})")
+    doc.field("Severity", f"{severity.get('severity_level', '')} "
+                          f"({severity.get('severity_score', 0)}/10), {severity.get('risk_type', '')}")
+    doc.field("Risk keywords", ", ".join(severity.get("matched_keywords", [])))
+    doc.field("Keywords", ", ".join(analysis_data.get("extracted_keywords", [])))
+
+    doc.heading("Location")
+    doc.field("Location", entities.get("location", ""))
+    doc.field("Landmark", entities.get("landmark", ""))
+    coordinates = entities.get("coordinates")
+    if coordinates:
+        doc.field("Coordinates", f"{coordinates['lat']:.5f}, {coordinates['lng']:.5f}")
+
+    departments = analysis_data.get("department_probabilities", [])
+    if departments:
+        doc.heading("Department Routing")
+        for dept in departments[:5]:
+            doc.field(dept.get("department", ""), _pct(dept.get("probability", 0)))
+
+    components = priority.get("explainability", {}).get("components", [])
+    if components:
+        doc.heading("Priority Breakdown")
+        for comp in components:
+            doc.field(
+                comp.get("name", ""),
+                f"{float(comp.get('raw_value', 0)):.2f} x {float(comp.get('weight', 0)):.2f}"
+                f" = {float(comp.get('weighted_value', 0)):.3f}",
+            )
+        doc.field("Total", f"{float(priority['explainability'].get('total_before_clamp', 0)):.3f}")
+
+    if analysis_data.get("summary"):
+        doc.heading("Summary")
+        doc.paragraph(analysis_data["summary"], size=10)
+
+    doc.footer = "Civic Grievance Intelligence Engine"
+    if "processing_time_ms" in analysis_data:
+        doc.footer += f"  |  analysed in {analysis_data['processing_time_ms']:.0f} ms"
+    return doc
+
+
+def generate_pdf_report(analysis_data: dict) -> bytes:
     """
-    Placeholder for PDF report generation.
-    Returns a path to a dummy PDF file.
+    Render an /analyze result as a PDF.
+
+    Returns:
+        The complete PDF file as bytes.
     """
-    # Create a dummy PDF file
-    fd, path = tempfile.mkstemp(suffix=".pdf")
-    with os.fdopen(fd, 'w') as f:
-        f.write("%PDF-1.4\n%Dummy PDF content\n")
-    return path
+    doc = layout_pdf_report(analysis_data)
+    return doc.render(doc.footer)
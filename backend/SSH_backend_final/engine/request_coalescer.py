@@ -0,0 +1,99 @@
+"""
+Request Coalescer — Singleflight for Identical Complaints
+===========================================================
+When many citizens submit the same text within seconds (a viral issue,
+or the frontend retrying while the first call is still running), only
+one pipeline run happens: concurrent requests with the same normalized
+text attach to the in-flight execution and all receive its result.
+
+The shared execution runs as its own task, so a caller disconnecting
+never cancels it for the others. Nothing is kept once it finishes —
+this is not a result cache, and its metrics are tracked separately.
+"""
+
+import asyncio
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def complaint_key(text: str) -> str:
+    """Coalescing key: sha256 of the NFKC-normalized, whitespace-collapsed text."""
+    normalized = _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """Deduplicates concurrent calls of a blocking function by key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}  # key -> asyncio.Task
+
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.peak_inflight = 0
+        self.max_waiters = 0
+        self._waiters = {}  # key -> callers attached to the in-flight run
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        waiters = self._waiters.pop(key, 0)
+        self.max_waiters = max(self.max_waiters, waiters)
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    async def run(self, key: str, fn, *args) -> dict:
+        """
+        Run fn(*args) in a worker thread, or join the identical run already in flight.
+
+        Every caller gets its own shallow copy of the result dict, so
+        per-request fields (e.g. processing_time_ms) can be set freely.
+        Errors are raised to every attached caller.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._inflight[key] = task
+            self._waiters[key] = 1
+            self.peak_inflight = max(self.peak_inflight, len(self._inflight))
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+
+        # shield: one caller being cancelled must not cancel the shared run
+        result = await asyncio.shield(task)
+        return dict(result)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            {
+                "executions": 120,
+                "coalesced": 380,
+                "coalesce_ratio": 0.76,
+                "errors": 0,
+                "inflight": 2,
+                "peak_inflight": 9,
+                "max_waiters": 57
+            }
+        """
+        requests = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesce_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+            "peak_inflight": self.peak_inflight,
+            "max_waiters": self.max_waiters,
+        }
+
+
+# Shared by /analyze and /analyze/report
+analysis_coalescer = RequestCoalescer("analyze_complaint")
@@ -0,0 +1,295 @@
+"""
+Result Objects — Compact, Typed Analysis Results
+==================================================
+Frozen, slotted classes for each stage's output and for a whole pipeline
+result, for code that holds many results at once (batch re-scoring,
+report export, queued jobs). Compared with the nested dicts the pipeline
+returns they carry no per-instance dict and no repeated key strings:
+
+- Lists become tuples; the priority explainability components are three
+  tuples (raw values, weights, weighted values) instead of five dicts
+- Low-cardinality strings (category, level, tier, department,
+  keywords, ...) are interned, so 100k results share one copy of each
+- A whole AnalysisResult is a few hundred bytes instead of several KB
+
+to_dict() rebuilds exactly the JSON shape the API returns (hand-written,
+no dataclasses.asdict() recursion); from_dict() reads that shape back.
+"""
+
+import sys
+from dataclasses import dataclass
+
+# Column order of the priority explainability components
+COMPONENT_NAMES = (
+    "severity",
+    "sentiment_urgency",
+    "location_risk",
+    "category_confidence",
+    "keyword_risk",
+)
+
+# Stands in for an explainability component a stored result doesn't have
+_ZERO_COMPONENT = {"raw_value": 0.0, "weight": 0.0, "weighted_value": 0.0}
+
+_intern = sys.intern
+
+# Canonical copies of small repeated values (weights, stage_versions)
+_SHARED_MAX = 4096
+_shared_values = {}
+
+
+def _shared(value):
+    """One shared instance per distinct (hashable) value."""
+    shared = _shared_values.get(value)
+    if shared is None:
+        if len(_shared_values) >= _SHARED_MAX:
+            _shared_values.clear()
+        shared = _shared_values[value] = value
+    return shared
+
+
+def _strings(values) -> tuple:
+    return tuple(_intern(v) for v in values)
+
+
+@dataclass(frozen=True, slots=True)
+class LanguageDetection:
+    detected_language: str
+    confidence: float
+
+    def to_dict(self) -> dict:
+        return {"detected_language": self.detected_language, "confidence": self.confidence}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LanguageDetection":
+        return cls(_intern(data["detected_language"]), data["confidence"])
+
+
+@dataclass(frozen=True, slots=True)
+class Translation:
+    was_translated: bool
+    original_text: str
+    translated_text: str
+    translation_confidence: float
+
+    def to_dict(self) -> dict:
+        return {
+            "was_translated": self.was_translated,
+            "original_text": self.original_text,
+            "translated_text": self.translated_text,
+            "translation_confidence": self.translation_confidence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Translation":
+        original = data["original_text"]
+        translated = data["translated_text"]
+        # Untranslated text is stored once
+        if translated == original:
+            translated = original
+        return cls(data["was_translated"], original, translated, data["translation_confidence"])
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryAnalysis:
+    category: str
+    subcategory: str
+    category_confidence: float
+
+    def to_dict(self) -> dict:
+        return {
+            "category": self.category,
+            "subcategory": self.subcategory,
+            "category_confidence": self.category_confidence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CategoryAnalysis":
+        return cls(_intern(data["category"]), _intern(data["subcategory"]), data["category_confidence"])
+
+
+@dataclass(frozen=True, slots=True)
+class SentimentAnalysis:
+    sentiment_score: float
+    sentiment_label: str
+
+    def to_dict(self) -> dict:
+        return {"sentiment_score": self.sentiment_score, "sentiment_label": self.sentiment_label}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SentimentAnalysis":
+        return cls(data["sentiment_score"], _intern(data["sentiment_label"]))
+
+
+@dataclass(frozen=True, slots=True)
+class SeverityAnalysis:
+    severity_score: int
+    severity_level: str
+    risk_type: str
+    matched_keywords: tuple
+
+    def to_dict(self) -> dict:
+        return {
+            "severity_score": self.severity_score,
+            "severity_level": self.severity_level,
+            "risk_type": self.risk_type,
+            "matched_keywords": list(self.matched_keywords),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SeverityAnalysis":
+        return cls(
+            data["severity_score"],
+            _intern(data["severity_level"]),
+            _intern(data["risk_type"]),
+            _strings(data["matched_keywords"]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Entities:
+    location: str
+    landmark: str
+    lat: float = None
+    lng: float = None
+
+    def to_dict(self) -> dict:
+        return {
+            "location": self.location,
+            "landmark": self.landmark,
+            "coordinates": {"lat": self.lat, "lng": self.lng} if self.lat is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Entities":
+        coordinates = data.get("coordinates")
+        if coordinates:
+            return cls(_intern(data["location"]), _intern(data["landmark"]),
+                       coordinates["lat"], coordinates["lng"])
+        return cls(_intern(data["location"]), _intern(data["landmark"]))
+
+
+@dataclass(frozen=True, slots=True)
+class DepartmentProbability:
+    department: str
+    probability: float
+
+    def to_dict(self) -> dict:
+        return {"department": self.department, "probability": self.probability}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DepartmentProbability":
+        return cls(_intern(data["department"]), data["probability"])
+
+
+@dataclass(frozen=True, slots=True)
+class PriorityScoring:
+    """
+    A priority score and its explainability, one value per COMPONENT_NAMES
+    entry in each tuple. `weights` is shared by every result scored under
+    the same WEIGHTS.
+    """
+    priority_score: float
+    risk_tier: str
+    raw_values: tuple
+    weights: tuple
+    weighted_values: tuple
+    total_before_clamp: float
+
+    def to_dict(self) -> dict:
+        """The compute_priority_score() shape."""
+        return {
+            "priority_score": self.priority_score,
+            "risk_tier": self.risk_tier,
+            "explainability": {
+                "components": [
+                    {"name": name, "raw_value": raw, "weight": weight, "weighted_value": weighted}
+                    for name, raw, weight, weighted in zip(
+                        COMPONENT_NAMES, self.raw_values, self.weights, self.weighted_values
+                    )
+                ],
+                "total_before_clamp": self.total_before_clamp,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PriorityScoring":
+        # Analyses stored by the dashboard carry no components
+        # (`components: []`); a missing component reads as a zero-weight one
+        explainability = data.get("explainability") or {}
+        components = {c["name"]: c for c in explainability.get("components") or ()}
+        ordered = [components.get(name, _ZERO_COMPONENT) for name in COMPONENT_NAMES]
+        return cls(
+            data["priority_score"],
+            _intern(data["risk_tier"]),
+            tuple(c["raw_value"] for c in ordered),
+            _shared(tuple(c["weight"] for c in ordered)),
+            tuple(c["weighted_value"] for c in ordered),
+            explainability.get("total_before_clamp", data["priority_score"]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AnalysisResult:
+    """A full analyze_complaint() / /analyze result (not a field-restricted one)."""
+    language_detection: LanguageDetection
+    translation: Translation
+    category_analysis: CategoryAnalysis
+    sentiment_analysis: SentimentAnalysis
+    severity_analysis: SeverityAnalysis
+    extracted_keywords: tuple
+    entities: Entities
+    department_probabilities: tuple
+    priority_scoring: PriorityScoring
+    summary: str = ""
+    processing_time_ms: float = None
+    stage_versions: tuple = ()        # (stage, fingerprint) pairs
+    recomputed_stages: tuple = ()
+    llm_usage: dict = None
+    degraded_stages: tuple = ()
+    rule_pack_version: str = None
+
+    def to_dict(self) -> dict:
+        result = {
+            "language_detection": self.language_detection.to_dict(),
+            "translation": self.translation.to_dict(),
+            "category_analysis": self.category_analysis.to_dict(),
+            "sentiment_analysis": self.sentiment_analysis.to_dict(),
+            "severity_analysis": self.severity_analysis.to_dict(),
+            "extracted_keywords": list(self.extracted_keywords),
+            "entities": self.entities.to_dict(),
+            "department_probabilities": [d.to_dict() for d in self.department_probabilities],
+            "priority_scoring": self.priority_scoring.to_dict(),
+            "summary": self.summary,
+            "stage_versions": dict(self.stage_versions),
+            "recomputed_stages": list(self.recomputed_stages),
+            "degraded_stages": list(self.degraded_stages),
+        }
+        if self.processing_time_ms is not None:
+            result["processing_time_ms"] = self.processing_time_ms
+        if self.llm_usage is not None:
+            result["llm_usage"] = self.llm_usage
+        if self.rule_pack_version is not None:
+            result["rule_pack_version"] = self.rule_pack_version
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AnalysisResult":
+        return cls(
+            LanguageDetection.from_dict(data["language_detection"]),
+            Translation.from_dict(data["translation"]),
+            CategoryAnalysis.from_dict(data["category_analysis"]),
+            SentimentAnalysis.from_dict(data["sentiment_analysis"]),
+            SeverityAnalysis.from_dict(data["severity_analysis"]),
+            _strings(data["extracted_keywords"]),
+            Entities.from_dict(data["entities"]),
+            tuple(DepartmentProbability.from_dict(d) for d in data["department_probabilities"]),
+            PriorityScoring.from_dict(data["priority_scoring"]),
+            summary=data.get("summary", ""),
+            processing_time_ms=data.get("processing_time_ms"),
+            stage_versions=_shared(tuple((data.get("stage_versions") or {}).items())),
+            recomputed_stages=_strings(data.get("recomputed_stages") or ()),
+            llm_usage=data.get("llm_usage"),
+            degraded_stages=_strings(data.get("degraded_stages") or ()),
+            rule_pack_version=data.get("rule_pack_version"),
+        )
@@ -0,0 +1,108 @@
+"""
+Risk Index — Precompiled Substring Lookup
+===========================================
+Replaces linear scans of the form
+
+    for key in table:
+        if key in text or text in key: ...
+
+with a structure compiled once per table:
+
+- "key in text": Aho-Corasick automaton over all keys, one pass over text
+- "text in key": sorted suffixes of all keys, one binary search for text
+
+Lookup cost grows with the length of the query and the number of
+matches, not with the number of keys, so ward/landmark tables with tens
+of thousands of entries cost the same per complaint as the city table.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Sorts after every character that can appear in a key
+_MAX_CHAR = "\U0010ffff"
+
+
+class RiskIndex:
+    """Finds the entries of a {name: risk} table related to a query by substring containment."""
+
+    def __init__(self, table: Dict[str, float]):
+        self.keys = list(table.keys())
+        self.values = list(table.values())
+        self._build_automaton()
+        self._build_suffixes()
+
+    def _build_automaton(self):
+        goto = [{}]
+        out = [()]
+        for key_id, key in enumerate(self.keys):
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            out[node] += (key_id,)
+
+        # Breadth-first failure links; each node inherits the outputs of its
+        # failure target so a search never has to walk the chain.
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                out[child] += out[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._empty_keys = tuple(i for i, key in enumerate(self.keys) if not key)
+
+    def _build_suffixes(self):
+        suffixes = sorted(
+            (key[start:], key_id)
+            for key_id, key in enumerate(self.keys)
+            for start in range(len(key))
+        )
+        self._suffixes = [s for s, _ in suffixes]
+        self._suffix_owner = [key_id for _, key_id in suffixes]
+
+    def keys_in(self, text: str) -> set:
+        """Ids of keys that occur as substrings of text (key in text)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self._empty_keys)
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def keys_containing(self, text: str) -> set:
+        """Ids of keys that contain text as a substring (text in key)."""
+        if not text:
+            return set(range(len(self.keys)))
+        lo = bisect_left(self._suffixes, text)
+        hi = bisect_left(self._suffixes, text + _MAX_CHAR, lo)
+        return set(self._suffix_owner[lo:hi])
+
+    def related(self, text: str) -> List[int]:
+        """
+        Ids of keys where `key in text or text in key`, in table order —
+        the same keys, in the same order, a linear scan would visit.
+        """
+        return sorted(self.keys_in(text) | self.keys_containing(text))
+
+    def partial_matches(self, text: str) -> List[Tuple[str, float]]:
+        """(key, risk) pairs for every related key, in table order."""
+        return [(self.keys[i], self.values[i]) for i in self.related(text)]
@@ -0,0 +1,562 @@
+"""
+Rule Benchmarks — Micro-Benchmarks for the Rule-Based Stages
+==============================================================
+Times the pure-CPU stages one call at a time, across complaint lengths
+(5 to 5,000 characters by default) and rule-table sizes, and compares
+the timings with a stored baseline so a slowdown shows up before it
+reaches production:
+
+  detect_severity, extract_keywords, recognize_entities,
+  compute_location_risk, compute_keyword_risk, compute_priority_score
+
+- Inputs are built deterministically from complaint-like sentences and
+  place names, cut to each length. The location and keyword risk
+  functions get a location string / word list of that length.
+- Rule-table sizes: --rule-scales 1,4,16 multiplies every rule pack
+  table with synthetic entries that never match (the common case for a
+  big pack), pinned with rule_packs.pinned_rules() for the run. Scale 1
+  is the active pack.
+- Each case is auto-ranged to at least --min-time seconds per sample,
+  then sampled --repeat times with the GC off; the minimum per-call time
+  is what gets compared (the median is reported alongside).
+- Timings are compared in units of a fixed calibration workload (its
+  fastest timing, taken before each table size and at the end of the
+  run), so a baseline taken on a slower or busier machine still
+  compares fairly.
+- A case regresses when its calibrated time exceeds the baseline by more
+  than --threshold (default 25%) and by more than --min-delta-us, which
+  keeps sub-microsecond jitter from failing a run. Slower cases are
+  timed again (--confirm-rounds) and keep their best timing, so a burst
+  of load on the machine doesn't fail a run either.
+- The CLI runs with PYTHONHASHSEED=0 unless it is set: set iteration
+  order changes some timings by up to 2x between interpreter runs.
+
+The printed scaling curves show µs per call by length for each table
+size, with the growth exponent between the two longest lengths (1.0 =
+linear in the text) and across table sizes at the longest length
+(0.0 = independent of the table size).
+
+recognize_entities needs spaCy and its model; it is skipped when they
+can't be loaded. extract_keywords counts into a scratch document
+frequency table, never the node's, deleted when the run ends.
+
+The baseline is committed with the code, so --check works on a fresh
+checkout and in CI; re-save it (on any machine, see calibration above)
+when a change makes a stage intentionally slower.
+
+Paths:
+  RULE_BENCH_BASELINE_PATH  (default benchmarks/rule_benchmarks.json)
+
+Run with:
+  python -m engine.rule_benchmarks --save            # store a baseline
+  python -m engine.rule_benchmarks --check           # exit 1 on a regression
+  python -m engine.rule_benchmarks --functions detect_severity --lengths 50,5000
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from functools import partial
+from pathlib import Path
+
+from engine.rule_packs import RulePack, current_rules, pinned_rules
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE_PATH = _BASE_DIR / "benchmarks" / "rule_benchmarks.json"
+
+DEFAULT_LENGTHS = (5, 50, 500, 5000)
+DEFAULT_RULE_SCALES = (1, 4, 16)
+
+FUNCTIONS = (
+    "detect_severity",
+    "extract_keywords",
+    "recognize_entities",
+    "compute_location_risk",
+    "compute_keyword_risk",
+    "compute_priority_score",
+)
+
+# ─── Inputs ───────────────────────────────────────────────────────────
+
+_SENTENCES = (
+    "There is a huge pothole on MG Road near City Hospital.",
+    "Two bikers were injured last night and the accident was not reported.",
+    "Sewage water is overflowing into the school playground in Ward 12.",
+    "An electric wire is hanging low over the bus stop on Station Road.",
+    "Garbage has not been collected for ten days behind the temple.",
+    "The street lights in Sector 5 are not working and women feel unsafe.",
+    "Water supply is contaminated and children in the colony fell sick.",
+    "A tree fell on the footpath opposite the police station after the rain.",
+    "The drain near the market is blocked, there is a risk of flooding.",
+    "Stray dogs attacked a child near the railway station yesterday.",
+)
+
+_PLACES = (
+    "MG Road", "near City Hospital", "Ward 12", "Andheri East",
+    "opposite the railway station", "Sector 5", "flood zone",
+    "behind Kendriya Vidyalaya", "Station Road", "industrial area",
+)
+
+_CONSONANTS = "bdfgklmnprstvz"
+_VOWELS = "aeiou"
+
+
+def _fill(parts, separator: str, length: int) -> str:
+    """Repeat `parts` in order until `length` characters, cut to exactly `length`."""
+    pieces = []
+    total = 0
+    i = 0
+    while total < length:
+        piece = parts[i % len(parts)]
+        pieces.append(piece)
+        total += len(piece) + len(separator)
+        i += 1
+    return separator.join(pieces)[:length]
+
+
+def complaint_text(length: int) -> str:
+    return _fill(_SENTENCES, " ", length)
+
+
+def place_text(length: int) -> str:
+    return _fill(_PLACES, ", ", length)
+
+
+def keyword_list(length: int) -> list:
+    """Distinct lowercase words of a complaint of `length` characters."""
+    return list(dict.fromkeys(re.findall(r"[a-z]+", complaint_text(length).lower())))
+
+
+# ─── Rule-table sizes ─────────────────────────────────────────────────
+
+def _pseudo_word(rng: random.Random) -> str:
+    return "".join(
+        rng.choice(_CONSONANTS) + rng.choice(_VOWELS) for _ in range(rng.randint(2, 4))
+    )
+
+
+def _synthetic_terms(rng: random.Random, count: int, taken) -> list:
+    """`count` new one- or two-word terms not in `taken` and not English."""
+    terms = []
+    seen = set(taken)
+    while len(terms) < count:
+        term = _pseudo_word(rng)
+        if rng.random() < 0.4:
+            term += " " + _pseudo_word(rng)
+        if term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+def scaled_rules(scale: int, base: RulePack = None) -> RulePack:
+    """
+    `base` (the active pack) with every benchmarked table grown to
+    `scale` times its size by synthetic, never-matching entries.
+    """
+    base = base or current_rules()
+    if scale <= 1:
+        return base
+
+    rng = random.Random(scale)
+    tables = {
+        "severity_keywords": dict(base.severity_keywords),
+        "risk_keywords": sorted(base.risk_keywords),
+        "high_risk_keywords": dict(base.high_risk_keywords),
+        "sensitive_locations": dict(base.sensitive_locations),
+        "sensitive_landmarks": dict(base.sensitive_landmarks),
+        "landmark_keywords": list(base.landmark_keywords),
+        "category_keywords": dict(base.category_keywords),
+    }
+    for name, table in tables.items():
+        if name == "category_keywords":
+            continue
+        extra = _synthetic_terms(rng, (scale - 1) * len(table), table)
+        if name == "severity_keywords":
+            table.update((term, rng.randint(1, 5)) for term in extra)
+        elif isinstance(table, dict):
+            table.update((term, round(rng.uniform(0.1, 0.9), 2)) for term in extra)
+        else:
+            table.extend(extra)
+    return RulePack(tables, version=f"{base.version}+x{scale}")
+
+
+def rule_entries(rules: RulePack) -> int:
+    """Entries across the benchmarked tables."""
+    return (len(rules.severity_keywords) + len(rules.risk_keywords)
+            + len(rules.high_risk_keywords) + len(rules.sensitive_locations)
+            + len(rules.sensitive_landmarks) + len(rules.landmark_keywords))
+
+
+# ─── Cases ────────────────────────────────────────────────────────────
+
+_scratch_dir = None
+
+
+def _use_scratch_document_frequency():
+    """Point extract_keywords at a throwaway corpus table (before its first use)."""
+    global _scratch_dir
+    if _scratch_dir is None:
+        _scratch_dir = tempfile.mkdtemp(prefix="rule_bench_")
+        os.environ["KEYWORD_DF_PATH"] = os.path.join(_scratch_dir, "keyword_df.db")
+        # Registered before the table's own exit flush, so it runs after it
+        atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+
+
+def load_cases(functions) -> dict:
+    """
+    Function name → factory(length) returning a zero-argument call.
+    Functions whose module can't be loaded are left out, with a message.
+    """
+    cases = {}
+    if "detect_severity" in functions:
+        from engine.severity_detector import detect_severity
+        cases["detect_severity"] = lambda n: partial(detect_severity, complaint_text(n))
+
+    if "extract_keywords" in functions:
+        _use_scratch_document_frequency()
+        from engine.keyword_extractor import extract_keywords
+        cases["extract_keywords"] = lambda n: partial(extract_keywords, complaint_text(n))
+
+    if "recognize_entities" in functions:
+        try:
+            from engine.entity_recognizer import recognize_entities
+            recognize_entities(complaint_text(50))
+        except Exception as e:
+            print(f"[RuleBenchmarks] Skipping recognize_entities (spaCy unavailable: {e})")
+        else:
+            cases["recognize_entities"] = lambda n: partial(recognize_entities, complaint_text(n))
+
+    if {"compute_location_risk", "compute_keyword_risk", "compute_priority_score"} & set(functions):
+        from engine.priority_scorer import (
+            compute_keyword_risk,
+            compute_location_risk,
+            compute_priority_score,
+        )
+        cases["compute_location_risk"] = lambda n: partial(
+            compute_location_risk, place_text(n), place_text(max(1, n // 2))
+        )
+        cases["compute_keyword_risk"] = lambda n: partial(compute_keyword_risk, keyword_list(n))
+        cases["compute_priority_score"] = lambda n: partial(
+            compute_priority_score, 6, -0.6, 0.85,
+            place_text(n), place_text(max(1, n // 2)), keyword_list(n),
+        )
+    return {name: cases[name] for name in functions if name in cases}
+
+
+# ─── Timing ───────────────────────────────────────────────────────────
+
+def measure(call, min_time: float = 0.05, repeat: int = 5) -> dict:
+    """
+    Per-call time of `call` in microseconds.
+
+    Returns:
+        {"min_us": 12.3, "median_us": 12.9, "number": 4096}
+    """
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed * 1.2)) if elapsed else number * 10
+    samples = [timer.timeit(number) / number * 1e6 for _ in range(repeat)]
+    return {
+        "min_us": round(min(samples), 4),
+        "median_us": round(statistics.median(samples), 4),
+        "number": number,
+    }
+
+
+_CALIBRATION_TEXT = " ".join(_SENTENCES * 5)
+_CALIBRATION_RE = re.compile(r"\b(?:pothole|injured|sewage|wire|flooding)\b")
+
+
+def _calibration_workload():
+    counts = {}
+    for word in _CALIBRATION_TEXT.lower().split():
+        counts[word] = counts.get(word, 0) + 1
+    _CALIBRATION_RE.findall(_CALIBRATION_TEXT)
+    return sorted(counts, key=counts.get)
+
+
+def calibrate(min_time: float = 0.05, repeat: int = 5) -> float:
+    """Per-call time (µs) of a fixed regex/dict workload, this machine's speed unit."""
+    return measure(_calibration_workload, min_time, repeat)["min_us"]
+
+
+def case_key(function: str, length: int, scale: int) -> str:
+    return f"{function}/len={length}/rules=x{scale}"
+
+
+def run(functions=FUNCTIONS, lengths=DEFAULT_LENGTHS, rule_scales=DEFAULT_RULE_SCALES,
+        min_time: float = 0.05, repeat: int = 5) -> dict:
+    """Time every function × length × table size. Returns a baseline-shaped report."""
+    cases = load_cases(functions)
+    base = current_rules()
+
+    results = {}
+    calibrations = []
+    for scale in rule_scales:
+        calibrations.append(calibrate(min_time, repeat))
+        rules = scaled_rules(scale, base)
+        entries = rule_entries(rules)
+        with pinned_rules(rules):
+            for function, make_call in cases.items():
+                for length in lengths:
+                    call = make_call(length)
+                    call()  # warm caches and lazy loads outside the timing
+                    timing = measure(call, min_time, repeat)
+                    results[case_key(function, length, scale)] = {
+                        "function": function,
+                        "length": length,
+                        "rule_scale": scale,
+                        "rule_entries": entries,
+                        **timing,
+                    }
+                    print(f"[RuleBenchmarks] {case_key(function, length, scale):<48} "
+                          f"{timing['min_us']:>12.2f} µs")
+    calibrations.append(calibrate(min_time, repeat))
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "rule_pack_version": base.version,
+        "calibration_us": min(calibrations),
+        "settings": {
+            "lengths": list(lengths),
+            "rule_scales": list(rule_scales),
+            "min_time": min_time,
+            "repeat": repeat,
+            "hash_seed": os.getenv("PYTHONHASHSEED"),
+        },
+        "results": results,
+    }
+
+
+def remeasure(report: dict, keys, min_time: float = 0.05, repeat: int = 5):
+    """Time the `keys` cases of `report` again, keeping each one's faster timing."""
+    entries = [report["results"][key] for key in keys]
+    cases = load_cases([f for f in FUNCTIONS if any(e["function"] == f for e in entries)])
+    base = current_rules()
+    for scale in sorted({entry["rule_scale"] for entry in entries}):
+        with pinned_rules(scaled_rules(scale, base)):
+            for entry in entries:
+                if entry["rule_scale"] != scale:
+                    continue
+                call = cases[entry["function"]](entry["length"])
+                call()
+                timing = measure(call, min_time, repeat)
+                if timing["min_us"] < entry["min_us"]:
+                    entry.update(timing)
+
+
+# ─── Reporting ────────────────────────────────────────────────────────
+
+def _exponent(x0, y0, x1, y1):
+    if x0 == x1 or y0 <= 0 or y1 <= 0:
+        return None
+    return math.log(y1 / y0) / math.log(x1 / x0)
+
+
+def scaling_curves(report: dict) -> dict:
+    """
+    Per function: µs per call by table size and length, with the growth
+    exponents described in the module docstring.
+
+    Returns:
+        {"detect_severity": {
+            "curves": {1: [[5, 1.2], [50, 3.4], ...], 4: [...]},
+            "length_exponent": {1: 0.98, 4: 1.01},
+            "table_exponent": 0.74}}
+    """
+    curves = {}
+    for entry in report["results"].values():
+        function = curves.setdefault(entry["function"], {"curves": {}, "entries": {}})
+        function["curves"].setdefault(entry["rule_scale"], []).append(
+            [entry["length"], entry["min_us"]]
+        )
+        function["entries"][entry["rule_scale"]] = entry["rule_entries"]
+
+    for function in curves.values():
+        entries = function.pop("entries")
+        function["length_exponent"] = {}
+        for scale, points in function["curves"].items():
+            points.sort()
+            if len(points) >= 2:
+                (x0, y0), (x1, y1) = points[-2], points[-1]
+                function["length_exponent"][scale] = _exponent(x0, y0, x1, y1)
+
+        scales = sorted(function["curves"])
+        function["table_exponent"] = None
+        if len(scales) >= 2:
+            first, last = function["curves"][scales[0]][-1], function["curves"][scales[-1]][-1]
+            if first[0] == last[0]:
+                function["table_exponent"] = _exponent(
+                    entries[scales[0]], first[1], entries[scales[-1]], last[1]
+                )
+    return curves
+
+
+def print_curves(report: dict):
+    lengths = report["settings"]["lengths"]
+    print(f"\nScaling curves (µs per call; calibration unit {report['calibration_us']:.2f} µs)")
+    for function, data in scaling_curves(report).items():
+        print(f"\n  {function}")
+        print("    rules  " + "".join(f"{f'{n} ch':>12}" for n in lengths) + "   len exp")
+        for scale, points in sorted(data["curves"].items()):
+            by_length = dict(points)
+            cells = "".join(
+                f"{by_length[n]:>12.2f}" if n in by_length else f"{'-':>12}" for n in lengths
+            )
+            exponent = data["length_exponent"].get(scale)
+            print(f"    x{scale:<5}" + cells + (f"   {exponent:>7.2f}" if exponent is not None else ""))
+        if data["table_exponent"] is not None:
+            print(f"    table-size exponent at {lengths[-1]} ch: {data['table_exponent']:.2f}")
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.25,
+            min_delta_us: float = 0.5) -> list:
+    """
+    Cases slower than the baseline by more than `threshold` (a fraction)
+    and `min_delta_us`, after scaling the baseline by the calibration
+    ratio of the two runs. Sorted worst first.
+
+    Returns:
+        [{"case": "detect_severity/len=5000/rules=x1", "baseline_us": 41.0,
+          "expected_us": 43.1, "current_us": 60.2, "ratio": 1.4}]
+    """
+    speed = report["calibration_us"] / baseline["calibration_us"]
+    regressions = []
+    for key, entry in report["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        expected = old["min_us"] * speed
+        current = entry["min_us"]
+        ratio = current / expected if expected else float("inf")
+        if ratio > 1 + threshold and current - expected > min_delta_us:
+            regressions.append({
+                "case": key,
+                "baseline_us": old["min_us"],
+                "expected_us": round(expected, 4),
+                "current_us": current,
+                "ratio": round(ratio, 3),
+            })
+    regressions.sort(key=lambda r: -r["ratio"])
+    return regressions
+
+
+def print_comparison(report: dict, baseline: dict, regressions: list, threshold: float):
+    speed = report["calibration_us"] / baseline["calibration_us"]
+    shared = [key for key in report["results"] if key in baseline["results"]]
+    print(f"\nAgainst baseline of {baseline.get('created_at', '?')} "
+          f"({len(shared)} shared cases; this machine runs at {speed:.2f}x the baseline's unit time)")
+    if baseline.get("machine") != report["machine"]:
+        print("  Note: baseline was taken on a different machine/interpreter; "
+              "timings are compared through the calibration unit.")
+    if not regressions:
+        print(f"  No case slower than +{threshold:.0%}.")
+        return
+    for r in regressions:
+        print(f"  REGRESSION {r['case']:<48} {r['expected_us']:>10.2f} → {r['current_us']:>10.2f} µs "
+              f"({r['ratio']:.2f}x)")
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────
+
+def _int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the rule-based stages.")
+    parser.add_argument("--functions", default=",".join(FUNCTIONS), help="Comma-separated subset")
+    parser.add_argument("--lengths", default=",".join(map(str, DEFAULT_LENGTHS)),
+                        help="Complaint lengths in characters")
+    parser.add_argument("--rule-scales", default=",".join(map(str, DEFAULT_RULE_SCALES)),
+                        help="Rule-table size multipliers")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per timing sample")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per case")
+    parser.add_argument("--baseline", default=os.getenv("RULE_BENCH_BASELINE_PATH") or str(DEFAULT_BASELINE_PATH))
+    parser.add_argument("--save", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any case regressed")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--min-delta-us", type=float, default=0.5,
+                        help="Ignore slowdowns smaller than this many µs")
+    parser.add_argument("--confirm-rounds", type=int, default=2,
+                        help="Times to re-time slower cases before reporting them")
+    parser.add_argument("--output", help="Write this run's report as JSON")
+    args = parser.parse_args()
+
+    # Set and dict iteration order (and with it some stages' timings)
+    # depends on the string hash seed; pin it so runs are comparable
+    if os.getenv("PYTHONHASHSEED") is None:
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable, "-m", "engine.rule_benchmarks", *sys.argv[1:]])
+
+    functions = [f.strip() for f in args.functions.split(",") if f.strip()]
+    unknown = sorted(set(functions) - set(FUNCTIONS))
+    if unknown:
+        parser.error(f"unknown functions: {', '.join(unknown)} (choose from {', '.join(FUNCTIONS)})")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.check:
+        print(f"[RuleBenchmarks] No baseline at {args.baseline}; run with --save first.")
+        sys.exit(2)
+
+    report = run(functions, _int_list(args.lengths), _int_list(args.rule_scales),
+                 args.min_time, args.repeat)
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold, args.min_delta_us)
+        for _ in range(args.confirm_rounds):
+            if not regressions:
+                break
+            print(f"[RuleBenchmarks] Re-timing {len(regressions)} slower case(s)...")
+            remeasure(report, [r["case"] for r in regressions], args.min_time, args.repeat)
+            regressions = compare(report, baseline, args.threshold, args.min_delta_us)
+
+    print_curves(report)
+    if baseline is not None:
+        print_comparison(report, baseline, regressions, args.threshold)
+        report["regressions"] = regressions
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[RuleBenchmarks] Report written to {args.output}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in report.items() if k != "regressions"}, f, indent=2)
+        print(f"[RuleBenchmarks] Baseline saved to {args.baseline}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
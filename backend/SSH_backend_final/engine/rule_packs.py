@@ -0,0 +1,385 @@
+"""
+Rule Packs — Hot-Reloadable Rule Tables
+=========================================
+The rule-based stages' tables are built into the code as defaults and
+can be overridden by a versioned rule pack file (none ships; without one
+the tables in code are used):
+
+  {
+    "version": "2026.10.19-1",
+    "severity_keywords": {"sinkhole": 4, ...},
+    "risk_keywords": ["sinkhole", ...],
+    "high_risk_keywords": {"sinkhole": 0.8, ...},
+    "sensitive_locations": {"flood zone": 1.0, ...},
+    "sensitive_landmarks": {"hospital": 0.9, ...},
+    "landmark_keywords": ["school", ...],
+    "category_keywords": {"Infrastructure": "pothole, road damage, ...", ...}
+  }
+
+A table in the pack replaces the built-in one whole; tables it leaves out
+keep their built-in values, so a pack should hold only the tables it
+changes. Category names and subcategories are part of
+the LLM prompt and its response schema, so a pack can only change their
+keyword hints (used by the local classifier).
+
+Loading validates the pack and compiles every matcher (keyword regexes,
+risk indexes) into a new, immutable RulePack off the request path, then
+swaps it in with a single reference assignment. Each pipeline run pins
+the pack active when it started, so a run never mixes two versions. A
+pack that fails to load is rejected and the active one stays.
+
+Reload with POST /rules/reload, or let the watcher pick up changes to the
+file. The active version is reported in every analysis result
+("rule_pack_version") and on /metrics.
+
+Settings:
+  RULE_PACK_PATH           (default data/rule_pack.json)
+  RULE_PACK_WATCH_SECONDS  file check interval (default 10; 0 = reload endpoint only)
+
+Export the built-in tables as a starting pack with:
+  python -m engine.rule_packs export my_pack.json
+"""
+
+import argparse
+import contextvars
+import hashlib
+import importlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from engine.risk_index import RiskIndex
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "rule_pack.json"
+WATCH_SECONDS = float(os.getenv("RULE_PACK_WATCH_SECONDS", 10))
+
+BUILTIN_VERSION = "builtin"
+
+# Pack key → kind of table
+_WEIGHT_TABLES = ("severity_keywords",)
+_RISK_TABLES = ("high_risk_keywords", "sensitive_locations", "sensitive_landmarks")
+_LIST_TABLES = ("risk_keywords", "landmark_keywords")
+TABLES = _WEIGHT_TABLES + _RISK_TABLES + _LIST_TABLES + ("category_keywords",)
+
+
+class RulePackError(ValueError):
+    """Raised for a rule pack that cannot be read or fails validation."""
+
+
+def _phrase_pattern(keyword: str):
+    # Whole words, any whitespace between the words of a phrase
+    return re.compile(r'\b' + r'\s+'.join(re.escape(w) for w in keyword.split()) + r'\b')
+
+
+# Where each built-in table is defined
+_BUILTIN_SOURCES = {
+    "severity_keywords": ("engine.severity_detector", "SEVERITY_KEYWORDS"),
+    "risk_keywords": ("engine.keyword_extractor", "RISK_KEYWORDS"),
+    "high_risk_keywords": ("engine.priority_scorer", "HIGH_RISK_KEYWORDS"),
+    "sensitive_locations": ("engine.priority_scorer", "SENSITIVE_LOCATIONS"),
+    "sensitive_landmarks": ("engine.priority_scorer", "SENSITIVE_LANDMARKS"),
+    "landmark_keywords": ("engine.entity_recognizer", "LANDMARK_KEYWORDS"),
+    "category_keywords": ("engine.category_classifier", "CATEGORY_TAXONOMY"),
+}
+
+
+def builtin_table(name: str):
+    """
+    One table as defined in code. Imported on demand (those modules import
+    this one), so a pack with every table never loads spaCy or OpenAI.
+    """
+    module, attribute = _BUILTIN_SOURCES[name]
+    table = getattr(importlib.import_module(module), attribute)
+    if name == "risk_keywords":
+        return sorted(table)
+    if name == "category_keywords":
+        return {cat: info["keywords"] for cat, info in table.items()}
+    return table
+
+
+def builtin_tables() -> dict:
+    return {name: builtin_table(name) for name in TABLES}
+
+
+def _validate(pack: dict) -> dict:
+    """Normalized tables of a parsed pack file, built-in ones filling the gaps."""
+    unknown = set(pack) - set(TABLES) - {"version", "description"}
+    if unknown:
+        raise RulePackError(f"unknown tables: {', '.join(sorted(unknown))}")
+
+    tables = {}
+    for name in TABLES:
+        if name not in pack:
+            tables[name] = builtin_table(name)
+            continue
+        value = pack[name]
+        if name in _LIST_TABLES:
+            if not isinstance(value, list) or not all(isinstance(k, str) and k.strip() for k in value):
+                raise RulePackError(f"{name} must be a list of non-empty strings")
+            tables[name] = [k.strip().lower() for k in value]
+        elif name == "category_keywords":
+            if not isinstance(value, dict) or not all(isinstance(v, str) for v in value.values()):
+                raise RulePackError("category_keywords must map category names to comma-separated keywords")
+            builtin = builtin_table(name)
+            extra = set(value) - set(builtin)
+            if extra:
+                raise RulePackError(f"category_keywords has unknown categories: {', '.join(sorted(extra))}")
+            tables[name] = dict(builtin, **value)
+        else:
+            if not isinstance(value, dict):
+                raise RulePackError(f"{name} must be an object")
+            table = {}
+            for key, number in value.items():
+                if not key.strip() or isinstance(number, bool) or not isinstance(number, (int, float)):
+                    raise RulePackError(f"{name}[{key!r}] must be a number")
+                if name in _WEIGHT_TABLES and number not in (1, 2, 3, 4, 5):
+                    raise RulePackError(f"{name}[{key!r}] must be a weight from 1 to 5")
+                if name in _RISK_TABLES and not 0.0 <= number <= 1.0:
+                    raise RulePackError(f"{name}[{key!r}] must be a risk between 0 and 1")
+                table[key.strip().lower()] = int(number) if name in _WEIGHT_TABLES else float(number)
+            tables[name] = table
+    return tables
+
+
+class RulePack:
+    """One version of the rule tables with every matcher compiled. Never mutated."""
+
+    def __init__(self, tables: dict, version: str = BUILTIN_VERSION, digest: str = None,
+                 source: str = None):
+        self.version = version
+        self.digest = digest
+        self.source = source
+        self.loaded_at = time.time()
+
+        self.severity_keywords = dict(tables["severity_keywords"])
+        self.risk_keywords = frozenset(tables["risk_keywords"])
+        self.high_risk_keywords = dict(tables["high_risk_keywords"])
+        self.sensitive_locations = dict(tables["sensitive_locations"])
+        self.sensitive_landmarks = dict(tables["sensitive_landmarks"])
+        self.landmark_keywords = list(tables["landmark_keywords"])
+        self.category_keywords = dict(tables["category_keywords"])
+
+        # Longest first so phrases match before the words they contain
+        self.severity_patterns = [
+            (keyword, self.severity_keywords[keyword], _phrase_pattern(keyword))
+            for keyword in sorted(self.severity_keywords, key=len, reverse=True)
+        ]
+        self.risk_patterns = [
+            (keyword, _phrase_pattern(keyword))
+            for keyword in sorted(sorted(self.risk_keywords), key=len, reverse=True)
+        ]
+        self.location_index = RiskIndex(self.sensitive_locations)
+        self.landmark_index = RiskIndex(self.sensitive_landmarks)
+        self.keyword_index = RiskIndex(self.high_risk_keywords)
+        self.landmark_patterns = [
+            re.compile(r'\b\w+\s+' + re.escape(keyword) + r'\b', re.IGNORECASE)
+            for keyword in self.landmark_keywords
+        ]
+        self.category_keyword_res = {
+            cat: re.compile(r"\b(?:" + "|".join(
+                re.escape(k.strip()) for k in keywords.split(",") if k.strip()
+            ) + r")\b")
+            for cat, keywords in self.category_keywords.items()
+            if cat != "Other" and keywords.strip()
+        }
+
+
+def load_rule_pack(path=None) -> RulePack:
+    """
+    Compile the pack at `path` (RULE_PACK_PATH or data/rule_pack.json), or
+    the built-in tables if there is no such file.
+
+    Raises:
+        RulePackError: when the file can't be parsed or fails validation.
+    """
+    path = str(path or os.getenv("RULE_PACK_PATH") or DEFAULT_PATH)
+    if not os.path.exists(path):
+        return RulePack(builtin_tables())
+
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        pack = json.loads(raw)
+    except (OSError, ValueError) as e:
+        raise RulePackError(f"cannot read {path}: {e}")
+    if not isinstance(pack, dict):
+        raise RulePackError(f"{path} must contain a JSON object")
+
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    version = str(pack.get("version") or digest)
+    return RulePack(_validate(pack), version=version, digest=digest, source=path)
+
+
+# ─── Active Pack ──────────────────────────────────────────
+
+_active = None
+_load_lock = threading.Lock()
+# The pack a pipeline run started with; copied into its stage threads
+_pinned = contextvars.ContextVar("rule_pack", default=None)
+
+_reloads = 0
+_failed_reloads = 0
+_last_error = None
+_watcher = None
+_reload_hooks = []
+
+
+def _initial_load() -> RulePack:
+    global _active
+    with _load_lock:
+        if _active is None:
+            try:
+                _active = load_rule_pack()
+            except RulePackError as e:
+                print(f"[RulePacks] {e}; using the built-in rules.")
+                _active = RulePack(builtin_tables())
+            print(f"[RulePacks] Active rule pack: {_active.version}")
+        return _active
+
+
+def current_rules() -> RulePack:
+    """The pack of the current pipeline run, else the active one."""
+    return _pinned.get() or _active or _initial_load()
+
+
+@contextmanager
+def pinned_rules(rules: RulePack = None):
+    """
+    Run the block (and the stage threads it copies its context into) on
+    one pack: `rules`, or the one active now.
+    """
+    rules = rules or current_rules()
+    token = _pinned.set(rules)
+    try:
+        yield rules
+    finally:
+        _pinned.reset(token)
+
+
+def on_reload(callback):
+    """Call `callback()` after every swap of the active pack (to drop caches built from the old one)."""
+    _reload_hooks.append(callback)
+
+
+def reload_rules(path=None) -> RulePack:
+    """
+    Load, compile and swap in the rule pack. Runs already in flight keep
+    the pack they started with.
+
+    Raises:
+        RulePackError: the pack was rejected; the active one stays.
+    """
+    global _active, _reloads, _failed_reloads, _last_error
+    with _load_lock:
+        try:
+            pack = load_rule_pack(path)
+        except RulePackError as e:
+            _failed_reloads += 1
+            _last_error = str(e)
+            print(f"[RulePacks] Reload rejected: {e}")
+            raise
+        previous = _active
+        _active = pack
+        _reloads += 1
+        _last_error = None
+    print(f"[RulePacks] Swapped rule pack {previous.version if previous else None} → {pack.version}")
+    for callback in _reload_hooks:
+        callback()
+    return pack
+
+
+def start_watcher():
+    """Reload whenever the pack file changes (idempotent; off if RULE_PACK_WATCH_SECONDS is 0)."""
+    global _watcher
+    if WATCH_SECONDS <= 0 or _watcher is not None:
+        return
+    current_rules()
+    _watcher = threading.Thread(target=_watch, name="rule-pack-watcher", daemon=True)
+    _watcher.start()
+
+
+def _file_state(path: str):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _watch():
+    path = str(os.getenv("RULE_PACK_PATH") or DEFAULT_PATH)
+    seen = _file_state(path)
+    changing = None
+    while True:
+        time.sleep(WATCH_SECONDS)
+        state = _file_state(path)
+        if state == seen:
+            changing = None
+            continue
+        if state != changing:
+            # Wait until the file has stopped changing, not mid-write
+            changing = state
+            continue
+        seen, changing = state, None
+        try:
+            reload_rules(path)
+        except RulePackError:
+            pass  # logged; retried on the file's next change
+
+
+def stats() -> dict:
+    """
+    Returns:
+        {
+            "version": "2026.10.19-1",
+            "digest": "9f2c41d07be3a611",
+            "source": "/app/data/rule_pack.json",
+            "loaded_at": 1760862000.0,
+            "reloads": 3,
+            "failed_reloads": 1,
+            "last_error": null
+        }
+    """
+    rules = current_rules()
+    return {
+        "version": rules.version,
+        "digest": rules.digest,
+        "source": rules.source,
+        "loaded_at": rules.loaded_at,
+        "reloads": _reloads,
+        "failed_reloads": _failed_reloads,
+        "last_error": _last_error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule pack tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Write the built-in tables as a rule pack")
+    export.add_argument("output")
+    export.add_argument("--version", default="1")
+
+    check = sub.add_parser("check", help="Validate and compile a rule pack")
+    check.add_argument("path", nargs="?", default=str(DEFAULT_PATH))
+
+    args = parser.parse_args()
+    if args.command == "export":
+        pack = {"version": args.version, **builtin_tables()}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(pack, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"[RulePacks] Wrote the built-in tables to {args.output}.")
+    else:
+        pack = load_rule_pack(args.path)
+        print(f"[RulePacks] {args.path}: version {pack.version}, "
+              f"{len(pack.severity_keywords)} severity keywords, "
+              f"{len(pack.risk_keywords)} risk keywords.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Semantic Cache — Reuse LLM Results for Near-Identical Complaints
+==================================================================
+Many complaints are paraphrases of one another ("pothole near City
+Hospital on MG Road" / "big pothole MG road by City hospital") and get
+the same category, departments and sentiment. The semantic cache embeds
+the (translated) complaint text and, when a cached complaint is similar
+enough, reuses its category_analysis + department_probabilities and
+sentiment_analysis instead of calling the LLM. The rule-based stages
+(severity, keywords, entities, priority) always run on the new text.
+
+Embedding: signed feature hashing of the normalized text's words (stop
+words dropped, negations attached to the word they negate) and their
+character trigrams into a fixed-size, L2-normalized vector — no model,
+a few microseconds per text.
+Word order is ignored, so reordered paraphrases land close together.
+Place words (numbers, street/locality words like "road", "nagar",
+"block", landmark types, gazetteer places) are left out: a long shared
+address would otherwise outweigh a short, different problem.
+
+Topic check: a cached answer is only reused when both texts match the
+same rule pack category keywords and risk keywords ("dog bite" vs
+"fire" at the same address never match, however similar the rest), under
+the same rule pack. Embeddings are recomputed after a rule pack reload.
+
+Index: a preallocated matrix of the last SEMANTIC_CACHE_SIZE entries per
+worker process (oldest overwritten first); a lookup is one matrix-vector
+product. Only LLM results are cached, never local fallbacks.
+
+Settings:
+  SEMANTIC_CACHE_SIZE       entries kept (default 4096; 0 disables the cache)
+  SEMANTIC_CACHE_THRESHOLD  cosine similarity needed to reuse (default 0.82)
+  SEMANTIC_CACHE_STAGES     stages that may reuse results
+                            (default category_analysis,sentiment_analysis)
+"""
+
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from engine.gazetteer import get_gazetteer
+from engine.keyword_extractor import STOP_WORDS
+from engine.rule_packs import current_rules, on_reload
+
+CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", 4096))
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.82))
+CACHED_STAGES = [
+    s.strip()
+    for s in os.getenv("SEMANTIC_CACHE_STAGES", "category_analysis,sentiment_analysis").split(",")
+    if s.strip()
+]
+
+EMBEDDING_DIM = 1024
+# Feature weights: whole words carry the meaning, trigrams absorb spelling
+# and inflection differences ("potholes", "pot hole")
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.35
+
+# Words every complaint uses, on top of the keyword extractor's stop words
+_FILLER_WORDS = {
+    "near", "since", "days", "day", "area", "big", "kindly", "sir", "madam",
+    "dear", "problem", "issue", "complaint", "urgent", "urgently",
+}
+# Negations flip a complaint's meaning: "not working" must not match "working"
+_NEGATIONS = {"no", "not", "nor", "never", "without"}
+_IGNORED_WORDS = (STOP_WORDS | _FILLER_WORDS) - _NEGATIONS
+_WORD_RE = re.compile(r"\w+")
+
+# Words of addresses rather than of the problem
+_PLACE_WORDS = {
+    "road", "rd", "lane", "avenue", "marg", "path", "highway", "bypass",
+    "nagar", "colony", "sector", "block", "ward", "layout", "cross", "main", "phase",
+    "stage", "extension", "chowk", "circle", "square", "junction", "puram", "pet", "peth",
+    "opposite", "behind", "beside", "next", "front", "adjacent", "nh", "sh",
+}
+# Plural "s" dropped before embedding/topic matching ("potholes" → "pothole"), not after "ss"
+_PLURAL_RE = re.compile(r"\b(\w{2,}[^\Ws])s\b")
+
+
+def _words(text: str) -> list:
+    """Content words of a text; a negated word becomes "not_<word>"."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    words = []
+    negated = False
+    for word in _WORD_RE.findall(text):
+        if word in _NEGATIONS:
+            negated = True
+        elif word not in _IGNORED_WORDS:
+            words.append("not_" + word if negated else word)
+            negated = False
+    return words
+
+
+def _is_place_word(word: str, landmark_words: set, gazetteer) -> bool:
+    word = word.removeprefix("not_")
+    if word in _PLACE_WORDS or word in landmark_words or any(c.isdigit() for c in word):
+        return True
+    return gazetteer is not None and gazetteer.lookup(word) is not None
+
+
+def _content_words(text: str) -> list:
+    """_words() without the place words."""
+    landmark_words = {w for kw in current_rules().landmark_keywords for w in kw.split()}
+    gazetteer = get_gazetteer()
+    return [
+        _PLURAL_RE.sub(r"\1", w) for w in _words(text)
+        if not _is_place_word(w, landmark_words, gazetteer)
+    ]
+
+
+def topic_signature(text: str) -> frozenset:
+    """Categories and risk keywords of the active rule pack that `text` mentions."""
+    rules = current_rules()
+    lowered = _PLURAL_RE.sub(r"\1", unicodedata.normalize("NFKC", text).lower())
+    topics = {cat for cat, pattern in rules.category_keyword_res.items() if pattern.search(lowered)}
+    topics.update(
+        keyword for keyword, pattern in rules.risk_patterns
+        if keyword in lowered and pattern.search(lowered)
+    )
+    return frozenset(topics)
+
+
+def _topic_key(text: str) -> int:
+    """What a cached row must share with a lookup: rule pack and topic_signature."""
+    rules = current_rules()
+    return hash((rules.version, rules.loaded_at, topic_signature(text)))
+
+
+def _hash_feature(feature: str) -> tuple:
+    """(dimension, sign) of a feature; crc32 is stable across processes."""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % EMBEDDING_DIM, 1.0 if h & 0x80000000 else -1.0
+
+
+@lru_cache(maxsize=512)
+def embed(text: str) -> np.ndarray:
+    """
+    Hashed word + character-trigram embedding of the content words,
+    L2-normalized (all zeros if there are none).
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in set(_content_words(text)):
+        index, sign = _hash_feature("w:" + word)
+        vector[index] += sign * WORD_WEIGHT
+        # A negated word's trigrams live apart from the plain word's
+        prefix = "n:" if word.startswith("not_") else "c:"
+        padded = f"#{word.removeprefix('not_')}#"
+        for i in range(len(padded) - 2):
+            index, sign = _hash_feature(prefix + padded[i:i + 3])
+            vector[index] += sign * TRIGRAM_WEIGHT
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    vector.setflags(write=False)
+    return vector
+
+
+def normalized_key(text: str) -> str:
+    return " ".join(sorted(set(_words(text))))
+
+
+class SemanticCache:
+    """Fixed-size in-memory vector index of recent complaints and their LLM stage outputs."""
+
+    def __init__(self, size: int = CACHE_SIZE, threshold: float = SIMILARITY_THRESHOLD,
+                 stages=CACHED_STAGES):
+        self.size = size
+        self.threshold = threshold
+        self.stages = set(stages)
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((max(size, 0), EMBEDDING_DIM), dtype=np.float32)
+        # Per stage: which rows hold an output of that stage
+        self._has_stage = {stage: np.zeros(max(size, 0), dtype=bool) for stage in self.stages}
+        self._topics = np.zeros(max(size, 0), dtype=np.int64)  # row -> _topic_key()
+        self._payloads = [None] * max(size, 0)  # row -> {stage: outputs}
+        self._keys = [None] * max(size, 0)      # row -> normalized_key
+        self._rows = {}                         # normalized_key -> row
+        self._next = 0
+        self._count = 0
+
+        self.hits = {stage: 0 for stage in self.stages}
+        self.misses = {stage: 0 for stage in self.stages}
+
+    def enabled(self, stage: str) -> bool:
+        return self.size > 0 and stage in self.stages
+
+    def lookup(self, text: str, stage: str):
+        """
+        A cached output of `stage` for a complaint similar to `text` and
+        on the same topic (topic_signature), or None.
+
+        Returns:
+            ({"category_analysis": {...}, "department_probabilities": [...]}, 0.93)
+        """
+        if not self.enabled(stage):
+            return None
+        vector = embed(text)
+        if not vector.any():
+            return None
+        topic = _topic_key(text)
+
+        with self._lock:
+            if self._count:
+                similarities = self._vectors[:self._count] @ vector
+                similarities[~self._has_stage[stage][:self._count]] = -1.0
+                similarities[self._topics[:self._count] != topic] = -1.0
+                row = int(np.argmax(similarities))
+                similarity = float(similarities[row])
+                if similarity >= self.threshold:
+                    self.hits[stage] += 1
+                    return self._payloads[row][stage], similarity
+            self.misses[stage] += 1
+        return None
+
+    def store(self, text: str, stage: str, outputs: dict):
+        """Remember a stage's LLM outputs for `text`."""
+        if not self.enabled(stage):
+            return
+        vector = embed(text)
+        if not vector.any():
+            return
+        key = normalized_key(text)
+        topic = _topic_key(text)
+
+        with self._lock:
+            row = self._rows.get(key)
+            new_row = row is None
+            if new_row:
+                row = self._next
+                self._next = (self._next + 1) % self.size
+                self._count = min(self._count + 1, self.size)
+                evicted = self._keys[row]
+                if evicted is not None:
+                    del self._rows[evicted]
+                self._keys[row] = key
+                self._rows[key] = row
+            if new_row or self._topics[row] != topic:
+                # New row, or the same text stored under another rule pack
+                for has_stage in self._has_stage.values():
+                    has_stage[row] = False
+                self._vectors[row] = vector
+                self._topics[row] = topic
+                self._payloads[row] = {}
+            self._payloads[row][stage] = outputs
+            self._has_stage[stage][row] = True
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            {
+                "entries": 1830,
+                "size": 4096,
+                "threshold": 0.82,
+                "hits": {"category_analysis": 412, "sentiment_analysis": 398},
+                "misses": {"category_analysis": 1790, ...}
+            }
+        """
+        with self._lock:
+            return {
+                "entries": self._count,
+                "size": self.size,
+                "threshold": self.threshold,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+
+# Shared by every pipeline run in the process
+semantic_cache = SemanticCache()
+
+# Embeddings leave out the pack's landmark words
+on_reload(embed.cache_clear)
@@ -6,26 +6,114 @@ Uses OpenAI's model for sentiment analysis of complaint text.
 Model: gpt-4o-mini
 
 Outputs a score between -1.0 (very negative) and +1.0 (very positive).
+analyze_sentiment_local() is a lexicon-based stand-in used when the
+token budget degrades this stage.
 """
 
 import os
 import json
+import re
 import time
 from dotenv import load_dotenv
-from openai import OpenAI
-from engine.config import OPENAI_API_KEY
+from engine.deadline import call_timeout, can_wait
+from engine.llm_router import chat_completion
+from engine.token_budget import mark_degraded
 
-_client = None
+MODEL = "gpt-4o-mini"
 
+SYSTEM_PROMPT = "You are a JSON-only API. Output strict JSON."
 
-def _ensure_client():
-    """Initialize the OpenAI client."""
-    global _client
-    if _client is not None:
-        return
+PROMPT_TEMPLATE = """You are a sentiment analyzer for citizen complaints, simulating RoBERTa sentiment model output.
 
-    _client = OpenAI(api_key=OPENAI_API_KEY)
-    print("[SentimentAnalyzer] OpenAI client initialized.")
+Analyze this complaint's sentiment:
+"{text}"
+
+Rules:
+- sentiment_score: float between -1.0 (very negative) and +1.0 (very positive)
+- Most civic complaints are negative (-0.5 to -0.9)
+- Urgent/dangerous complaints are very negative (-0.8 to -0.95)
+- Neutral informational reports: around -0.2 to 0.0
+- sentiment_label: one of "Very Negative", "Negative", "Neutral", "Positive", "Very Positive"
+
+Examples:
+"pothole causing accidents, people injured" → {{"sentiment_score": -0.88, "sentiment_label": "Very Negative"}}
+"garbage not collected for weeks" → {{"sentiment_score": -0.65, "sentiment_label": "Negative"}}
+"streetlight fixed, thank you" → {{"sentiment_score": 0.72, "sentiment_label": "Positive"}}
+"requesting information about water schedule" → {{"sentiment_score": -0.1, "sentiment_label": "Neutral"}}
+
+Return ONLY this JSON, no other text:
+{{"sentiment_score": 0.0, "sentiment_label": ""}}"""
+
+# Lexicon for the local fallback, anchored on the prompt's examples
+URGENT_NEGATIVE_TERMS = [
+    "accident", "injured", "injury", "death", "died", "dead", "fire", "electrocution",
+    "electric shock", "live wire", "sparking", "collapse", "collapsed", "emergency",
+    "urgent", "dangerous", "danger", "life threatening", "drowning", "gas leak",
+]
+NEGATIVE_TERMS = [
+    "not working", "broken", "damaged", "dirty", "garbage", "leak", "leakage", "delay",
+    "no water", "not collected", "pothole", "overflow", "overflowing", "stinking",
+    "smell", "blocked", "clogged", "problem", "issue", "complaint", "worst", "poor",
+    "pathetic", "ignored", "days", "weeks", "not repaired", "outage", "power cut",
+]
+POSITIVE_TERMS = [
+    "thank", "thanks", "fixed", "resolved", "repaired", "appreciate", "good job",
+    "great", "quick", "prompt",
+]
+NEUTRAL_TERMS = ["requesting information", "request information", "inquiry", "enquiry", "schedule"]
+
+VALID_LABELS = ["Very Negative", "Negative", "Neutral", "Positive", "Very Positive"]
+
+
+def _terms_pattern(terms: list) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b")
+
+
+_URGENT_RE = _terms_pattern(URGENT_NEGATIVE_TERMS)
+_NEGATIVE_RE = _terms_pattern(NEGATIVE_TERMS)
+_POSITIVE_RE = _terms_pattern(POSITIVE_TERMS)
+_NEUTRAL_RE = _terms_pattern(NEUTRAL_TERMS)
+
+
+def _label_for(score: float) -> str:
+    if score <= -0.7:
+        return "Very Negative"
+    elif score <= -0.3:
+        return "Negative"
+    elif score <= 0.3:
+        return "Neutral"
+    elif score <= 0.7:
+        return "Positive"
+    return "Very Positive"
+
+
+def analyze_sentiment_local(text: str) -> dict:
+    """
+    Lexicon-based sentiment without an API call.
+
+    Civic complaints default to negative; urgent/dangerous wording pushes
+    the score towards -0.9, thanks or "fixed" towards positive.
+    """
+    lowered = text.lower()
+    urgent = len(_URGENT_RE.findall(lowered))
+    negative = len(_NEGATIVE_RE.findall(lowered))
+    positive = len(_POSITIVE_RE.findall(lowered))
+
+    if urgent:
+        score = -0.85 - 0.03 * min(urgent - 1, 3)
+    elif positive > negative:
+        score = min(0.9, 0.5 + 0.1 * (positive - negative))
+    elif negative:
+        score = -0.55 - 0.05 * min(negative - 1, 4)
+    elif _NEUTRAL_RE.search(lowered):
+        score = -0.1
+    else:
+        score = -0.5
+
+    return {
+        "sentiment_score": round(score, 4),
+        "sentiment_label": _label_for(score)
+    }
 
 
 def analyze_sentiment(text: str) -> dict:
@@ -38,7 +126,6 @@ def analyze_sentiment(text: str) -> dict:
             "sentiment_label": "Very Negative"
         }
     """
-    _ensure_client()
 
     if not text.strip():
         return {
@@ -46,39 +133,22 @@ def analyze_sentiment(text: str) -> dict:
             "sentiment_label": "Neutral"
         }
 
-    prompt = f"""You are a sentiment analyzer for citizen complaints, simulating RoBERTa sentiment model output.
-
-Analyze this complaint's sentiment:
-"{text}"
-
-Rules:
-- sentiment_score: float between -1.0 (very negative) and +1.0 (very positive)
-- Most civic complaints are negative (-0.5 to -0.9)
-- Urgent/dangerous complaints are very negative (-0.8 to -0.95)
-- Neutral informational reports: around -0.2 to 0.0
-- sentiment_label: one of "Very Negative", "Negative", "Neutral", "Positive", "Very Positive"
-
-Examples:
-"pothole causing accidents, people injured" → {{"sentiment_score": -0.88, "sentiment_label": "Very Negative"}}
-"garbage not collected for weeks" → {{"sentiment_score": -0.65, "sentiment_label": "Negative"}}
-"streetlight fixed, thank you" → {{"sentiment_score": 0.72, "sentiment_label": "Positive"}}
-"requesting information about water schedule" → {{"sentiment_score": -0.1, "sentiment_label": "Neutral"}}
-
-Return ONLY this JSON, no other text:
-{{"sentiment_score": 0.0, "sentiment_label": ""}}"""
+    prompt = PROMPT_TEMPLATE.format(text=text)
 
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = _client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = chat_completion(
+                "sentiment_analysis",
+                model=MODEL,
                 response_format={ "type": "json_object" },
                 messages=[
-                    {"role": "system", "content": "You are a JSON-only API. Output strict JSON."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.05,
                 max_tokens=60,
+                timeout=call_timeout(10),
             )
 
             content = response.choices[0].message.content.strip()
@@ -90,19 +160,9 @@ Return ONLY this JSON, no other text:
             score = max(-1.0, min(1.0, score))
 
             # Validate label
-            valid_labels = ["Very Negative", "Negative", "Neutral", "Positive", "Very Positive"]
             label = result.get("sentiment_label", "Neutral")
-            if label not in valid_labels:
-                if score <= -0.7:
-                    label = "Very Negative"
-                elif score <= -0.3:
-                    label = "Negative"
-                elif score <= 0.3:
-                    label = "Neutral"
-                elif score <= 0.7:
-                    label = "Positive"
-                else:
-                    label = "Very Positive"
+            if label not in VALID_LABELS:
+                label = _label_for(score)
 
             return {
                 "sentiment_score": round(score, 4),
@@ -111,13 +171,12 @@ Return ONLY this JSON, no other text:
 
         except Exception as e:
             error_str = str(e).lower()
-            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1:
+            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1 \
+                    and can_wait(15 * (attempt + 1)):
                 wait_time = 15 * (attempt + 1)
                 print(f"[SentimentAnalyzer] Rate limited, waiting {wait_time}s (attempt {attempt + 1}/{max_retries})...")
                 time.sleep(wait_time)
             else:
                 print(f"[SentimentAnalyzer] OpenAI API error: {e}")
-                return {
-                    "sentiment_score": -0.5,
-                    "sentiment_label": "Negative"
-                }
+                mark_degraded("sentiment_analysis")
+                return analyze_sentiment_local(text)
@@ -187,8 +187,13 @@ Severity Levels:
 - Medium (weight 3): pothole, water leakage, streetlight failure
 - Low (weight 2): garbage delay, noise complaint, minor delay
 - Minimal (weight 1): suggestion, feedback
+
+SEVERITY_KEYWORDS below is the built-in table; the active rule pack
+(engine.rule_packs) may replace it and holds the compiled patterns.
 """
 
+from engine.rule_packs import current_rules
+
 
 # Severity keyword definitions with weights
 SEVERITY_KEYWORDS = {
@@ -321,20 +326,11 @@ def detect_severity(text: str) -> dict:
     total_weight = 0
     highest_weight = 0
 
-    # Sort keywords by length (longest first) to match phrases before words
-    sorted_keywords = sorted(SEVERITY_KEYWORDS.keys(), key=len, reverse=True)
-
-    matched_set = set()  # Track matched positions to avoid double-counting
-
-    for keyword in sorted_keywords:
+    # Longest first to match phrases before words; patterns are precompiled
+    # with word boundaries and \s+ between the words of a phrase
+    for keyword, weight, pattern in current_rules().severity_patterns:
         if keyword in text_lower:
-            # Check for word boundary match (avoid partial matches)
-            import re
-            # Escape the keyword, but replace spaces with \s+ to handle varying whitespace
-            escaped_kw = r'\s+'.join(re.escape(w) for w in keyword.split())
-            pattern = r'\b' + escaped_kw + r'\b'
-            if re.search(pattern, text_lower):
-                weight = SEVERITY_KEYWORDS[keyword]
+            if pattern.search(text_lower):
                 matched_keywords.append(keyword)
                 total_weight += weight
 
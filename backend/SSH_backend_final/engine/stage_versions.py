@@ -0,0 +1,163 @@
+"""
+Stage Versions — Per-Stage Version Fingerprints
+=================================================
+Every pipeline stage's output is a function of the complaint text plus a
+set of versioned inputs (rule tables, prompt text, model name and the
+LLM routes serving the stage). This
+module hashes those inputs into a short fingerprint per stage, so stored
+results can tell which stages are stale after a rules or prompt change.
+
+Bump a stage's entry in STAGE_REVISIONS when its logic changes in a way
+the hashed inputs don't capture.
+
+Not fingerprinted: the node's document frequency corpus
+(engine.document_frequency). extracted_keywords drifts as the corpus
+grows while its fingerprint stays the same, so /reanalyze doesn't
+refresh keywords for that reason alone.
+"""
+
+import hashlib
+import json
+
+STAGE_REVISIONS = {
+    "language_detection": 1,
+    "translation": 1,
+    "category_analysis": 1,
+    "sentiment_analysis": 1,
+    "severity_analysis": 1,
+    "extracted_keywords": 2,
+    "entities": 1,
+    "priority_scoring": 1,
+    "summary": 1,
+}
+
+
+# Each function returns the versioned inputs of one stage; rule tables
+# come from the active rule pack (engine.rule_packs).
+# Imports are local so that fingerprinting a rule-based stage never pulls
+# in the OpenAI/spaCy dependencies of the others.
+
+def _llm_inputs(module, stage: str) -> tuple:
+    # The route table may send the stage to other models and endpoints
+    from engine.llm_router import get_llm_router
+    routes = get_llm_router().route_versions(stage, module.MODEL)
+    return (module.MODEL, module.SYSTEM_PROMPT, module.PROMPT_TEMPLATE, routes)
+
+
+def _language_detection_inputs() -> tuple:
+    from engine import language_detector
+    return _llm_inputs(language_detector, "language_detection")
+
+
+def _translation_inputs() -> tuple:
+    from engine import translator
+    return _llm_inputs(translator, "translation") + (translator.SEGMENTS_PROMPT_TEMPLATE,)
+
+
+def _category_inputs() -> tuple:
+    from engine import category_classifier
+    from engine.rule_packs import current_rules
+    keywords = current_rules().category_keywords
+    taxonomy = {
+        cat: dict(info, keywords=keywords[cat])
+        for cat, info in category_classifier.CATEGORY_TAXONOMY.items()
+    }
+    return _llm_inputs(category_classifier, "category_analysis") + (
+        taxonomy,
+        category_classifier.CATEGORY_CODES,
+        category_classifier.DEPARTMENT_CODES,
+    )
+
+
+def _sentiment_inputs() -> tuple:
+    from engine import sentiment_analyzer
+    return _llm_inputs(sentiment_analyzer, "sentiment_analysis")
+
+
+def _severity_inputs() -> tuple:
+    from engine import severity_detector
+    from engine.rule_packs import current_rules
+    return (current_rules().severity_keywords, severity_detector.SEVERITY_LEVELS)
+
+
+def _keyword_inputs() -> tuple:
+    from engine import keyword_extractor
+    from engine.rule_packs import current_rules
+    return (current_rules().risk_keywords, keyword_extractor.STOP_WORDS)
+
+
+def _entity_inputs() -> tuple:
+    from engine import entity_recognizer
+    from engine.gazetteer import get_gazetteer
+    from engine.rule_packs import current_rules
+    gazetteer = get_gazetteer()
+    return (
+        entity_recognizer.SPACY_MODEL,
+        entity_recognizer.LANDMARK_PATTERNS,
+        current_rules().landmark_keywords,
+        entity_recognizer.LOCATION_INDICATORS,
+        gazetteer.fingerprint if gazetteer is not None else None,
+    )
+
+
+def _priority_inputs() -> tuple:
+    from engine import priority_scorer
+    from engine.rule_packs import current_rules
+    rules = current_rules()
+    return (
+        priority_scorer.WEIGHTS,
+        priority_scorer.RISK_TIERS,
+        rules.sensitive_locations,
+        rules.sensitive_landmarks,
+        rules.high_risk_keywords,
+    )
+
+
+def _summary_inputs() -> tuple:
+    from engine import summary_generator
+    return _llm_inputs(summary_generator, "summary")
+
+
+_STAGE_INPUTS = {
+    "language_detection": _language_detection_inputs,
+    "translation": _translation_inputs,
+    "category_analysis": _category_inputs,
+    "sentiment_analysis": _sentiment_inputs,
+    "severity_analysis": _severity_inputs,
+    "extracted_keywords": _keyword_inputs,
+    "entities": _entity_inputs,
+    "priority_scoring": _priority_inputs,
+    "summary": _summary_inputs,
+}
+
+
+def _json_default(value):
+    # Keyword tables are sets; hash them in a stable order
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot fingerprint {type(value).__name__}")
+
+
+def stage_fingerprint(stage: str) -> str:
+    """Return the 16-hex-char version fingerprint of a single stage."""
+    payload = json.dumps(
+        [STAGE_REVISIONS[stage], _STAGE_INPUTS[stage]()],
+        sort_keys=True,
+        default=_json_default,
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def current_stage_versions() -> dict:
+    """
+    Fingerprints of every stage under the currently loaded rules.
+
+    Returns:
+        {
+            "language_detection": "1c0f9e2ab3d47781",
+            "translation": "...",
+            ...
+            "summary": "..."
+        }
+    """
+    return {stage: stage_fingerprint(stage) for stage in _STAGE_INPUTS}
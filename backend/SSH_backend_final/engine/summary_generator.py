@@ -9,33 +9,36 @@ entire analysis pipeline output using GPT.
 import os
 import json
 from dotenv import load_dotenv
-from openai import OpenAI
+from engine.deadline import call_timeout
+from engine.llm_router import chat_completion
+from engine.token_budget import mark_degraded
 
 load_dotenv()
 
-_client = None
+MODEL = "gpt-4o-mini"
 
+SYSTEM_PROMPT = "You are a concise government report writer. Output plain text only."
 
-def _ensure_client():
-    global _client
-    if _client is not None:
-        return
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    _client = OpenAI(api_key=api_key)
-    print("[SummaryGenerator] OpenAI client initialized.")
+PROMPT_TEMPLATE = """You are an AI assistant for a government civic grievance system.
 
+Given the following analysis data of a citizen complaint, write a SHORT professional summary (3-5 sentences max) for the admin dashboard.
 
-def generate_summary(analysis_data: dict) -> str:
-    """
-    Generate a concise, professional summary paragraph from the full analysis JSON.
-    Designed for admin dashboard display.
-    """
-    _ensure_client()
+The summary must:
+- State the nature of the complaint clearly
+- Mention the severity and risk tier
+- Note the recommended department(s) for routing
+- Mention location if available
+- Be written in formal, concise language suitable for a government official
+
+Analysis Data:
+{analysis_json}
+
+Return ONLY the summary text, no quotes, no markdown, no extra formatting."""
 
-    # Build a compact version of the data for the prompt
-    compact = {
+
+def _compact(analysis_data: dict) -> dict:
+    """Compact version of the analysis data for the prompt."""
+    return {
         "complaint": analysis_data.get("translation", {}).get("original_text", "N/A"),
         "category": analysis_data.get("category_analysis", {}).get("category", "N/A"),
         "subcategory": analysis_data.get("category_analysis", {}).get("subcategory", "N/A"),
@@ -49,40 +52,42 @@ def generate_summary(analysis_data: dict) -> str:
         "keywords": analysis_data.get("extracted_keywords", []),
     }
 
-    prompt = f"""You are an AI assistant for a government civic grievance system.
 
-Given the following analysis data of a citizen complaint, write a SHORT professional summary (3-5 sentences max) for the admin dashboard.
+def template_summary(analysis_data: dict) -> str:
+    """Basic summary without GPT (API errors, or the token budget running out)."""
+    compact = _compact(analysis_data)
+    dept_list = ", ".join(compact["departments"][:3]) if compact["departments"] else "Unassigned"
+    return (
+        f"Complaint classified as {compact['category']} ({compact['subcategory']}) "
+        f"with {compact['severity_level']} severity ({compact['risk_tier']} risk, "
+        f"score {compact['priority_score']:.2f}/100). "
+        f"Recommended routing: {dept_list}."
+    )
 
-The summary must:
-- State the nature of the complaint clearly
-- Mention the severity and risk tier
-- Note the recommended department(s) for routing
-- Mention location if available
-- Be written in formal, concise language suitable for a government official
 
-Analysis Data:
-{json.dumps(compact, indent=2)}
+def generate_summary(analysis_data: dict) -> str:
+    """
+    Generate a concise, professional summary paragraph from the full analysis JSON.
+    Designed for admin dashboard display.
+    """
 
-Return ONLY the summary text, no quotes, no markdown, no extra formatting."""
+    prompt = PROMPT_TEMPLATE.format(analysis_json=json.dumps(_compact(analysis_data), indent=2))
 
     try:
-        response = _client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = chat_completion(
+            "summary",
+            model=MODEL,
             messages=[
-                {"role": "system", "content": "You are a concise government report writer. Output plain text only."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
             max_tokens=200,
+            timeout=call_timeout(15),
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"[SummaryGenerator] OpenAI API error: {e}")
+        mark_degraded("summary")
         # Fallback: generate a basic summary without GPT
-        dept_list = ", ".join(compact["departments"][:3]) if compact["departments"] else "Unassigned"
-        return (
-            f"Complaint classified as {compact['category']} ({compact['subcategory']}) "
-            f"with {compact['severity_level']} severity ({compact['risk_tier']} risk, "
-            f"score {compact['priority_score']:.2f}/100). "
-            f"Recommended routing: {dept_list}."
-        )
\ No newline at end of file
+        return template_summary(analysis_data)
@@ -0,0 +1,259 @@
+"""
+Token Budget — LLM Spend Accounting and Stage Degradation
+===========================================================
+Every OpenAI call reports its response.usage here. Spend is tracked per
+stage against a per-minute and a per-day token budget, and as the budget
+is approached the pipeline degrades stages to their local fallbacks in a
+configurable order instead of letting a traffic spike burn the month's
+budget:
+
+  summary             → template summary
+  sentiment_analysis  → lexicon-based local sentiment
+  category_analysis   → keyword classifier + rule-based department routing
+
+Language detection and translation are never degraded; everything
+downstream depends on them.
+
+Budgets are tracked per worker process, so set them per worker.
+
+Settings:
+  LLM_BUDGET_TOKENS_PER_MINUTE  (default 0 = unlimited)
+  LLM_BUDGET_TOKENS_PER_DAY     (default 0 = unlimited)
+  LLM_DEGRADATION_ORDER         (default summary,sentiment_analysis,category_analysis)
+  LLM_DEGRADATION_THRESHOLDS    budget fraction at which each stage in the
+                                order degrades (default 0.80,0.90,0.97)
+  LLM_PRICE_INPUT_PER_MTOK / LLM_PRICE_OUTPUT_PER_MTOK
+                                USD per million tokens, overriding MODEL_PRICES
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+def _env_list(name: str, default: str) -> list:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+TOKENS_PER_MINUTE = int(os.getenv("LLM_BUDGET_TOKENS_PER_MINUTE", 0))
+TOKENS_PER_DAY = int(os.getenv("LLM_BUDGET_TOKENS_PER_DAY", 0))
+DEGRADATION_ORDER = _env_list(
+    "LLM_DEGRADATION_ORDER", "summary,sentiment_analysis,category_analysis"
+)
+DEGRADATION_THRESHOLDS = [
+    float(t) for t in _env_list("LLM_DEGRADATION_THRESHOLDS", "0.80,0.90,0.97")
+]
+
+_PRICE_OVERRIDE = (
+    os.getenv("LLM_PRICE_INPUT_PER_MTOK"),
+    os.getenv("LLM_PRICE_OUTPUT_PER_MTOK"),
+)
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of one call."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    if _PRICE_OVERRIDE[0] is not None:
+        input_price = float(_PRICE_OVERRIDE[0])
+    if _PRICE_OVERRIDE[1] is not None:
+        output_price = float(_PRICE_OVERRIDE[1])
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _new_totals() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost_usd": 0.0}
+
+
+def _add(totals: dict, prompt_tokens: int, completion_tokens: int, cost: float):
+    totals["calls"] += 1
+    totals["prompt_tokens"] += prompt_tokens
+    totals["completion_tokens"] += completion_tokens
+    totals["total_tokens"] += prompt_tokens + completion_tokens
+    totals["cost_usd"] += cost
+
+
+def _rounded(totals: dict) -> dict:
+    return dict(totals, cost_usd=round(totals["cost_usd"], 6))
+
+
+class RequestUsage:
+    """Tokens, cost and degraded stages of one pipeline run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = _new_totals()
+        self.by_stage = {}
+        self.degraded_stages = []
+
+    def add(self, stage: str, prompt_tokens: int, completion_tokens: int, cost: float):
+        with self._lock:
+            _add(self.totals, prompt_tokens, completion_tokens, cost)
+            _add(self.by_stage.setdefault(stage, _new_totals()), prompt_tokens, completion_tokens, cost)
+
+    def degraded(self, stage: str):
+        with self._lock:
+            if stage not in self.degraded_stages:
+                self.degraded_stages.append(stage)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            {
+                "calls": 4,
+                "prompt_tokens": 2310,
+                "completion_tokens": 198,
+                "total_tokens": 2508,
+                "cost_usd": 0.000465,
+                "by_stage": {"category_analysis": {...}, ...}
+            }
+        """
+        with self._lock:
+            report = _rounded(self.totals)
+            report["by_stage"] = {stage: _rounded(t) for stage, t in self.by_stage.items()}
+            return report
+
+
+# The run the current thread is working for. Pipeline thread pools copy
+# the context into their tasks, so every stage records into the same object.
+_current_usage = contextvars.ContextVar("llm_request_usage", default=None)
+
+
+@contextmanager
+def track_request():
+    """Collect the usage of every LLM call made inside the block."""
+    usage = RequestUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def mark_degraded(stage: str):
+    """Note that a stage of the current run fell back to its local implementation."""
+    request = _current_usage.get()
+    if request is not None:
+        request.degraded(stage)
+
+
+def is_degraded(stage: str) -> bool:
+    """True if a stage of the current run has fallen back to its local implementation."""
+    request = _current_usage.get()
+    return request is not None and stage in request.degraded_stages
+
+
+class TokenBudget:
+    """Per-process token spend against the per-minute and per-day budgets."""
+
+    def __init__(self, per_minute: int = TOKENS_PER_MINUTE, per_day: int = TOKENS_PER_DAY):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self._lock = threading.Lock()
+        self._seconds = {}  # epoch second -> tokens, last 60s only
+        self._day = (None, 0)  # (local date, tokens)
+        self.by_stage = {}
+        self.degraded_calls = {}  # stage -> runs served by its fallback
+
+    def _prune(self, now: int):
+        for second in [s for s in self._seconds if s <= now - 60]:
+            del self._seconds[second]
+
+    def record(self, stage: str, model: str, usage):
+        """Account one response.usage (prompt / completion tokens) to a stage."""
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        tokens = prompt_tokens + completion_tokens
+        cost = call_cost(model, prompt_tokens, completion_tokens)
+        now = time.time()
+        today = time.strftime("%Y-%m-%d", time.localtime(now))
+
+        with self._lock:
+            second = int(now)
+            self._prune(second)
+            self._seconds[second] = self._seconds.get(second, 0) + tokens
+            day, day_tokens = self._day
+            self._day = (today, (day_tokens if day == today else 0) + tokens)
+            _add(self.by_stage.setdefault(stage, _new_totals()), prompt_tokens, completion_tokens, cost)
+
+        request = _current_usage.get()
+        if request is not None:
+            request.add(stage, prompt_tokens, completion_tokens, cost)
+
+    def usage(self) -> tuple:
+        """(tokens in the last minute, tokens today)."""
+        now = time.time()
+        today = time.strftime("%Y-%m-%d", time.localtime(now))
+        with self._lock:
+            self._prune(int(now))
+            minute = sum(self._seconds.values())
+            day, day_tokens = self._day
+            return minute, day_tokens if day == today else 0
+
+    def pressure(self) -> float:
+        """Fraction of the tighter budget already spent (0.0 when unlimited)."""
+        minute, day = self.usage()
+        fractions = [0.0]
+        if self.per_minute > 0:
+            fractions.append(minute / self.per_minute)
+        if self.per_day > 0:
+            fractions.append(day / self.per_day)
+        return max(fractions)
+
+    def degraded_stages(self) -> list:
+        """Stages that should use their local fallback right now."""
+        pressure = self.pressure()
+        return [
+            stage for stage, threshold in zip(DEGRADATION_ORDER, DEGRADATION_THRESHOLDS)
+            if pressure >= threshold
+        ]
+
+    def should_degrade(self, stage: str) -> bool:
+        """True if the stage must skip the LLM; noted on the current request's usage."""
+        if stage not in self.degraded_stages():
+            return False
+        with self._lock:
+            self.degraded_calls[stage] = self.degraded_calls.get(stage, 0) + 1
+        mark_degraded(stage)
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            {
+                "tokens_last_minute": 41200,
+                "tokens_today": 2210400,
+                "budget_per_minute": 60000,
+                "budget_per_day": 5000000,
+                "pressure": 0.6867,
+                "degraded_stages": [],
+                "degraded_calls": {"summary": 310},
+                "by_stage": {"translation": {"calls": 812, ..., "cost_usd": 0.21}, ...}
+            }
+        """
+        minute, day = self.usage()
+        with self._lock:
+            by_stage = {stage: _rounded(t) for stage, t in self.by_stage.items()}
+            degraded_calls = dict(self.degraded_calls)
+        return {
+            "tokens_last_minute": minute,
+            "tokens_today": day,
+            "budget_per_minute": self.per_minute,
+            "budget_per_day": self.per_day,
+            "pressure": round(self.pressure(), 4),
+            "degraded_stages": self.degraded_stages(),
+            "degraded_calls": degraded_calls,
+            "by_stage": by_stage,
+        }
+
+
+# Shared by every LLM stage in the process
+token_budget = TokenBudget()
@@ -0,0 +1,188 @@
+"""
+Translation Memory — Cached Civic Phrase Translations
+=======================================================
+Hindi, Marathi and other Indic complaints repeat a small set of civic
+phrases ("paani nahi aa raha", "sadak par gaddha"). The translation
+memory remembers translations keyed by (language, normalized text) so
+the LLM only sees sentences it has never translated before.
+
+- Bounded in-memory LRU per worker process
+- Persistent SQLite store (WAL mode) shared by all workers on the node
+- Seeded from the curated civic phrase dictionary in
+  data/translation_memory_seed.tsv (columns: language, source, english)
+
+Paths:
+  TRANSLATION_MEMORY_PATH  (default models/translation_memory.db)
+  TRANSLATION_MEMORY_SIZE  in-memory LRU entries (default 10000)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+_BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = _BASE_DIR / "models" / "translation_memory.db"
+SEED_PATH = _BASE_DIR / "data" / "translation_memory_seed.tsv"
+DEFAULT_CACHE_SIZE = 10000
+
+# Confidence recorded for curated seed entries
+SEED_CONFIDENCE = 0.97
+
+# Sentence terminators. Latin . ! ? need following whitespace (so "5.5" or
+# "Dr.Rao" stay intact); the danda / double danda used across Devanagari,
+# Bengali, Gurmukhi, Odia etc., and the Urdu full stop / question mark,
+# end a sentence even when the next one follows without a space.
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|(?<=[\u0964\u0965\u06D4\u061F])\s*")
+_TRAILING_PUNCT_RE = re.compile(r"[\s.!?,;:\u0964\u0965\u06D4\u061F]+$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation_memory (
+    language TEXT NOT NULL,
+    source_key TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    origin TEXT NOT NULL,
+    PRIMARY KEY (language, source_key)
+);
+CREATE TABLE IF NOT EXISTS translation_memory_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Curated seed entries are never overwritten by LLM output
+_UPSERT = """
+INSERT INTO translation_memory (language, source_key, translation, confidence, origin)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (language, source_key) DO UPDATE SET
+    translation = excluded.translation,
+    confidence = excluded.confidence,
+    origin = excluded.origin
+WHERE translation_memory.origin != 'seed' OR excluded.origin = 'seed'
+"""
+
+
+def normalize_segment(text: str) -> str:
+    """Key form of a segment: NFKC, lowercase, collapsed spaces, no trailing punctuation."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def split_segments(text: str) -> list:
+    """Split text into sentences on . ! ?, the danda (।, ॥) and Urdu terminators (۔, ؟)."""
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text.strip()) if s.strip()]
+
+
+class TranslationMemory:
+    """LRU-fronted, SQLite-backed store of (language, segment) → English translation."""
+
+    def __init__(self, db_path, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.db_path = str(db_path)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _remember(self, key: tuple, value: tuple):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, language: str, text: str):
+        """Return (translation, confidence) for a segment, or None on a miss."""
+        key = (language, normalize_segment(text))
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                return value
+
+            row = self._conn.execute(
+                "SELECT translation, confidence FROM translation_memory "
+                "WHERE language = ? AND source_key = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+
+            value = (row[0], row[1])
+            self._remember(key, value)
+            return value
+
+    def put(self, language: str, text: str, translation: str, confidence: float, origin: str = "llm"):
+        """Store a translation. Curated seed entries are never overwritten by LLM output."""
+        key = (language, normalize_segment(text))
+        if not key[1] or not translation:
+            return
+        with self._lock:
+            self._conn.execute(_UPSERT, key + (translation, confidence, origin))
+            self._conn.commit()
+            # The row may or may not have changed (seed protection); re-read on next get
+            self._cache.pop(key, None)
+
+    def load_seed(self, seed_path) -> int:
+        """Load the curated phrase dictionary if it changed since the last load."""
+        with open(seed_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM translation_memory_meta WHERE key = 'seed_digest'"
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                return 0
+
+        rows = []
+        for line in raw.decode("utf-8").splitlines():
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.split("\t")
+            if len(cols) < 3:
+                continue
+            language, source, english = cols[0].strip(), cols[1].strip(), cols[2].strip()
+            rows.append((language, normalize_segment(source), english, SEED_CONFIDENCE, "seed"))
+
+        with self._lock:
+            self._conn.executemany(_UPSERT, rows)
+            self._cache.clear()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translation_memory_meta (key, value) VALUES ('seed_digest', ?)",
+                (digest,),
+            )
+            self._conn.commit()
+        return len(rows)
+
+
+_memory = None
+
+
+def get_translation_memory() -> TranslationMemory:
+    """Open (once per process) the shared translation memory and apply the seed dictionary."""
+    global _memory
+    if _memory is not None:
+        return _memory
+
+    db_path = os.getenv("TRANSLATION_MEMORY_PATH") or str(DEFAULT_DB_PATH)
+    cache_size = int(os.getenv("TRANSLATION_MEMORY_SIZE", DEFAULT_CACHE_SIZE))
+    memory = TranslationMemory(db_path, cache_size=cache_size)
+    if SEED_PATH.exists():
+        loaded = memory.load_seed(SEED_PATH)
+        if loaded:
+            print(f"[TranslationMemory] Loaded {loaded} seed phrases.")
+    _memory = memory
+    return _memory
@@ -1,51 +1,26 @@
 """
 Translation Module — OpenAI API (gpt-4o-mini)
 =============================================
-Handles translation of non-English complaints to English using AI.
+Handles translation of non-English complaints to English using AI,
+with a translation memory in front so repeated civic phrases skip the LLM.
 """
 
+import contextvars
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openai import OpenAI
-from engine.config import OPENAI_API_KEY
+from engine.deadline import call_timeout, can_wait
+from engine.llm_router import chat_completion
+from engine.token_budget import mark_degraded
+from engine.translation_memory import get_translation_memory, split_segments
 
-_client = None
+MODEL = "gpt-4o-mini"
 
-def _ensure_client():
-    """Initialize the OpenAI client."""
-    global _client
-    if _client is not None:
-        return
+SYSTEM_PROMPT = "You are a JSON-only API. Output strict JSON."
 
-    _client = OpenAI(api_key=OPENAI_API_KEY)
-    print("[Translator] OpenAI client initialized.")
-
-
-def translate(text: str, detected_language: str) -> dict:
-    """
-    Translate non-English text to English.
-
-    Returns:
-        {
-            "was_translated": bool,
-            "original_text": str,
-            "translated_text": str,
-            "translation_confidence": float
-        }
-    """
-    if detected_language == "en" or not text.strip():
-        return {
-            "was_translated": False,
-            "original_text": text,
-            "translated_text": text.strip(),
-            "translation_confidence": 1.0
-        }
-
-    _ensure_client()
-
-    prompt = f"""You are a professional translator for a civic grievance system.
+PROMPT_TEMPLATE = """You are a professional translator for a civic grievance system.
 
 Translate the following {detected_language} complaint into fluent, clear English. Keep the tone identical to the original text.
 
@@ -59,46 +34,220 @@ Return ONLY a strict JSON object with:
 Example:
 {{"translated_text": "There is a massive pothole causing accidents.", "translation_confidence": 0.98}}"""
 
+SEGMENTS_PROMPT_TEMPLATE = """You are a professional translator for a civic grievance system.
+
+Translate each of the following {detected_language} sentences from a complaint into fluent, clear English. Keep the tone identical to the original text.
+
+Sentences (JSON array):
+{segments_json}
+
+Return ONLY a strict JSON object with:
+- "translations": A JSON array with exactly one English translation per input sentence, in the same order.
+- "translation_confidence": A float between 0.0 and 1.0 indicating how confident you are that the translations capture the exact meaning.
+
+Example:
+{{"translations": ["Water is not coming.", "There is a massive pothole."], "translation_confidence": 0.97}}"""
+
+# Long-text mode: sentences the memory missed are grouped into chunks of
+# at most CHUNK_CHAR_BUDGET characters and translated concurrently, so
+# latency tracks the slowest chunk rather than the whole complaint.
+CHUNK_CHAR_BUDGET = int(os.getenv("TRANSLATION_CHUNK_CHARS", 700))
+MAX_PARALLEL_CHUNKS = int(os.getenv("TRANSLATION_MAX_PARALLEL", 4))
+
+_chunk_pool = None
+
+
+def _max_tokens_for(chars: int) -> int:
+    # Indic scripts can take ~1 token per character; leave room for JSON framing
+    return min(4096, max(600, chars + 200))
+
+
+def _complete_json(prompt: str, max_tokens: int = 600) -> dict:
+    """Call the model and parse its JSON reply, retrying on rate limits."""
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = _client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = chat_completion(
+                "translation",
+                model=MODEL,
                 response_format={ "type": "json_object" },
                 messages=[
-                    {"role": "system", "content": "You are a JSON-only API. Output strict JSON."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,
-                max_tokens=600,
-                timeout=15,
+                max_tokens=max_tokens,
+                timeout=call_timeout(15),
             )
 
             content = response.choices[0].message.content.strip()
-            result = json.loads(content)
-            
-            trans_text = str(result.get("translated_text", text)).strip()
-            conf = float(result.get("translation_confidence", 0.95))
-
-            return {
-                "was_translated": True,
-                "original_text": text,
-                "translated_text": trans_text,
-                "translation_confidence": round(conf, 4)
-            }
+            return json.loads(content)
 
         except Exception as e:
             error_str = str(e).lower()
-            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1:
+            if ("rate" in error_str or "429" in error_str or "quota" in error_str) and attempt < max_retries - 1 \
+                    and can_wait(5 * (attempt + 1)):
                 wait_time = 5 * (attempt + 1)
                 print(f"[Translator] Rate limited, waiting {wait_time}s...")
                 time.sleep(wait_time)
             else:
-                print(f"[Translator] OpenAI API error: {e}")
-                # Fallback to passing through the original text
-                return {
-                    "was_translated": False,
-                    "original_text": text,
-                    "translated_text": text,
-                    "translation_confidence": 0.0
-                }
+                raise
+
+
+def _translate_segments(segments: list, detected_language: str) -> list:
+    """
+    Translate segments the translation memory missed, in one LLM call.
+
+    Returns one (translated_text, confidence) pair per segment.
+    """
+    max_tokens = _max_tokens_for(sum(len(seg) for seg in segments))
+
+    if len(segments) == 1:
+        prompt = PROMPT_TEMPLATE.format(detected_language=detected_language, text=segments[0])
+        result = _complete_json(prompt, max_tokens)
+        trans_text = str(result.get("translated_text", segments[0])).strip()
+        return [(trans_text, float(result.get("translation_confidence", 0.95)))]
+
+    prompt = SEGMENTS_PROMPT_TEMPLATE.format(
+        detected_language=detected_language,
+        segments_json=json.dumps(segments, ensure_ascii=False),
+    )
+    result = _complete_json(prompt, max_tokens)
+    translations = result.get("translations")
+    if not isinstance(translations, list) or len(translations) != len(segments):
+        raise ValueError(f"expected {len(segments)} translations, got {translations!r}")
+    conf = float(result.get("translation_confidence", 0.95))
+    return [(str(t).strip(), conf) for t in translations]
+
+
+def _chunk_indices(segments: list, indices: list) -> list:
+    """Group segment indices, in order, into chunks of at most CHUNK_CHAR_BUDGET characters."""
+    chunks = []
+    current = []
+    current_len = 0
+    for i in indices:
+        seg_len = len(segments[i])
+        if current and current_len + seg_len > CHUNK_CHAR_BUDGET:
+            chunks.append(current)
+            current, current_len = [], 0
+        current.append(i)
+        current_len += seg_len
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _translate_chunks(segments: list, chunks: list, detected_language: str) -> list:
+    """
+    Translate every chunk, concurrently when there is more than one.
+
+    Returns, per chunk, its list of (translated_text, confidence) pairs,
+    or None if that chunk failed.
+    """
+    global _chunk_pool
+
+    def run(chunk):
+        try:
+            return _translate_segments([segments[i] for i in chunk], detected_language)
+        except Exception as e:
+            print(f"[Translator] OpenAI API error on chunk of {len(chunk)} sentence(s): {e}")
+            return None
+
+    if len(chunks) == 1:
+        return [run(chunks[0])]
+
+    if _chunk_pool is None:
+        _chunk_pool = ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_CHUNKS, thread_name_prefix="translate-chunk"
+        )
+    # map() preserves chunk order, so reassembly is positional. Each chunk
+    # runs in a copy of the caller's context (per-request token accounting).
+    contexts = [contextvars.copy_context() for _ in chunks]
+    return list(_chunk_pool.map(lambda ctx, chunk: ctx.run(run, chunk), contexts, chunks))
+
+
+def translate(text: str, detected_language: str) -> dict:
+    """
+    Translate non-English text to English.
+
+    Sentences are first looked up in the translation memory (exact
+    whole-text hit, then per sentence); only the sentences it misses are
+    sent to the LLM, and their translations are remembered. Long texts
+    are translated as sentence-aligned chunks in parallel and reassembled
+    in order; a chunk that fails keeps its original text at confidence 0.
+
+    Returns:
+        {
+            "was_translated": bool,
+            "original_text": str,
+            "translated_text": str,
+            "translation_confidence": float
+        }
+    """
+    if detected_language == "en" or not text.strip():
+        return {
+            "was_translated": False,
+            "original_text": text,
+            "translated_text": text.strip(),
+            "translation_confidence": 1.0
+        }
+
+    memory = get_translation_memory()
+
+    # Exact hit on the whole complaint
+    cached = memory.get(detected_language, text)
+    if cached is not None:
+        return {
+            "was_translated": True,
+            "original_text": text,
+            "translated_text": cached[0],
+            "translation_confidence": round(cached[1], 4)
+        }
+
+    # Sentence-level hits; the LLM only sees the misses
+    segments = split_segments(text)
+    translated = [memory.get(detected_language, seg) for seg in segments]
+    missing = [i for i, hit in enumerate(translated) if hit is None]
+    failed = False
+
+    if missing:
+        chunks = _chunk_indices(segments, missing)
+        results = _translate_chunks(segments, chunks, detected_language)
+
+        if any(r is None for r in results):
+            mark_degraded("translation")
+
+        if all(r is None for r in results) and len(missing) == len(segments):
+            # Fallback to passing through the original text
+            return {
+                "was_translated": False,
+                "original_text": text,
+                "translated_text": text,
+                "translation_confidence": 0.0
+            }
+
+        for chunk, fresh in zip(chunks, results):
+            if fresh is None:
+                failed = True
+                for i in chunk:
+                    translated[i] = (segments[i], 0.0)
+                continue
+            for i, (trans_text, conf) in zip(chunk, fresh):
+                translated[i] = (trans_text, conf)
+                memory.put(detected_language, segments[i], trans_text, conf)
+
+    trans_text = " ".join(t for t, _ in translated)
+    # Length-weighted confidence across segments
+    total_len = sum(len(seg) for seg in segments)
+    conf = sum(c * len(seg) for seg, (_, c) in zip(segments, translated)) / total_len
+
+    # Don't remember a partial translation as the whole complaint's
+    if len(segments) > 1 and not failed:
+        memory.put(detected_language, text, trans_text, conf)
+
+    return {
+        "was_translated": True,
+        "original_text": text,
+        "translated_text": trans_text,
+        "translation_confidence": round(conf, 4)
+    }
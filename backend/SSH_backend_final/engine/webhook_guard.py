@@ -0,0 +1,98 @@
+"""
+Webhook Guard — Which URLs Job Results May Be POSTed To
+=========================================================
+A webhook_url comes from the client, and the server POSTs the full
+analysis to it. Without a check, that lets anyone make the server send
+requests into its own network (SSRF): cloud metadata endpoints,
+localhost admin ports, other internal services.
+
+- With WEBHOOK_ALLOWED_HOSTS set, only those hosts are accepted. An entry
+  starting with "." also allows every subdomain (".example.com").
+  Allowlisted hosts may be internal.
+- Without it, any host is accepted as long as every address it resolves
+  to is globally routable: loopback, private, link-local (incl.
+  169.254.169.254), carrier-grade NAT, multicast and reserved ranges are
+  rejected.
+
+URLs are checked when the job is submitted (a rejected URL is a 422) and
+again right before each delivery, so a DNS record changed in between
+can't redirect a callback inside. Deliveries don't follow redirects.
+
+Settings:
+  WEBHOOK_ALLOWED_HOSTS  comma-separated host allowlist (default: any public host)
+"""
+
+import ipaddress
+import os
+import socket
+from urllib.parse import urlsplit
+
+
+class WebhookRejected(ValueError):
+    """Raised for a webhook URL the server won't deliver to."""
+
+
+def _allowed_hosts() -> list:
+    return [
+        h.strip().lower().rstrip(".")
+        for h in os.getenv("WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()
+    ]
+
+
+def _host_allowed(host: str, allowed: list) -> bool:
+    for entry in allowed:
+        if entry.startswith("."):
+            if host == entry[1:] or host.endswith(entry):
+                return True
+        elif host == entry:
+            return True
+    return False
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(url: str) -> str:
+    """
+    Return `url` if results may be POSTed to it.
+
+    Raises:
+        WebhookRejected: for a non-http(s) URL, a host outside the
+            allowlist, or (without an allowlist) a host that doesn't
+            resolve or resolves to a non-public address.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError as e:
+        raise WebhookRejected(f"invalid webhook URL: {e}")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookRejected("webhook URL must be an absolute http(s) URL")
+    if parts.username or parts.password:
+        raise WebhookRejected("webhook URL must not contain credentials")
+
+    host = parts.hostname.lower().rstrip(".")
+    allowed = _allowed_hosts()
+    if allowed:
+        if not _host_allowed(host, allowed):
+            raise WebhookRejected(f"webhook host {host!r} is not in WEBHOOK_ALLOWED_HOSTS")
+        return url
+
+    try:
+        infos = socket.getaddrinfo(
+            host, port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError) as e:
+        raise WebhookRejected(f"webhook host {host!r} does not resolve: {e}")
+
+    for info in infos:
+        address = info[4][0]
+        if not _is_public(address):
+            raise WebhookRejected(
+                f"webhook host {host!r} resolves to non-public address {address}"
+            )
+    return url
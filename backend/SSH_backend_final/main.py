@@ -236,23 +236,56 @@ REST API server for the NLP complaint analysis pipeline.
 
 Endpoints:
   POST /analyze   — Analyze a citizen complaint (JSON body: {"complaint": "..."})
+  POST /reanalyze — Refresh a stored analysis, re-running only stale stages
+  POST /analyze/async — Queue a complaint for analysis, most urgent first
+  GET  /analyze/async/{job_id} — Status and result of a queued analysis
+  POST /analyze/report — Analyze a complaint and return a PDF report
+  POST /reports/export — ZIP or digest PDF of reports for many stored analyses
+  POST /rules/reload — Load and swap in the rule pack (RULE_PACK_PATH)
   GET  /health    — Health check
+  GET  /metrics   — Runtime counters (coalescing, job queue, token budget, LLM latency,
+                    endpoints, semantic cache, rule pack)
   GET  /schema    — Returns the output JSON schema
 
+/analyze and /analyze/report honour an X-Request-Deadline-Ms header (time
+budget of the pipeline run, default PIPELINE_DEADLINE_SECONDS); stages the
+budget could not cover come back in "degraded_stages".
+
 Run with:
   uvicorn main:app --reload --port 8000
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Literal
+import hashlib
+import orjson
+import os
 import time
 
 # Load environment variables
 load_dotenv()
 
-from engine.pipeline import analyze_complaint
+from engine.pipeline import (
+    OUTPUT_FIELDS,
+    NotReanalyzable,
+    analyze_complaint,
+    plan_stages,
+    reanalyze_complaint,
+)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson (numpy scalars/arrays included)."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
 
 # ─── App Configuration ────────────────────────────────────
 app = FastAPI(
@@ -261,6 +294,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 # ─── CORS (for frontend integration) ─────────────────────
@@ -316,9 +350,15 @@ class SeverityAnalysis(BaseModel):
     matched_keywords: list[str]
 
 
+class Coordinates(BaseModel):
+    lat: float
+    lng: float
+
+
 class Entities(BaseModel):
     location: str
     landmark: str
+    coordinates: Coordinates | None = None
 
 
 class DepartmentProbability(BaseModel):
@@ -342,6 +382,17 @@ class PriorityScoring(BaseModel):
     explainability: Explainability
 
 
+class LLMStageUsage(BaseModel):
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+
+class LLMUsage(LLMStageUsage):
+    by_stage: dict[str, LLMStageUsage] = Field(default_factory=dict)
+
+
 class AnalysisResponse(BaseModel):
     language_detection: LanguageDetection
     translation: Translation
@@ -358,16 +409,121 @@ class AnalysisResponse(BaseModel):
     processing_time_ms: float = Field(
         description="Total pipeline processing time in milliseconds"
     )
+    stage_versions: dict[str, str] = Field(
+        default_factory=dict,
+        description="Version fingerprint of each stage that produced this result",
+    )
+    recomputed_stages: list[str] = Field(
+        default_factory=list,
+        description="Stages re-run by /reanalyze (empty for a fresh analysis)",
+    )
+    llm_usage: LLMUsage | None = Field(
+        default=None, description="Tokens and cost of the LLM calls made for this result"
+    )
+    degraded_stages: list[str] = Field(
+        default_factory=list,
+        description="Stages served by their local fallback instead of the LLM, because the "
+                    "LLM token budget ran low or the request deadline left too little time",
+    )
+    rule_pack_version: str | None = Field(
+        default=None, description="Version of the rule pack the rule-based stages used"
+    )
+
+
+class AsyncComplaintRequest(ComplaintRequest):
+    webhook_url: str | None = Field(
+        default=None,
+        pattern=r"^https?://",
+        max_length=2000,
+        description="Optional URL the finished job is POSTed to (public hosts, or "
+                    "WEBHOOK_ALLOWED_HOSTS when set)",
+    )
+
+
+class ReanalysisRequest(BaseModel):
+    previous: AnalysisResponse = Field(
+        ..., description="A stored /analyze result, including its stage_versions"
+    )
+
+
+class ReportExportItem(BaseModel):
+    id: str = Field(
+        default="", max_length=100, description="Complaint ID, used to name its report"
+    )
+    analysis: AnalysisResponse
+
+
+class ReportExportRequest(BaseModel):
+    reports: list[ReportExportItem] = Field(..., min_length=1, max_length=2000)
+    format: Literal["zip", "digest"] = Field(
+        default="zip",
+        description="zip: one PDF per complaint; digest: a single multi-page PDF",
+    )
+
+
+# ─── Response Serialization ───────────────────────────────
+
+# Pipeline results are assembled from fixed-shape dicts, so they are
+# serialized with orjson directly instead of being re-validated against
+# AnalysisResponse on every request. VALIDATE_RESPONSES=1 turns the
+# check back on (development / CI) to catch drift between the two.
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "").lower() in ("1", "true", "yes")
+
+
+def _analysis_response(result: dict, partial: bool = False) -> FastJSONResponse:
+    if partial:
+        # Only the requested fields; AnalysisResponse describes full results
+        return FastJSONResponse(result)
+    result.setdefault("recomputed_stages", [])
+    if VALIDATE_RESPONSES:
+        result = AnalysisResponse.model_validate(result).model_dump()
+    return FastJSONResponse(result)
+
+
+@lru_cache(maxsize=1)
+def _schema_payload() -> tuple:
+    """The /schema body and its ETag, computed once per process."""
+    body = orjson.dumps(AnalysisResponse.model_json_schema())
+    return body, '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
 
 # ─── Endpoints ────────────────────────────────────────────
 
-from fastapi.responses import PlainTextResponse, FileResponse
+from fastapi.responses import Response, StreamingResponse
 from engine.report_generator import generate_pdf_report
-import tempfile
+from engine.report_export import iter_report_digest, iter_report_zip
+from engine.results import AnalysisResult
+from engine.request_coalescer import analysis_coalescer, complaint_key
+from engine.job_queue import QueueFull, get_job_queue, preliminary_priority
+from engine.webhook_guard import WebhookRejected
+from engine.token_budget import token_budget
+from engine.llm_hedging import llm_hedger
+from engine.llm_router import get_llm_router
+from engine.semantic_cache import semantic_cache
+from engine import rule_packs
+import asyncio
 import time
 @app.post("/analyze", response_model=AnalysisResponse)
-async def analyze(request: ComplaintRequest):
+async def analyze(
+    request: ComplaintRequest,
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated output fields to compute, e.g. "
+                    "'entities,severity_analysis'. Omit for the full analysis.",
+        examples=["entities,severity_analysis"],
+    ),
+    deadline_ms: int | None = Header(
+        default=None,
+        alias="X-Request-Deadline-Ms",
+        ge=1,
+        description="Time budget of the pipeline run in milliseconds.",
+    ),
+):
     """
     Analyze a citizen complaint through the full NLP pipeline.
 
@@ -382,52 +538,223 @@ async def analyze(request: ComplaintRequest):
     8. Department Routing
 
     Returns strict JSON with all analysis results including admin summary.
+    With ?fields=..., only the stages those fields depend on are run (in
+    parallel where possible) and only those fields are returned; the
+    rule-based fields (severity_analysis, extracted_keywords, entities)
+    then work on the original text unless translation is also requested.
+    Concurrent requests with the same complaint text share one pipeline run.
+
+    An X-Request-Deadline-Ms header bounds the run: LLM stages that the
+    remaining budget cannot cover fall back to their local implementations
+    and are listed in degraded_stages.
     """
+    selected = None
+    if fields:
+        selected = sorted({f.strip() for f in fields.split(",") if f.strip()}) or None
+    if selected:
+        try:
+            plan_stages(selected)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=422,
+                detail=f"{e}. Available fields: {', '.join(OUTPUT_FIELDS)}",
+            )
+
     try:
         start_time = time.time()
-        result = analyze_complaint(request.complaint)
+        key = complaint_key(request.complaint)
+        if selected:
+            key += ":" + ",".join(selected)
+        if deadline_ms is not None:
+            key += f":d={deadline_ms}"
+        result = await analysis_coalescer.run(
+            key, analyze_complaint, request.complaint, selected, deadline_ms
+        )
         elapsed_ms = round((time.time() - start_time) * 1000, 2)
         result["processing_time_ms"] = elapsed_ms
-        return result
+        return _analysis_response(result, partial=selected is not None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pipeline error: {str(e)}")
 
 
 
-@app.post("/analyze/report", response_class=FileResponse)
-async def analyze_and_report(request: ComplaintRequest):
+@app.post("/reanalyze", response_model=AnalysisResponse)
+async def reanalyze(request: ReanalysisRequest):
+    """
+    Refresh a stored analysis after rule, prompt or model changes.
+
+    Only stages whose version fingerprint changed, plus the downstream
+    stages whose inputs actually moved, are re-run. Everything else is
+    reused from the stored result, so a rules tweak does not re-pay
+    every LLM call.
+    """
+    try:
+        start_time = time.time()
+        # LLM calls block; keep them off the event loop
+        result = await asyncio.to_thread(reanalyze_complaint, request.previous.model_dump())
+        elapsed_ms = round((time.time() - start_time) * 1000, 2)
+        result["processing_time_ms"] = elapsed_ms
+        return _analysis_response(result)
+    except NotReanalyzable as e:
+        raise HTTPException(status_code=422, detail=f"Cannot re-analyze: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pipeline error: {str(e)}")
+
+
+
+@app.post("/analyze/async", status_code=202)
+async def analyze_async(request: AsyncComplaintRequest):
+    """
+    Queue a complaint for full analysis and return a job ID immediately.
+    The job is stored durably and survives a server restart.
+
+    A preliminary severity and priority score are computed from the
+    rule-based stages (no LLM call) and returned with the job. Jobs are
+    analyzed most urgent first, with aging so that older, less severe
+    complaints are never starved. Poll GET /analyze/async/{job_id}, or
+    pass webhook_url to have the outcome POSTed there (retried with backoff).
+    A webhook_url on a private, loopback or link-local address (or outside
+    WEBHOOK_ALLOWED_HOSTS, when set) is rejected with a 422.
+    """
+    try:
+        preliminary = await asyncio.to_thread(preliminary_priority, request.complaint)
+        job = await asyncio.to_thread(
+            get_job_queue().submit, request.complaint, preliminary, request.webhook_url
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Analysis queue is full: {str(e)}")
+    except WebhookRejected as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pipeline error: {str(e)}")
+
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "preliminary": job["preliminary"],
+    }
+
+
+@app.get("/analyze/async/{job_id}")
+async def analyze_async_status(job_id: str):
+    """
+    Status of a queued analysis: queued, running, done (with the full
+    /analyze result) or failed (with the error).
+    """
+    # SQLite read; keep it off the event loop
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+
+
+@app.post("/analyze/report", response_class=Response)
+async def analyze_and_report(
+    request: ComplaintRequest,
+    deadline_ms: int | None = Header(default=None, alias="X-Request-Deadline-Ms", ge=1),
+):
     """
     Analyze a citizen complaint and return a professional PDF report.
+
+    The pipeline runs off the event loop (shared with identical in-flight
+    /analyze requests), and the PDF is rendered in memory straight into
+    the response body.
     """
     try:
         start_time = time.time()
-        result = analyze_complaint(request.complaint)
+        key = complaint_key(request.complaint)
+        if deadline_ms is not None:
+            key += f":d={deadline_ms}"
+        result = await analysis_coalescer.run(
+            key, analyze_complaint, request.complaint, None, deadline_ms
+        )
         elapsed_ms = round((time.time() - start_time) * 1000, 2)
         result["processing_time_ms"] = elapsed_ms
-        
-        pdf_path = generate_pdf_report(result)
-        
-        return FileResponse(
-            path=pdf_path,
-            filename=f"civic_intelligence_report_{int(time.time())}.pdf",
+
+        pdf_bytes = generate_pdf_report(result)
+        filename = f"civic_intelligence_report_{int(time.time())}.pdf"
+
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=report.pdf"}
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Report generation error: {str(e)}")
 
 
 
+@app.post("/reports/export")
+async def export_reports(request: ReportExportRequest):
+    """
+    Export a department report pack for a batch of stored analyses.
+
+    Returns a ZIP with one PDF per complaint, or a single digest PDF.
+    Reports are rendered in a process pool and streamed as they finish.
+    """
+    try:
+        reports = [(item.id, AnalysisResult.from_dict(item.analysis.model_dump())) for item in request.reports]
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Unreadable stored analysis: {e!r}")
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+
+    if request.format == "digest":
+        return StreamingResponse(
+            iter_report_digest(reports),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="civic_report_digest_{stamp}.pdf"'}
+        )
+    return StreamingResponse(
+        iter_report_zip(reports),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="civic_reports_{stamp}.zip"'}
+    )
+
+
+
+@app.post("/rules/reload")
+async def reload_rules():
+    """
+    Load, compile and swap in the rule pack. Analyses already running
+    finish on the pack they started with; an invalid pack is rejected
+    and the active one stays.
+    """
+    try:
+        await asyncio.to_thread(rule_packs.reload_rules)
+    except rule_packs.RulePackError as e:
+        raise HTTPException(status_code=422, detail=f"Rule pack rejected: {e}")
+    return rule_packs.stats()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "Civic Grievance Intelligence Engine"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for this worker process."""
+    return {
+        "coalescing": analysis_coalescer.stats(),
+        "job_queue": get_job_queue().stats(),
+        "token_budget": token_budget.stats(),
+        "llm_latency": llm_hedger.stats(),
+        "llm_endpoints": get_llm_router().stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "rule_pack": rule_packs.stats(),
+    }
+
+
 @app.get("/schema")
-async def get_schema():
+async def get_schema(request: Request):
     """Return the output JSON schema for integration reference."""
-    return AnalysisResponse.model_json_schema()
+    body, etag = _schema_payload()
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ─── Startup Event ────────────────────────────────────────
@@ -440,17 +767,42 @@ async def startup_event():
     print("  Starting model pre-loading...")
     print("=" * 60)
 
-    try:
-        # Pre-load spaCy NER model
-        from engine.entity_recognizer import _ensure_model as load_ner
-        load_ner()
+    def load_ner():
+        from engine.entity_recognizer import _ensure_model
+        _ensure_model()
+
+    def map_gazetteer():
+        from engine.gazetteer import get_gazetteer
+        get_gazetteer()
+
+    def load_fonts():
+        from engine.report_generator import load_report_fonts
+        load_report_fonts()
+
+    # Each step on its own: a failed model load must not keep the rule
+    # pack watcher or the job queue from starting
+    steps = [
+        ("spaCy NER model", load_ner),
+        ("location gazetteer", map_gazetteer),                   # shared across workers via the page cache
+        ("rule pack watcher", rule_packs.start_watcher),         # reloads the rule pack when the file changes
+        ("job queue", lambda: get_job_queue().start()),          # resumes jobs left queued by a previous run
+        ("report fonts", load_fonts),                            # read and compressed once, not per PDF
+    ]
+    failed = []
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            failed.append(name)
+            print(f"[WARNING] Startup step '{name}' failed: {e}")
 
-        print("=" * 60)
+    print("=" * 60)
+    if failed:
+        print(f"  Started without: {', '.join(failed)}")
+        print("  Models will load on first request instead.")
+    else:
         print("  Local models loaded successfully!")
-        print("  Grok API ready for classification & sentiment.")
-        print("  Server ready at http://localhost:8000")
-        print("  API docs at http://localhost:8000/docs")
-        print("=" * 60)
-    except Exception as e:
-        print(f"[WARNING] Model pre-loading failed: {e}")
-        print("Models will load on first request instead.")
\ No newline at end of file
+    print("  Grok API ready for classification & sentiment.")
+    print("  Server ready at http://localhost:8000")
+    print("  API docs at http://localhost:8000/docs")
+    print("=" * 60)
\ No newline at end of file
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Run from any directory: the engine package lives next to tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# engine.config reads the key at import; the tests never call OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
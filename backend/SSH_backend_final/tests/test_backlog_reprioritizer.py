@@ -0,0 +1,171 @@
+"""backlog_reprioritizer against a throwaway local Postgres (pgserver)."""
+
+import json
+import random
+import uuid
+from decimal import Decimal
+
+import pytest
+
+pgserver = pytest.importorskip("pgserver")
+psycopg = pytest.importorskip("psycopg")
+
+from engine import backlog_reprioritizer
+from engine.backlog_reprioritizer import stored_severity
+from engine.priority_scorer import compute_priority_score
+
+ANALYSIS_DDL = """
+CREATE TABLE complaint_ai_analysis (
+    id UUID PRIMARY KEY,
+    sentiment_score DECIMAL(3, 2) NOT NULL,
+    risk_score INT NOT NULL,
+    escalation_score INT NOT NULL,
+    extracted_keywords JSONB,
+    category_confidence DECIMAL(5, 4),
+    location TEXT,
+    landmark TEXT,
+    priority_score DECIMAL(5, 4),
+    risk_tier VARCHAR(20)
+)
+"""
+
+LOCATIONS = [("Mumbai", "hospital"), ("flood zone", ""), ("Indore", "market"), (None, None)]
+KEYWORDS = [["pothole"], ["fire", "child"], [], ["garbage", "stench"]]
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    srv = pgserver.get_server(tmp_path_factory.mktemp("pg"), cleanup_mode="stop")
+    yield srv
+    srv.cleanup()
+
+
+@pytest.fixture
+def dsn(server):
+    name = f"t_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(server.get_uri(), autocommit=True) as conn:
+        conn.execute(f"CREATE DATABASE {name}")
+    dsn = server.get_uri().replace("/postgres?", f"/{name}?")
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(ANALYSIS_DDL)
+    return dsn
+
+
+def _insert(dsn, rows):
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO complaint_ai_analysis (id, sentiment_score, risk_score, escalation_score, "
+                "extracted_keywords, category_confidence, location, landmark) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [(r["id"], r["sentiment"], r["risk_score"], 42, json.dumps(r["keywords"]),
+                  r["confidence"], r["location"], r["landmark"]) for r in rows],
+            )
+
+
+def _random_rows(rng, n):
+    rows = []
+    for _ in range(n):
+        location, landmark = rng.choice(LOCATIONS)
+        pipeline = rng.random() < 0.5
+        rows.append({
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "sentiment": Decimal(str(round(rng.uniform(-1, 1), 2))),
+            # Pipeline rows: 0-10; legacy/seeded rows: 0-100
+            "risk_score": rng.randint(0, 10) if pipeline else rng.choice((45, 50, 75, 90, 100)),
+            "confidence": Decimal(str(round(rng.random(), 4))) if pipeline else None,
+            "location": location,
+            "landmark": landmark,
+            "keywords": rng.choice(KEYWORDS),
+        })
+    return rows
+
+
+def _expected(row):
+    confidence = float(row["confidence"]) if row["confidence"] is not None else 0.8
+    scoring = compute_priority_score(
+        stored_severity(row["risk_score"], row["confidence"] is not None),
+        float(row["sentiment"]), confidence,
+        row["location"] or "", row["landmark"] or "", row["keywords"],
+    )
+    return Decimal(str(scoring["priority_score"])).quantize(Decimal("0.0001")), scoring["risk_tier"]
+
+
+def _assert_scored(dsn, rows):
+    with psycopg.connect(dsn) as conn:
+        stored = {
+            r[0]: (r[1], r[2], r[3])
+            for r in conn.execute(
+                "SELECT id, priority_score, risk_tier, escalation_score FROM complaint_ai_analysis"
+            )
+        }
+    for row in rows:
+        score, tier, escalation = stored[row["id"]]
+        assert (score, tier) == _expected(row), row
+        assert escalation == 42  # legacy column untouched
+
+
+def test_full_pass_scores_every_row(dsn):
+    rows = _random_rows(random.Random(1), 250)
+    _insert(dsn, rows)
+
+    summary = backlog_reprioritizer.run(dsn, chunk_size=40)
+    assert summary["rows_processed"] == 250
+    assert summary["completed"] is True
+    _assert_scored(dsn, rows)
+
+
+def test_interrupted_run_resumes_after_checkpoint(dsn, monkeypatch):
+    rows = _random_rows(random.Random(2), 200)
+    _insert(dsn, rows)
+
+    write_chunk = backlog_reprioritizer._write_chunk
+    calls = []
+
+    def failing_write(conn, scored):
+        calls.append(len(scored))
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        return write_chunk(conn, scored)
+
+    monkeypatch.setattr(backlog_reprioritizer, "_write_chunk", failing_write)
+    with pytest.raises(RuntimeError):
+        backlog_reprioritizer.run(dsn, chunk_size=50)
+
+    monkeypatch.setattr(backlog_reprioritizer, "_write_chunk", write_chunk)
+    with psycopg.connect(dsn) as conn:
+        last_id, processed, completed = conn.execute(
+            "SELECT last_id, rows_processed, completed FROM reprioritization_checkpoints"
+        ).fetchone()
+    assert (processed, completed) == (100, False)
+    assert last_id == sorted(r["id"] for r in rows)[99]
+
+    summary = backlog_reprioritizer.run(dsn, chunk_size=50)
+    assert summary["rows_processed"] == 200  # 100 before the interruption + 100 resumed
+    _assert_scored(dsn, rows)
+
+
+def test_rerun_after_completion_scores_rows_added_below_last_id(dsn):
+    rows = _random_rows(random.Random(3), 100)
+    _insert(dsn, rows)
+    backlog_reprioritizer.run(dsn, chunk_size=30)
+
+    # Random v4 ids: new rows can sort before the last id of the finished pass
+    late = _random_rows(random.Random(4), 20)
+    for i, row in enumerate(late):
+        row["id"] = uuid.UUID(f"00000000-0000-4000-8000-{i:012d}")
+    _insert(dsn, late)
+
+    summary = backlog_reprioritizer.run(dsn, chunk_size=30)
+    assert summary["rows_processed"] == 120
+    _assert_scored(dsn, rows + late)
+
+
+def test_stored_severity_scales():
+    assert stored_severity(7, from_pipeline=True) == 7
+    assert stored_severity(0, from_pipeline=True) == 0
+    assert stored_severity(50, from_pipeline=True) == 0     # dashboard placeholder
+    assert stored_severity(50, from_pipeline=False) == 5    # legacy 0-100
+    assert stored_severity(90, from_pipeline=False) == 9
+    assert stored_severity(8, from_pipeline=False) == 8
+    assert stored_severity(None, from_pipeline=False) == 0
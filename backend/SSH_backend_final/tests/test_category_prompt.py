@@ -0,0 +1,43 @@
+"""The classifier prompt offers exactly the codes its response schema accepts."""
+
+import re
+
+from engine import category_classifier
+from engine.category_classifier import (
+    CATEGORY_TAXONOMY,
+    DEPARTMENT_CODES,
+    PROMPT_TEMPLATE,
+    RESPONSE_FORMAT,
+    SUBCATEGORY_CODES,
+)
+
+
+def _schema_enums():
+    properties = RESPONSE_FORMAT["json_schema"]["schema"]["properties"]
+    return properties["sub"]["enum"], properties["depts"]["items"]["properties"]["code"]["enum"]
+
+
+def test_prompt_lists_the_schema_codes():
+    subs, depts = _schema_enums()
+    taxonomy = PROMPT_TEMPLATE.split("CATEGORY TAXONOMY")[1].split("CRITICAL DISAMBIGUATION")[0]
+    departments = PROMPT_TEMPLATE.split("\nDEPARTMENTS\n")[1].split("\nCOMPLAINT\n")[0]
+    assert re.findall(r"^- ([A-Z]{3}\d+) ", taxonomy, re.M) == subs
+    assert re.findall(r"^- ([A-Z]{2}) ", departments, re.M) == depts
+    for code, (_, sub) in SUBCATEGORY_CODES.items():
+        assert f"- {code} {sub}" in taxonomy
+    for code, name in DEPARTMENT_CODES.items():
+        assert f"- {code} {name}\n" in departments + "\n"
+
+
+def test_taxonomy_edit_reaches_the_prompt(monkeypatch):
+    taxonomy = dict(CATEGORY_TAXONOMY)
+    taxonomy["Transport"] = dict(taxonomy["Transport"], subcategories=["Bus delay", "Metro breakdown"])
+    monkeypatch.setattr(category_classifier, "CATEGORY_TAXONOMY", taxonomy)
+    section = category_classifier._taxonomy_prompt()
+    assert "- TRN2 Metro breakdown" in section
+    assert "TRN3" not in section
+
+
+def test_prompt_still_formats():
+    prompt = PROMPT_TEMPLATE.format(text="pothole")
+    assert '\n"pothole"\n' in prompt and '{"sub": "<subcategory code>"' in prompt
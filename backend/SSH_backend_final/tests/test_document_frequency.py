@@ -0,0 +1,110 @@
+"""Document frequency table and its use in keyword ranking."""
+
+import sqlite3
+
+import pytest
+
+from engine import document_frequency
+from engine.document_frequency import DocumentFrequencyTable
+from engine.keyword_extractor import MIN_DOCUMENTS, extract_keywords
+
+
+@pytest.fixture(autouse=True)
+def no_flusher(monkeypatch):
+    """Tests flush explicitly; no background thread or exit hook."""
+    monkeypatch.setattr(DocumentFrequencyTable, "_ensure_flusher", lambda self: None)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "keyword_df.db"
+    monkeypatch.setenv("KEYWORD_DF_PATH", str(path))
+    monkeypatch.setattr(document_frequency, "_table", None)
+    monkeypatch.setattr(document_frequency, "_table_checked", False)
+    return path
+
+
+def _word(i: int) -> str:
+    """A distinct all-letter word per number."""
+    return "zz" + "".join(chr(ord("a") + int(d)) for d in str(i))
+
+
+def test_common_terms_dropped_once_corpus_is_large_enough(db_path):
+    complaint = "Municipality ignored the overflowing garbage stench"
+    for i in range(MIN_DOCUMENTS - 2):
+        extract_keywords(f"municipality {_word(i)}")
+    corpus = document_frequency.get_document_frequency()
+    assert corpus.documents == MIN_DOCUMENTS - 2
+    # Too few complaints to judge by: ranked low, but still a keyword
+    assert "Municipality" in extract_keywords(complaint)
+
+    extract_keywords(f"municipality {_word(MIN_DOCUMENTS)}")
+    assert corpus.documents == MIN_DOCUMENTS
+    keywords = extract_keywords(complaint)
+    assert "Municipality" not in keywords
+    assert "garbage" in keywords
+
+
+def test_same_text_counted_once(db_path):
+    table = DocumentFrequencyTable(db_path)
+    assert table.add_document("garbage near school", ["garbage", "near", "school"]) is True
+    assert table.add_document("garbage near school", ["garbage", "near", "school"]) is False
+    assert table.documents == 1
+    assert table.document_ratio("garbage") == 1.0
+
+    document_frequency._table, document_frequency._table_checked = table, True
+    extract_keywords("Pothole on the bridge road")
+    extract_keywords("Pothole on the bridge road")
+    assert table.documents == 2
+
+
+def test_flush_adds_increments_of_every_table(db_path):
+    first = DocumentFrequencyTable(db_path)
+    second = DocumentFrequencyTable(db_path)
+    first.add_document("a", ["garbage", "stench"])
+    second.add_document("b", ["garbage"])
+    first.flush()
+    second.flush()
+    # second read back the merged counts; first sees them after its next flush
+    assert second.documents == 2
+    assert second.document_ratio("garbage") == 1.0
+    first.add_document("c", ["pothole"])
+    first.flush()
+    assert first.documents == 3
+
+    reopened = DocumentFrequencyTable(db_path)
+    assert reopened.documents == 3
+    assert reopened.document_ratio("garbage") == pytest.approx(2 / 3)
+    # Terms below MIN_LOADED_DF stay on disk only
+    assert reopened.stats()["terms_in_memory"] == 1
+
+
+class _LockedConnection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_failed_flush_keeps_increments_pending(db_path):
+    table = DocumentFrequencyTable(db_path)
+    table.add_document("a", ["garbage"])
+    table.add_document("b", ["garbage", "stench"])
+
+    conn, table._conn = table._conn, _LockedConnection()
+    table.flush()
+    assert table.stats()["pending_documents"] == 2
+    assert table.documents == 2
+
+    table._conn = conn
+    table.add_document("c", ["garbage"])
+    table.flush()
+    assert table.stats()["pending_documents"] == 0
+
+    reopened = DocumentFrequencyTable(db_path)
+    assert reopened.documents == 3
+    assert reopened.document_ratio("garbage") == 1.0
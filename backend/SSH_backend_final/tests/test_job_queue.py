@@ -0,0 +1,42 @@
+"""JobQueue bookkeeping across worker threads."""
+
+import threading
+
+from engine import job_queue
+from engine.job_queue import JobQueue
+
+
+class _Store:
+    def finish(self, job_id, result=None, error=None):
+        pass
+
+    def counts(self):
+        return {}
+
+
+def test_running_count_is_exact_across_workers(monkeypatch):
+    queue = JobQueue(workers=8, store=_Store())
+    peak = []
+
+    def analyze(text):
+        peak.append(queue.stats()["running_here"])
+        return {}
+
+    monkeypatch.setattr(job_queue, "analyze_complaint", analyze)
+    job = {"job_id": "j", "attempts": 1, "text": "pothole", "started_at": 2.0,
+           "submitted_at": 1.0, "preliminary": {"severity_level": "Low"}}
+
+    def worker():
+        for _ in range(500):
+            queue._run(dict(job))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = queue.stats()
+    assert stats["running_here"] == 0
+    assert 1 <= max(peak) <= 8
+    assert stats["wait_ms"]["Low"]["jobs"] == 4000
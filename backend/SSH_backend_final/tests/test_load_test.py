@@ -0,0 +1,25 @@
+"""Load generator targets."""
+
+import asyncio
+
+import httpx
+
+from engine.load_test import Workload
+
+
+def test_async_job_that_never_finishes_times_out():
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(202, json={"job_id": "j1"})
+        return httpx.Response(200, json={"status": "queued"})
+
+    async def run():
+        workload = Workload("http://server", [("async", 1.0)], [("pothole", 1.0)],
+                            poll_seconds=0.01, async_timeout=0.1)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.wait_for(workload.send(client), timeout=5)
+
+    sample = asyncio.run(run())
+    assert not sample.ok
+    assert sample.error.startswith("TimeoutError")
+    assert 0.1 <= sample.latency < 1
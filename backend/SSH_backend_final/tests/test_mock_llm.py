@@ -0,0 +1,38 @@
+"""The mock LLM answers from the complaint in the prompt, not from its examples."""
+
+import json
+
+import pytest
+
+from engine import category_classifier, language_detector, sentiment_analyzer
+from engine.category_classifier import RESPONSE_FORMAT, SUBCATEGORY_CODES, classify_local
+from engine.mock_llm import reply_for
+
+COMPLAINTS = [
+    "Stray dogs biting children near the park every evening",
+    "Garbage has not been collected for a week and it stinks",
+    "Huge pothole on the main road damaged my scooter",
+    'Neighbour said "call the police" after the\n"illegal" construction started',
+]
+
+
+def _chat(template, text, **body):
+    messages = [{"role": "system", "content": "You are a JSON-only API. Output strict JSON."},
+                {"role": "user", "content": template.format(text=text)}]
+    return reply_for(dict(body, messages=messages))
+
+
+@pytest.mark.parametrize("complaint", COMPLAINTS)
+def test_classification_follows_the_complaint(complaint):
+    reply = json.loads(_chat(category_classifier.PROMPT_TEMPLATE, complaint,
+                             response_format=RESPONSE_FORMAT))
+    local = classify_local(complaint)
+    assert SUBCATEGORY_CODES[reply["sub"]][0] == local["category"]
+
+
+@pytest.mark.parametrize("complaint", COMPLAINTS)
+def test_other_stages_read_the_complaint(complaint):
+    sentiment = json.loads(_chat(sentiment_analyzer.PROMPT_TEMPLATE, complaint))
+    assert sentiment == sentiment_analyzer.analyze_sentiment_local(complaint)
+    language = json.loads(_chat(language_detector.PROMPT_TEMPLATE, complaint))
+    assert language == language_detector.detect_language_local(complaint)
@@ -0,0 +1,32 @@
+"""Stage scheduling in _run_stages()."""
+
+import threading
+import time
+
+from engine import pipeline
+from engine.pipeline import COST_LOCAL, Stage
+
+
+def test_parallel_stages_are_capped_per_run(monkeypatch):
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def runner(name):
+        def run(text, result):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return {name: text}
+        return run
+
+    names = [f"s{i}" for i in range(8)]
+    stages = {name: Stage(runner(name), (), (name,), COST_LOCAL) for name in names}
+    monkeypatch.setattr(pipeline, "PIPELINE_STAGES", stages)
+    monkeypatch.setattr(pipeline, "MAX_PARALLEL_STAGES", 3)
+
+    assert pipeline._run_stages("x", names) == {name: "x" for name in names}
+    assert peak[0] == 3
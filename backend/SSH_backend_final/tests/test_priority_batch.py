@@ -0,0 +1,85 @@
+"""compute_priority_scores_batch() must match compute_priority_score() row for row."""
+
+import random
+
+from engine.priority_scorer import (
+    RISK_TIERS,
+    WEIGHTS,
+    classify_risk_tier,
+    compute_keyword_risk,
+    compute_location_risk,
+    compute_priority_score,
+    compute_priority_scores_batch,
+    iter_priority_batch,
+)
+
+ROWS = 200_000
+
+LOCATIONS = [
+    ("", ""), ("Mumbai", "near the hospital"), ("flood zone", "school"),
+    ("Pune", "bus stand"), ("slum area of Delhi", "temple"), ("Nashik", "park"),
+    ("industrial zone", "power plant"), ("unknown place", "market"),
+]
+KEYWORDS = [
+    [], ["pothole"], ["fire", "child"], ["open wire", "dead"], ["garbage", "stench"],
+    ["delay"], ["sewage", "contamination", "outbreak"], ["nothing", "relevant"],
+]
+
+
+def _assert_same(batch, scalar_rows):
+    for got, expected in zip(iter_priority_batch(batch), scalar_rows):
+        assert got.to_dict() == expected
+
+
+def test_random_rows_match_scalar():
+    rng = random.Random(20261019)
+    location_risk = {pair: compute_location_risk(*pair)["risk"] for pair in LOCATIONS}
+    keyword_risk = {tuple(k): compute_keyword_risk(k)["risk"] for k in KEYWORDS}
+
+    columns = ([], [], [], [], [])
+    expected = []
+    for _ in range(ROWS):
+        severity = rng.randint(-2, 12)
+        sentiment = round(rng.uniform(-1.2, 1.2), rng.choice((2, 4, 6)))
+        confidence = round(rng.random(), rng.choice((2, 4, 6)))
+        pair = rng.choice(LOCATIONS)
+        keywords = rng.choice(KEYWORDS)
+
+        for column, value in zip(columns, (severity, sentiment, confidence,
+                                           location_risk[pair], keyword_risk[tuple(keywords)])):
+            column.append(value)
+        expected.append(compute_priority_score(severity, sentiment, confidence, *pair, keywords))
+
+    _assert_same(compute_priority_scores_batch(*columns), expected)
+
+
+def test_tier_boundaries_match_scalar():
+    # Confidence alone sweeps the score across every tier boundary in 0.0001 steps
+    boundaries = (RISK_TIERS["low_max"], RISK_TIERS["medium_max"], RISK_TIERS["high_max"])
+    confidences = sorted({
+        round(b / WEIGHTS["confidence"] + step * 0.0001, 6)
+        for b in (0.0, *boundaries, 1.0) for step in range(-20, 21)
+    })
+    n = len(confidences)
+    expected = [compute_priority_score(0, 0.0, c, "", "", []) for c in confidences]
+    batch = compute_priority_scores_batch([0] * n, [0.0] * n, confidences, [0.0] * n, [0.0] * n)
+    _assert_same(batch, expected)
+
+    # A score exactly on a boundary belongs to the lower tier on both paths
+    on_boundary = {
+        score: tier
+        for score, tier in zip(batch["priority_score"].tolist(), batch["risk_tier"].tolist())
+        if score in boundaries
+    }
+    assert on_boundary == {0.3: "Low", 0.6: "Medium", 0.8: "High"}
+    assert [classify_risk_tier(b) for b in boundaries] == ["Low", "Medium", "High"]
+
+
+def test_clamped_and_empty_batches():
+    batch = compute_priority_scores_batch([12, -3], [-1.5, 2.0], [1.0, 0.0], [1.0, 0.0], [1.0, 0.0])
+    assert batch["priority_score"].tolist() == [1.0, 0.0]
+    assert batch["risk_tier"].tolist() == ["Critical", "Low"]
+
+    empty = compute_priority_scores_batch([], [], [], [], [])
+    assert empty["priority_score"].shape == (0,)
+    assert list(iter_priority_batch(empty)) == []
@@ -0,0 +1,14 @@
+"""reanalyze_complaint() input checks."""
+
+import pytest
+
+from engine.pipeline import NotReanalyzable, reanalyze_complaint
+
+
+@pytest.mark.parametrize("previous", [
+    {"category_analysis": {"category": "Sanitation"}},          # field-restricted result
+    {"translation": {"original_text": "  ", "translated_text": ""}},
+])
+def test_analysis_without_original_text_is_rejected(previous):
+    with pytest.raises(NotReanalyzable):
+        reanalyze_complaint(previous)
@@ -0,0 +1,50 @@
+"""PDF report layout."""
+
+import pytest
+
+from engine.priority_scorer import classify_risk_tier
+from engine.report_generator import TIER_COLORS, _num, generate_pdf_report, layout_pdf_report
+
+EXPECTED_BANNER_RGB = {
+    "Critical": (0.78, 0.16, 0.16),
+    "High": (0.90, 0.45, 0.10),
+    "Medium": (0.85, 0.68, 0.10),
+    "Low": (0.22, 0.56, 0.24),
+}
+
+
+def _banner_fill(doc) -> bytes:
+    """The colour operator right before the banner rectangle."""
+    ops = doc.pages[0]
+    rect = next(i for i, op in enumerate(ops) if op.endswith(b" 26 re f"))
+    return ops[rect - 1]
+
+
+def _rg(rgb) -> bytes:
+    return b"%s %s %s rg" % tuple(_num(c) for c in rgb)
+
+
+@pytest.mark.parametrize("score", [0.95, 0.7, 0.45, 0.1])
+def test_banner_colour_follows_risk_tier(score):
+    tier = classify_risk_tier(score)
+    doc = layout_pdf_report({"priority_scoring": {"risk_tier": tier, "priority_score": score}})
+    assert _banner_fill(doc) == _rg(EXPECTED_BANNER_RGB[tier])
+    assert any(f"{tier.upper()} PRIORITY".encode() in op for op in doc.pages[0])
+
+
+def test_every_tier_has_its_own_colour():
+    tiers = {classify_risk_tier(s) for s in (0.0, 0.5, 0.7, 1.0)}
+    assert tiers <= set(TIER_COLORS)
+    assert len({TIER_COLORS[t] for t in tiers}) == len(tiers)
+
+
+def test_upper_case_and_missing_tiers():
+    doc = layout_pdf_report({"priority_scoring": {"risk_tier": "CRITICAL", "priority_score": 0.9}})
+    assert _banner_fill(doc) == _rg(EXPECTED_BANNER_RGB["Critical"])
+    doc = layout_pdf_report({})
+    assert _banner_fill(doc) == _rg(EXPECTED_BANNER_RGB["Low"])
+
+
+def test_renders_pdf():
+    pdf = generate_pdf_report({"priority_scoring": {"risk_tier": "High", "priority_score": 0.7}})
+    assert pdf.startswith(b"%PDF-") and pdf.rstrip().endswith(b"%%EOF")
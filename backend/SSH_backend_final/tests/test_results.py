@@ -0,0 +1,52 @@
+"""Result objects read back the shapes stored analyses come in."""
+
+from engine.results import COMPONENT_NAMES, AnalysisResult, PriorityScoring
+
+
+def _dashboard_analysis(components):
+    """The shape civicai's complaints.ts builds from a stored analysis."""
+    return {
+        "language_detection": {"detected_language": "en", "confidence": 1},
+        "translation": {"was_translated": False, "original_text": "", "translated_text": "",
+                        "translation_confidence": 0},
+        "category_analysis": {"category": "Sanitation", "subcategory": "", "category_confidence": 0.9},
+        "sentiment_analysis": {"sentiment_score": -0.4, "sentiment_label": "Negative"},
+        "severity_analysis": {"severity_score": 6, "severity_level": "High",
+                              "risk_type": "Platform Migrated", "matched_keywords": []},
+        "extracted_keywords": ["garbage"],
+        "entities": {"location": "Mapped Location", "landmark": ""},
+        "department_probabilities": [{"department": "Sanitation", "probability": 0.9}],
+        "priority_scoring": {
+            "priority_score": 0.62,
+            "risk_tier": "High",
+            "explainability": {"components": components, "total_before_clamp": 0.62},
+        },
+        "summary": "Garbage not collected",
+        "processing_time_ms": 100,
+    }
+
+
+def test_empty_components_round_trip():
+    result = AnalysisResult.from_dict(_dashboard_analysis([]))
+    scoring = result.priority_scoring.to_dict()
+    assert (scoring["priority_score"], scoring["risk_tier"]) == (0.62, "High")
+    assert scoring["explainability"]["total_before_clamp"] == 0.62
+    assert [c["name"] for c in scoring["explainability"]["components"]] == list(COMPONENT_NAMES)
+    assert all(c["weight"] == c["raw_value"] == c["weighted_value"] == 0.0
+               for c in scoring["explainability"]["components"])
+    assert AnalysisResult.from_dict(result.to_dict()) == result
+
+
+def test_partial_components_keep_the_ones_given():
+    severity = {"name": "severity", "raw_value": 0.6, "weight": 0.35, "weighted_value": 0.21}
+    scoring = PriorityScoring.from_dict(
+        _dashboard_analysis([severity])["priority_scoring"]).to_dict()
+    components = scoring["explainability"]["components"]
+    assert components[0] == severity
+    assert [c["weight"] for c in components[1:]] == [0.0] * (len(COMPONENT_NAMES) - 1)
+
+
+def test_missing_explainability():
+    scoring = PriorityScoring.from_dict({"priority_score": 0.1, "risk_tier": "Low"})
+    assert scoring.total_before_clamp == 0.1
+    assert scoring.weights == (0.0,) * len(COMPONENT_NAMES)
@@ -0,0 +1,151 @@
+"""RiskIndex must find exactly what the linear substring scan it replaced found."""
+
+import random
+
+import pytest
+
+from engine.priority_scorer import (
+    HIGH_RISK_KEYWORDS,
+    SENSITIVE_LANDMARKS,
+    SENSITIVE_LOCATIONS,
+    compute_keyword_risk,
+    compute_location_risk,
+)
+from engine.risk_index import RiskIndex
+from engine.rule_packs import RulePack, current_rules, pinned_rules
+
+
+def linear_related(table: dict, text: str) -> list:
+    """The original scan: every key with `key in text or text in key`, in table order."""
+    return [i for i, key in enumerate(table) if key in text or text in key]
+
+
+def linear_location_risk(location: str, landmark: str) -> dict:
+    """compute_location_risk() before the index (scan over the tables)."""
+    loc = location.strip().lower()
+    lm = landmark.strip().lower()
+    loc_risk = lm_risk = 0.0
+    parts = []
+    if loc in SENSITIVE_LOCATIONS:
+        loc_risk = SENSITIVE_LOCATIONS[loc]
+        parts.append(f'location "{loc}" risk={loc_risk}')
+    elif loc:
+        for key, val in SENSITIVE_LOCATIONS.items():
+            if key in loc or loc in key:
+                loc_risk = max(loc_risk, val)
+                parts.append(f'location partial-match "{key}" risk={val}')
+    if lm in SENSITIVE_LANDMARKS:
+        lm_risk = SENSITIVE_LANDMARKS[lm]
+        parts.append(f'landmark "{lm}" risk={lm_risk}')
+    elif lm:
+        for key, val in SENSITIVE_LANDMARKS.items():
+            if key in lm or lm in key:
+                lm_risk = max(lm_risk, val)
+                parts.append(f'landmark partial-match "{key}" risk={val}')
+    combined = max(loc_risk, lm_risk)
+    if loc_risk > 0 and lm_risk > 0:
+        combined = min(1.0, combined + 0.1)
+        parts.append("both-present bonus +0.1")
+    return {
+        "risk": round(combined, 4),
+        "details": "; ".join(parts) if parts else "no sensitive location/landmark match",
+    }
+
+
+def linear_keyword_risk(keywords: list) -> dict:
+    """compute_keyword_risk() before the index (first related key in table order)."""
+    if not keywords:
+        return {"risk": 0.0, "matched": []}
+    matched = []
+    max_risk = 0.0
+    for kw in keywords:
+        normalized = kw.strip().lower()
+        if normalized in HIGH_RISK_KEYWORDS:
+            val = HIGH_RISK_KEYWORDS[normalized]
+            max_risk = max(max_risk, val)
+            matched.append(f"{normalized}({val})")
+        else:
+            for key, val in HIGH_RISK_KEYWORDS.items():
+                if key in normalized or normalized in key:
+                    max_risk = max(max_risk, val)
+                    matched.append(f"{normalized}~{key}({val})")
+                    break
+    return {"risk": round(max_risk, 4), "matched": matched}
+
+
+# Overlapping keys, suffixed forms, and substrings across word boundaries
+QUERIES = [
+    "dead", "dead open wire", "open wire", "wire", "open", "live wire sparking",
+    "potholes", "pothole", "pot", "hole", "fires", "fire", "firefighter", "flooding",
+    "floods", "flood zone", "zone", "difficulty breathing", "breath", "breathing difficulty",
+    "child", "children", "childhood", "infant", "babysitter", "dangerously", "danger",
+    "electrocuted", "electrocution", "sewage line", "the sewage", "age", "a", "e", "",
+    "hospital road", "near the hospital", "hospitality", "pit", "school", "schools",
+    "preschool", "railway station", "station", "bus stand", "stand", "dam", "adamant",
+    "amsterdam", "power plant", "plant", "water treatment plant", "treatment",
+    "mumbai", "navi mumbai", "mum", "delhi", "new delhi", "slum area", "area", "industrial",
+    "industrial zone 4", "earthquake", "border", "pune", "punekar",
+]
+
+
+@pytest.mark.parametrize("table", [SENSITIVE_LOCATIONS, SENSITIVE_LANDMARKS, HIGH_RISK_KEYWORDS],
+                         ids=["locations", "landmarks", "keywords"])
+def test_related_matches_linear_scan(table):
+    index = RiskIndex(table)
+    for query in QUERIES:
+        assert index.related(query) == linear_related(table, query), query
+        assert index.partial_matches(query) == [
+            (key, table[key]) for key in (list(table)[i] for i in linear_related(table, query))
+        ]
+
+
+def test_overlapping_and_suffixed_keys():
+    table = {"dead": 1.0, "dead open wire": 1.0, "open wire": 0.9, "wire": 0.4,
+             "pothole": 0.3, "potholes": 0.35, "hole": 0.1, "ire": 0.2}
+    index = RiskIndex(table)
+    keys = list(table)
+    # Every key contained in the query, overlapping ones included
+    assert [keys[i] for i in index.related("a dead open wire")] == [
+        "dead", "dead open wire", "open wire", "wire", "ire"]
+    # Suffixed query: the key and its shorter parts
+    assert [keys[i] for i in index.related("potholes")] == ["pothole", "potholes", "hole"]
+    # Query inside keys
+    assert [keys[i] for i in index.related("ope")] == ["dead open wire", "open wire"]
+    # Plain substring semantics, not word boundaries (as the scan did)
+    assert [keys[i] for i in index.related("wired")] == ["wire", "ire"]
+
+
+def test_random_tables_match_linear_scan():
+    rng = random.Random(29)
+    alphabet = "ab c"
+    for _ in range(200):
+        table = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))): rng.random()
+            for _ in range(rng.randint(1, 12))
+        }
+        index = RiskIndex(table)
+        for _ in range(20):
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+            assert index.related(query) == linear_related(table, query), (table, query)
+
+
+def test_risk_functions_match_linear_versions():
+    # Pin the in-code risk tables: a pack at RULE_PACK_PATH may differ
+    active = current_rules()
+    tables = {
+        "severity_keywords": active.severity_keywords,
+        "risk_keywords": sorted(active.risk_keywords),
+        "high_risk_keywords": HIGH_RISK_KEYWORDS,
+        "sensitive_locations": SENSITIVE_LOCATIONS,
+        "sensitive_landmarks": SENSITIVE_LANDMARKS,
+        "landmark_keywords": active.landmark_keywords,
+        "category_keywords": active.category_keywords,
+    }
+    with pinned_rules(RulePack(tables)):
+        for location in QUERIES:
+            for landmark in ("", "hospital", "near school gate", "plant", "xyz"):
+                assert compute_location_risk(location, landmark) == \
+                    linear_location_risk(location, landmark)
+        for i in range(len(QUERIES)):
+            keywords = QUERIES[i:i + 3]
+            assert compute_keyword_risk(keywords) == linear_keyword_risk(keywords)
@@ -0,0 +1,35 @@
+"""The tables in code are the default rule pack; a pack file overrides only what it holds."""
+
+import json
+
+import pytest
+
+from engine import priority_scorer, rule_packs
+from engine.priority_scorer import compute_keyword_risk, rebuild_risk_indexes
+
+
+@pytest.fixture
+def pack_path(tmp_path, monkeypatch):
+    path = tmp_path / "rule_pack.json"
+    monkeypatch.setenv("RULE_PACK_PATH", str(path))
+    yield path
+    monkeypatch.undo()
+    rule_packs.reload_rules()
+
+
+def test_rebuild_picks_up_changed_tables(pack_path, monkeypatch):
+    monkeypatch.setitem(priority_scorer.HIGH_RISK_KEYWORDS, "sinkhole", 0.95)
+    rebuild_risk_indexes()
+    assert compute_keyword_risk(["sinkhole"]) == {"risk": 0.95, "matched": ["sinkhole(0.95)"]}
+
+
+def test_pack_file_overrides_only_its_tables(pack_path):
+    pack_path.write_text(json.dumps({"version": "t1", "high_risk_keywords": {"sinkhole": 0.8}}))
+    rules = rule_packs.reload_rules()
+    assert rules.version == "t1"
+    assert rules.high_risk_keywords == {"sinkhole": 0.8}
+    assert rules.sensitive_locations == priority_scorer.SENSITIVE_LOCATIONS
+
+
+def test_no_default_pack_file_ships():
+    assert not rule_packs.DEFAULT_PATH.exists()
@@ -0,0 +1,74 @@
+"""SemanticCache reuses results for paraphrases, not for other problems at the same place."""
+
+import pytest
+
+from engine import rule_packs
+from engine.semantic_cache import SemanticCache, embed, topic_signature
+
+ADDRESS = ("on Mahatma Gandhi Road opposite Sri Venkateswara Government Hospital "
+           "Jayanagar 4th Block Bengaluru")
+
+DIFFERENT_PROBLEMS = [
+    ("Dog bite", "Fire"),
+    ("Pothole", "Garbage"),
+    ("Sewage overflow", "Power outage"),
+    ("Stray dog bit a child", "Transformer caught fire"),
+    ("Streetlight not working", "Water supply contaminated"),
+]
+
+PARAPHRASES = [
+    ("pothole near City Hospital on MG Road", "big pothole MG road by City hospital"),
+    ("Garbage not collected for a week in Shivaji Nagar, Pune",
+     "Garbage has not been collected for one week at Shivaji Nagar Pune"),
+    ("Street light not working on 5th Cross Road, Indiranagar",
+     "street lights are not working at Indiranagar 5th cross road"),
+]
+
+
+def _cache_with(text):
+    cache = SemanticCache(size=8, stages=["category_analysis"])
+    cache.store(text, "category_analysis", {"category": text})
+    return cache
+
+
+@pytest.mark.parametrize("first,second", DIFFERENT_PROBLEMS)
+def test_shared_address_does_not_make_a_hit(first, second):
+    cached, new = f"{first} {ADDRESS}", f"{second} {ADDRESS}"
+    assert topic_signature(cached) != topic_signature(new)
+    assert _cache_with(cached).lookup(new, "category_analysis") is None
+
+
+def test_place_words_are_not_embedded():
+    assert embed("pothole on 5th Cross Road, 4th Block") @ embed("pothole") == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("first,second", PARAPHRASES)
+def test_paraphrases_still_hit(first, second):
+    hit = _cache_with(first).lookup(second, "category_analysis")
+    assert hit is not None
+    outputs, similarity = hit
+    assert outputs == {"category": first}
+    assert similarity >= 0.82
+
+
+def test_hit_is_per_stage():
+    cache = _cache_with(PARAPHRASES[0][0])
+    assert cache.lookup(PARAPHRASES[0][1], "sentiment_analysis") is None
+
+
+def test_rule_pack_reload_invalidates(tmp_path, monkeypatch):
+    monkeypatch.setenv("RULE_PACK_PATH", str(tmp_path / "rule_pack.json"))
+    cached, new = PARAPHRASES[0]
+    cache = _cache_with(cached)
+    embed(new)
+    try:
+        rule_packs.reload_rules()
+        assert embed.cache_info().currsize == 0
+        assert cache.lookup(new, "category_analysis") is None
+        # Stored again under the new pack, the row is reused
+        cache.store(cached, "category_analysis", {"category": "new"})
+        assert cache.lookup(new, "category_analysis")[0] == {"category": "new"}
+        assert cache.stats()["entries"] == 1
+    finally:
+        monkeypatch.undo()
+        rule_packs.reload_rules()
@@ -0,0 +1,46 @@
+"""Stage fingerprints change with everything that changes a stage's output."""
+
+import pytest
+
+from engine import llm_router
+from engine.llm_router import LLMRouter
+from engine.stage_versions import stage_fingerprint
+
+LOCAL = {"base_url": "http://localhost:8080/v1", "api_key": "none", "metered": False}
+
+
+def _fingerprint_with_routes(monkeypatch, table):
+    monkeypatch.setattr(llm_router, "_router", LLMRouter(table))
+    return stage_fingerprint("sentiment_analysis")
+
+
+@pytest.fixture
+def default(monkeypatch):
+    return _fingerprint_with_routes(monkeypatch, {})
+
+
+def test_route_model_changes_fingerprint(monkeypatch, default):
+    table = {"endpoints": {"local": LOCAL},
+             "stages": {"sentiment_analysis": [{"endpoint": "local", "model": "qwen2.5-7b-instruct"}]}}
+    routed = _fingerprint_with_routes(monkeypatch, table)
+    assert routed != default
+
+    table["stages"]["sentiment_analysis"][0]["model"] = "llama-3.1-8b-instruct"
+    assert _fingerprint_with_routes(monkeypatch, table) not in (default, routed)
+
+
+def test_route_weights_and_endpoints_change_fingerprint(monkeypatch, default):
+    table = {"endpoints": {"local": LOCAL},
+             "stages": {"sentiment_analysis": [{"endpoint": "local", "weight": 3}, {"endpoint": "openai"}]}}
+    weighted = _fingerprint_with_routes(monkeypatch, table)
+    table["stages"]["sentiment_analysis"][0]["weight"] = 1
+    even = _fingerprint_with_routes(monkeypatch, table)
+    table["endpoints"]["local"] = dict(LOCAL, base_url="http://10.0.0.5:8080/v1")
+    moved = _fingerprint_with_routes(monkeypatch, table)
+    assert len({default, weighted, even, moved}) == 4
+
+
+def test_other_stages_routes_leave_fingerprint_alone(monkeypatch, default):
+    table = {"endpoints": {"local": LOCAL},
+             "stages": {"summary": [{"endpoint": "local", "model": "qwen2.5-7b-instruct"}]}}
+    assert _fingerprint_with_routes(monkeypatch, table) == default
@@ -0,0 +1,8 @@
+-- Adds the priority inputs/outputs used by the backend re-prioritization job
+-- (backend/SSH_backend_final/engine/backlog_reprioritizer.py) to existing databases.
+ALTER TABLE complaint_ai_analysis
+    ADD COLUMN IF NOT EXISTS category_confidence DECIMAL(5, 4),
+    ADD COLUMN IF NOT EXISTS location TEXT,
+    ADD COLUMN IF NOT EXISTS landmark TEXT,
+    ADD COLUMN IF NOT EXISTS priority_score DECIMAL(5, 4),
+    ADD COLUMN IF NOT EXISTS risk_tier VARCHAR(20);
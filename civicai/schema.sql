@@ -84,6 +84,11 @@ CREATE TABLE complaint_ai_analysis (
     risk_score INT NOT NULL, -- e.g., 0 to 100
     escalation_score INT NOT NULL, -- e.g., 0 to 100
     extracted_keywords JSONB,
+    category_confidence DECIMAL(5, 4), -- Priority inputs kept for offline re-scoring
+    location TEXT,
+    landmark TEXT,
+    priority_score DECIMAL(5, 4), -- e.g., 0.0000 to 1.0000
+    risk_tier VARCHAR(20),
     ai_summary TEXT NOT NULL,
     suggested_action TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -167,9 +167,14 @@ export async function logComplaint(data: any, citizenId?: string) {
                         category: data.aiAnalysis.category_analysis.category,
                         sub_category: data.aiAnalysis.category_analysis.subcategory,
                         sentiment_score: data.aiAnalysis.sentiment_analysis.sentiment_score,
-                        risk_score: data.aiAnalysis.severity_analysis.severity_score || 50,
+                        risk_score: data.aiAnalysis.severity_analysis.severity_score ?? 50,
                         escalation_score: data.aiAnalysis.priority_scoring.priority_score,
                         extracted_keywords: data.aiAnalysis.extracted_keywords,
+                        category_confidence: data.aiAnalysis.category_analysis.category_confidence,
+                        location: data.aiAnalysis.entities?.location || null,
+                        landmark: data.aiAnalysis.entities?.landmark || null,
+                        priority_score: data.aiAnalysis.priority_scoring.priority_score,
+                        risk_tier: data.aiAnalysis.priority_scoring.risk_tier,
                         ai_summary: data.aiAnalysis.summary || "Summary generation offloaded to backend structure.",
                         suggested_action: data.aiAnalysis.suggestedAction || "Action generation offloaded to backend structure."
                     }